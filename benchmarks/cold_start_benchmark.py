@@ -0,0 +1,112 @@
+# Cold-start benchmark: launches the app offscreen several times, each in a
+# fresh process, and fails (exit code 1) when the median time to a startup
+# phase is over its budget.
+#
+#   python benchmarks/cold_start_benchmark.py --runs 5 --window-budget-ms 1500
+#
+# With --fresh-bytecode every run also compiles the app from source, as on
+# the first launch after an install or update.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from startup_metrics import IMPORT_PROFILE_ENV, PHASES
+
+MAIN = os.path.join(ROOT, "main.py")
+EXIT_AFTER_STARTUP = "--exit-after-startup"   # main.EXIT_AFTER_STARTUP (main.py imports Qt)
+RESULT_PREFIX = "STARTUP "
+
+
+def cold_start(fresh_bytecode, timeout):
+    # Run the app once until the synth is ready; returns startup_metrics.as_dict()
+    # plus "wall_ms", the time from launching the process until it exited
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    env[IMPORT_PROFILE_ENV] = "1"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if fresh_bytecode:
+            env["PYTHONPYCACHEPREFIX"] = cache_dir
+        launched = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, MAIN, EXIT_AFTER_STARTUP],
+            cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout,
+        )
+        wall_ms = (time.perf_counter() - launched) * 1000
+    for line in result.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            run = json.loads(line[len(RESULT_PREFIX):])
+            run["wall_ms"] = wall_ms
+            return run
+    raise RuntimeError(f"App exited with code {result.returncode} without startup timings:\n{result.stderr}")
+
+
+def summarize(runs, top):
+    # Median time to each phase and the slowest imports over all runs
+    phases = {}
+    for phase in PHASES:
+        times = [run["phases_ms"][phase] for run in runs if phase in run["phases_ms"]]
+        if times:
+            phases[phase] = statistics.median(times)
+    # Measured from outside, so it does not depend on the app's own clock
+    phases["process_exit"] = statistics.median(run["wall_ms"] for run in runs)
+
+    imports = {}
+    for run in runs:
+        for name, (_, own) in run["imports_ms"].items():
+            imports.setdefault(name, []).append(own)
+    slowest = sorted(((statistics.median(times), name) for name, times in imports.items()), reverse=True)[:top]
+    return phases, slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure PianoChord cold starts against a time budget")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts (default 5)")
+    parser.add_argument("--window-budget-ms", type=float, default=1500.0,
+                        help="median budget from process start to window shown (default 1500)")
+    parser.add_argument("--ready-budget-ms", type=float, default=None,
+                        help="median budget from process start to synth ready (default: not checked)")
+    parser.add_argument("--fresh-bytecode", action="store_true", help="compile from source on every run")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list (default 10)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for one start")
+    args = parser.parse_args()
+
+    runs = []
+    for i in range(args.runs):
+        run = cold_start(args.fresh_bytecode, args.timeout)
+        runs.append(run)
+        window = run["phases_ms"].get("window_shown", float("nan"))
+        print(f"Run {i + 1}: window shown {window:.0f} ms, process exit {run['wall_ms']:.0f} ms")
+
+    phases, slowest = summarize(runs, args.top)
+    print(f"\nMedian of {len(runs)} runs (ms from process start; process_exit from launch):")
+    for phase, ms in phases.items():
+        print(f"  {phase:<14} {ms:8.1f}")
+    print("Slowest imports (median own time):")
+    for ms, name in slowest:
+        print(f"  {name:<40} {ms:8.1f} ms")
+
+    budgets = {"window_shown": args.window_budget_ms, "synth_ready": args.ready_budget_ms}
+    failed = False
+    for phase, budget in budgets.items():
+        if budget is None:
+            continue
+        ms = phases.get(phase)
+        if ms is None or ms > budget:
+            reached = "not reached" if ms is None else f"{ms:.1f} ms"
+            print(f"FAIL: {phase} {reached}, budget {budget:.0f} ms")
+            failed = True
+        else:
+            print(f"OK: {phase} {ms:.1f} ms, budget {budget:.0f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,16 @@
+from collections import namedtuple
 from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 from chord_composer import ChordComposer
+from music_theory import chord_index, pitch, progression, voice_leading
+from sound_system.tempo_clock import TempoClock, TIME_SIGNATURES, DEFAULT_BPM, MIN_BPM, MAX_BPM
+from sound_system.event_scheduler import NOTE_ON, NOTE_OFF
+from sound_system.midi_file import write_midi
+from keyboard_system.highlight_model import PROGRESSION
+
+# One compiled playback step: start beat, resolved chord, sharp note names
+# (for button lookup) and MIDI notes
+TimelineStep = namedtuple("TimelineStep", "beat chord notes midi")
 
 class ChordProgressionWindow(QWidget):
     # Chord progression window - For playing sequences of related chords
@@ -12,8 +22,18 @@ class ChordProgressionWindow(QWidget):
         
         # Initialize variables
         self.root_chord = None
+        self.key_mode = progression.MAJOR
         self.progression_chords = []
+        self.timeline = []          # Compiled once per generated progression
+        self.timeline_beats = 0     # Length of the timeline in beats
         self.current_chord_index = 0
+        self.last_played_step = None
+        self.is_looping = False
+
+        # Beat clock that schedules every chord against absolute beat times
+        self.clock = TempoClock(parent=self)
+        self.clock.tick.connect(self.play_step)
+        self.clock.finished.connect(self.on_progression_finished)
         
         # UI Setup
         layout = QVBoxLayout()
@@ -28,15 +48,8 @@ class ChordProgressionWindow(QWidget):
         progression_layout = QVBoxLayout()
         self.progression_combo = QComboBox()
         
-        # Available chord progressions
-        self.progression_combo.addItems([
-            "I-V-vi-IV",
-            "I-IV-V-V",
-            "ii-V-I-vi",
-            "I-vi-IV-V",
-            "I-iii-vi-IV",
-            "I-V-vi-iii-IV-I-IV-V"
-        ])
+        # Available chord progressions (depend on the key mode)
+        self.progression_combo.addItems(progression.PROGRESSION_PATTERNS[self.key_mode])
         
         progression_layout.addWidget(self.progression_combo)
         self.progression_group.setLayout(progression_layout)
@@ -68,13 +81,47 @@ class ChordProgressionWindow(QWidget):
         self.stop_button.setEnabled(False)  # Disabled until progression is playing
         self.stop_button.clicked.connect(self.stop_progression)
         
+        self.export_button = QPushButton("Export MIDI")
+        self.export_button.setEnabled(False)  # Disabled until progression is generated
+        self.export_button.clicked.connect(self.export_midi)
+        
         button_layout.addWidget(self.generate_button)
         button_layout.addWidget(self.play_button)
         button_layout.addWidget(self.stop_button)
+        button_layout.addWidget(self.export_button)
 
         # Loop checkbox
         self.loop_checkbox = QCheckBox("Loop Progression")
         self.loop_checkbox.setChecked(False)  # Default to not looping
+
+        self.loop_checkbox.toggled.connect(self.on_loop_toggled)
+
+        # Voice leading checkbox: pick inversions that keep the voices close
+        # together and on the keyboard instead of playing root positions
+        self.voice_leading_checkbox = QCheckBox("Smooth voice leading")
+        self.voice_leading_checkbox.setChecked(False)
+        self.voice_leading_checkbox.toggled.connect(self.compile_timeline)
+
+        # Tempo and time signature (one chord per bar)
+        tempo_layout = QHBoxLayout()
+        self.tempo_spin = QSpinBox()
+        self.tempo_spin.setRange(MIN_BPM, MAX_BPM)
+        self.tempo_spin.setValue(DEFAULT_BPM)
+        self.tempo_spin.setSuffix(" BPM")
+        self.tempo_spin.valueChanged.connect(self.clock.set_tempo)
+
+        self.time_signature_combo = QComboBox()
+        self.time_signature_combo.addItems(TIME_SIGNATURES)
+        self.time_signature_combo.currentTextChanged.connect(self.on_time_signature_changed)
+
+        tempo_layout.addWidget(QLabel("Tempo:"))
+        tempo_layout.addWidget(self.tempo_spin)
+        tempo_layout.addWidget(QLabel("Time:"))
+        tempo_layout.addWidget(self.time_signature_combo)
+
+        # Measured playback timing
+        self.timing_display = QLabel("Timing: -")
+        self.timing_display.setAlignment(Qt.AlignCenter)
         
         # Add all components to main layout
         layout.addWidget(QLabel("Root Chord:"))
@@ -83,15 +130,26 @@ class ChordProgressionWindow(QWidget):
         layout.addWidget(QLabel("Generated Progression:"))
         layout.addWidget(self.progression_display)
         layout.addWidget(self.loop_checkbox)
+        layout.addWidget(self.voice_leading_checkbox)
+        layout.addLayout(tempo_layout)
         layout.addLayout(button_layout)
+        layout.addWidget(self.timing_display)
         
         self.setLayout(layout)
     
     # Set the root chord from the chord composer
     def set_root_chord(self, root, chord_type):
         self.root_chord = (root, chord_type)
-        display_root = root[:-1] if len(root) > 1 and root[-1].isdigit() else root
-        self.root_display.setText(f"Key: {display_root} Major")
+        display_root = pitch.strip_octave(root)
+
+        # A minor root chord puts the progression in the minor key
+        mode = progression.key_mode(chord_type)
+        if mode != self.key_mode:
+            self.key_mode = mode
+            self.progression_combo.clear()
+            self.progression_combo.addItems(progression.PROGRESSION_PATTERNS[mode])
+
+        self.root_display.setText(f"Key: {display_root} {mode.title()}")
         self.generate_button.setEnabled(True)
     
     # Generate chord progression based on root chord and selected progression type
@@ -100,46 +158,87 @@ class ChordProgressionWindow(QWidget):
             return
             
         root, chord_type = self.root_chord
-        progression_type = self.progression_combo.currentText()
-        
-        # Define progression patterns using Roman numerals
-        progression_patterns = {
-            "I-V-vi-IV": ["I", "V", "vi", "IV"],
-            "I-IV-V-V": ["I", "IV", "V", "V"],
-            "ii-V-I-vi": ["ii", "V", "I", "vi"],
-            "I-vi-IV-V": ["I", "vi", "IV", "V"],
-            "I-iii-vi-IV": ["I", "iii", "vi", "IV"],
-            "I-V-vi-iii-IV-I-IV-V": ["I", "V", "vi", "iii", "IV", "I", "IV", "V"]
-        }
-        
-        pattern = progression_patterns[progression_type]
+        pattern = self.progression_combo.currentText()
         
         # Calculate actual chords based on the pattern and root
         composer = ChordComposer()
-        self.progression_chords = composer.calculate_progression_chords(root, pattern)
+        self.progression_chords = composer.calculate_progression_chords(root, pattern, self.key_mode)
         
         # Update the display
-        progression_text = " → ".join([f"{chord[0][:-1] if len(chord[0]) > 1 and chord[0][-1].isdigit() else chord[0]} {chord[1]}" for chord in self.progression_chords])
+        progression_text = " → ".join(progression.chord_label(chord) for chord in self.progression_chords)
         self.progression_display.setText(progression_text)
-        self.play_button.setEnabled(True)
-
-    # Adjust note names based on current octave shift
-    def adjust_notes_for_octave_shift(self, chord_notes):
-        # Adjust chord note names to reflect the current octave shift
-        adjusted_notes = []
-        for note in chord_notes:
-            if len(note) > 1 and note[-1].isdigit():
-                base_note = note[:-1]
-                original_octave = int(note[-1])
-                new_octave = original_octave + self.main_window.octave_shift
-                adjusted_notes.append(base_note + str(new_octave))
-            else:
-                adjusted_notes.append(note)
-        return adjusted_notes
+        self.compile_timeline()
+        self.play_button.setEnabled(bool(self.timeline))
+        self.export_button.setEnabled(bool(self.timeline))
+
+    # Resolve the progression into a playback timeline
+    def compile_timeline(self):
+        # Every chord's notes are looked up once here, so playback and
+        # looping never compose chords
+        if not self.progression_chords:
+            return
+        if self.voice_leading_checkbox.isChecked():
+            entries = voice_leading.voice_progression(self.progression_chords)
+        else:
+            entries = [
+                chord_index.lookup_name(chord.root, chord.chord_type, chord.inversion)
+                for chord in self.progression_chords
+            ]
+
+        # The selected meter, not the clock's: while playing, a new time
+        # signature only reaches the clock at the next bar line
+        self.timeline = []
+        beats_per_bar, _ = TIME_SIGNATURES[self.time_signature_combo.currentText()]
+        for chord, entry in zip(self.progression_chords, entries):
+            if entry is None:
+                print(f"Error: Chord '{chord.root} {chord.chord_type}' is out of range.")
+                continue
+            self.timeline.append(TimelineStep(len(self.timeline) * beats_per_bar, chord, entry.sharp, entry.midi))
+        self.timeline_beats = len(self.timeline) * beats_per_bar
+
+    # Export the compiled timeline as a Standard MIDI File
+    def export_midi(self):
+        if not self.timeline:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export MIDI", "progression.mid", "MIDI files (*.mid)")
+        if not path:
+            return
+
+        beats_per_bar, beat_unit = TIME_SIGNATURES[self.time_signature_combo.currentText()]
+        beat_ms = self.clock.seconds_per_beat * 1000
+        bar_ms = beats_per_bar * beat_ms
+        velocity = min(int(self.main_window.volume * 1.27), 127)
+        shift = self.main_window.octave_shift * 12
+
+        events = []
+        for step in self.timeline:
+            start_ms = step.beat * beat_ms
+            for midi_note in step.midi:
+                midi_note = max(0, min(127, midi_note + shift))
+                events.append((start_ms, NOTE_ON, 0, midi_note, velocity))
+                events.append((start_ms + bar_ms, NOTE_OFF, 0, midi_note, 0))
+
+        # The file's tempo is in quarter notes
+        try:
+            write_midi(path, events, self.clock.bpm * 4 / beat_unit, beats_per_bar, beat_unit)
+        except OSError as error:
+            print(f"Error: could not export MIDI file: {error}")
+
+    def on_time_signature_changed(self, text):
+        # While playing, the clock switches at the next bar line
+        beats_per_bar, _ = TIME_SIGNATURES[text]
+        self.clock.set_time_signature(beats_per_bar)
+        self.compile_timeline()
+
+    def on_loop_toggled(self, checked):
+        # Looping can be switched on or off while playing
+        if self.clock.is_running():
+            self.is_looping = checked
+            self.clock.set_loop(checked)
 
     # Play the generated chord progression
     def play_progression(self):
-        if not self.progression_chords:
+        if not self.timeline:
             return
             
         self.current_chord_index = 0
@@ -148,133 +247,99 @@ class ChordProgressionWindow(QWidget):
         
         # Get loop setting from checkbox
         self.is_looping = self.loop_checkbox.isChecked()
-        
-        # Start timer to play chords sequentially
-        self.play_timer = QTimer()
-        self.play_timer.timeout.connect(self.play_next_chord)
-        self.play_timer.start(1500)  # 1.5 seconds per chord
-        
-        # Play the first chord immediately
-        self.play_next_chord()
+
+        # Every step is scheduled against its absolute beat time
+        self.clock.start([step.beat for step in self.timeline], self.timeline_beats, self.is_looping)
     
-    # Play each chord in the progression sequence
-    def play_next_chord(self):
-        # Check if we've played all chords
-        if self.current_chord_index >= len(self.progression_chords):
-            # If looping is enabled, reset to the beginning
-            if self.is_looping:
-                self.current_chord_index = 0
-            else:
-                self.stop_progression()
-                return
+    # Play one step of the compiled timeline (called by the clock)
+    def play_step(self, index):
+        step = self.timeline[index]
+        self.current_chord_index = index
+        self.last_played_step = step
             
         # Reset previous chord highlights
         self.reset_highlights()
-        
-        # Get current chord
-        current_chord = self.progression_chords[self.current_chord_index]
-        root, chord_type = current_chord
-        
-        # Use chord composer to get the notes
-        composer = ChordComposer()
-        _, chord_notes = composer.composeChord(root, chord_type)
-        
-        # Store the current chord info for octave updates
-        self.last_played_chord_notes = chord_notes
-        self.last_played_chord_info = (root, chord_type)
+        self.show_step(step)
 
-        # Adjust notes for current octave shift and update display
-        adjusted_notes = self.adjust_notes_for_octave_shift(chord_notes)
-        display_notes = [note[:-1] if len(note) > 1 and note[-1].isdigit() else note for note in adjusted_notes]
-        self.notes_display.setText("Notes: " + " ".join(display_notes))
-
-        # Update the main window's note label with octave-adjusted notes
-        chord_notes_text = " ".join(adjusted_notes)
-        display_root = root[:-1] if len(root) > 1 and root[-1].isdigit() else root
-        self.main_window.notelabel.setText(f"{display_root} {chord_type}: {chord_notes_text}")
-
-        # Update progression display to show current chord with octave adjustment
-        if len(root) > 1 and root[-1].isdigit():
-            base_note = root[:-1]
-            original_octave = int(root[-1])
-            adjusted_octave = original_octave + self.main_window.octave_shift
-            display_root_with_octave = f"{base_note}{adjusted_octave}"
-        else:
-            display_root_with_octave = root
-        
-        progression_status = f"Playing: {display_root_with_octave} {chord_type} ({self.current_chord_index + 1}/{len(self.progression_chords)})"
+        # Progression display with the current chord
+        root, chord_type = step.chord.root, step.chord.chord_type
+        display_root_with_octave = pitch.shift_octave(root, self.main_window.octave_shift)
+        progression_status = f"Playing: {display_root_with_octave} {chord_type} ({index + 1}/{len(self.timeline)})"
         if self.is_looping:
             progression_status += " (Looping)"
         self.progression_display.setText(progression_status)
-        
-        # Play all notes simultaneously
-        self.play_chord_simultaneously(chord_notes)
-        
-        self.current_chord_index += 1
+
+        # Each chord sounds for its bar
+        self.play_chord_simultaneously(step.midi, int(self.clock.bar_seconds() * 1000))
+
+    # Show a step's notes with the current octave shift
+    def show_step(self, step):
+        midi_notes = [midi_note + self.main_window.octave_shift * 12 for midi_note in step.midi]
+        display_notes = [pitch.SHARP_NAMES[midi_note % 12] for midi_note in midi_notes]
+        self.notes_display.setText("Notes: " + " ".join(display_notes))
+
+        # Update the main window's note label with octave-adjusted notes
+        chord_notes_text = " ".join(pitch.midi_to_name(midi_note) for midi_note in midi_notes)
+        display_root = pitch.strip_octave(step.chord.root)
+        self.main_window.notelabel.setText(f"{display_root} {step.chord.chord_type}: {chord_notes_text}")
 
     # Play all notes in a chord at once
-    def play_chord_simultaneously(self, chord_notes):
-        for note in chord_notes:
-            button = self.main_window.buttons.get(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(0, 100, 255)")  # Blue highlight
-                
-                # Get the base note and octave
-                if len(note) > 1 and note[-1].isdigit():
-                    base_note = note[:-1]
-                    original_octave = int(note[-1])
-                    
-                    # Apply the octave shift
-                    new_octave = original_octave + self.main_window.octave_shift
-                    
-                    # Create adjusted note name for display
-                    adjusted_note = base_note + str(new_octave)
-                    
-                    # Display the adjusted note if octave shift is in effect
-                    if self.main_window.octave_shift != 0:
-                        # Update the notes display with octave-shifted note names
-                        current_text = self.notes_display.text()
-                        if note in current_text:
-                            self.notes_display.setText(current_text.replace(note, adjusted_note))
-                
-                # Play the sound with the current octave shift
-                self.main_window.notes_sound(note, self.main_window.volume, self.main_window.octave_shift)
+    def play_chord_simultaneously(self, midi_notes, duration_ms=500):
+        # Highlight the keys, then dispatch the whole chord in one batch
+        keys = [pitch.midi_to_name(midi_note) for midi_note in midi_notes]
+        keys = [key for key in keys if key in self.main_window.buttons]
+        self.main_window.highlights.add(PROGRESSION, keys)  # Blue highlight
+
+        # Play the sound with the current octave shift
+        shift = self.main_window.octave_shift * 12
+        velocity = min(int(self.main_window.volume * 1.27), 127)
+        self.main_window.sound_engine.play_chord(
+            [midi_note + shift for midi_note in midi_notes], velocity, duration_ms=duration_ms
+        )
 
     # Update display when octave changes (called from main window)
     def update_octave_display(self):
-        # Update the notes display when octave shift changes
-        if hasattr(self, 'last_played_chord_notes') and self.last_played_chord_notes:
-            adjusted_notes = self.adjust_notes_for_octave_shift(self.last_played_chord_notes)
-            display_notes = [note[:-1] if len(note) > 1 and note[-1].isdigit() else note for note in adjusted_notes]
-            self.notes_display.setText("Notes: " + " ".join(display_notes))
-            
-        # Update main window label
-        if hasattr(self, 'last_played_chord_info'):
-            root, chord_type = self.last_played_chord_info
-            display_root = root[:-1] if len(root) > 1 and root[-1].isdigit() else root
-            chord_notes_text = " ".join(adjusted_notes)
-            self.main_window.notelabel.setText(f"{display_root} {chord_type}: {chord_notes_text}")
-
-    # Reset all piano key highlights
+        # Update the notes display and main window label when octave shift changes
+        if self.last_played_step is not None:
+            self.show_step(self.last_played_step)
+
+    # Reset the progression's piano key highlights
     def reset_highlights(self):
-        self.main_window.reset_all_piano_highlights()
+        self.main_window.highlights.clear(PROGRESSION)
+
+    # The last step of a non-looping progression has had its bar
+    def on_progression_finished(self):
+        QTimer.singleShot(int(self.clock.bar_seconds() * 1000), self.stop_if_finished)
+
+    def stop_if_finished(self):
+        # Unless playback was restarted in the meantime
+        if not self.clock.is_running() and self.stop_button.isEnabled():
+            self.stop_progression()
     
     # Stop progression playback
     def stop_progression(self):
-        if hasattr(self, 'play_timer') and self.play_timer.isActive():
-            self.play_timer.stop()
+        self.clock.stop()
         
         # Reset looping flag
         self.is_looping = False
         
         self.reset_highlights()
-        self.play_button.setEnabled(True)
+        self.play_button.setEnabled(bool(self.timeline))
         self.stop_button.setEnabled(False)
         
         # Restore the progression display
-        progression_text = " → ".join([f"{chord[0]} {chord[1]}" for chord in self.progression_chords])
+        progression_text = " → ".join(progression.chord_label(chord) for chord in self.progression_chords)
         self.progression_display.setText(progression_text)
         self.notes_display.setText("Notes: ")  # Clear the notes display
+        self.last_played_step = None
+
+        # Report how closely the chords followed the beat
+        stats = self.clock.stats()
+        if stats["ticks"]:
+            self.timing_display.setText(
+                f"Timing: {stats['ticks']} chords, {stats['beats']} beats, {stats['mean_jitter_ms']:.1f} ms mean / "
+                f"{stats['max_jitter_ms']:.1f} ms max late"
+            )
 
         # Reset the main window's note label
         self.main_window.notelabel.setText("No chord selected")
@@ -285,12 +350,9 @@ class ChordProgressionWindow(QWidget):
         self.main_window.mw.statusBar().clearMessage()
         self.main_window.notelabel.setText("No chord selected")
         
-        # Stop any active progression
-        if hasattr(self, 'play_timer') and self.play_timer.isActive():
-            self.play_timer.stop()
-        
-        # Reset piano highlights
-        self.reset_highlights()
+        # Stop any active progression; the window is reused, so its
+        # Play/Stop buttons must be back in their stopped state
+        self.stop_progression()
         
         # Accept the close event
-        event.accept()
\ No newline at end of file
+        event.accept()
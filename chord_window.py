@@ -2,6 +2,8 @@ from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 from chord_composer import ChordComposer
 from note_converter import NoteConverter
+from music_theory import pitch
+from keyboard_system.highlight_model import CHORD
 
 class ChordWindow(QWidget):
     # Chord finder window UI
@@ -87,7 +89,7 @@ class ChordWindow(QWidget):
             # Convert chord notes to flat notation for display
             display_notes = []
             for note in chord:
-                note_without_octave = note[:-1] if len(note) > 1 and note[-1].isdigit() else note
+                note_without_octave = pitch.strip_octave(note)
                 flat_note = NoteConverter.convert_for_diminished_chord(note_without_octave)
                 display_notes.append(flat_note)
             display_chord_name = " ".join(display_notes)
@@ -101,11 +103,17 @@ class ChordWindow(QWidget):
     # Highlight piano keys one by one for the generated chord
     def highlightPianoButtons(self):
         self.noteIndex = 0
+
+        # Sound the whole chord as one batch, strummed 50ms apart in synth time
+        self.main_window.chord_sound(
+            self.chord, self.main_window.volume, self.main_window.octave_shift, strum_ms=50
+        )
+
         self.timer = QTimer()
         self.timer.timeout.connect(self.playNextNote)
-        self.timer.start(50)  # 50ms interval between notes
+        self.timer.start(50)  # 50ms interval between highlighted notes
 
-    # Play each note in the chord sequentially
+    # Highlight each note in the chord sequentially (sound is already scheduled)
     def playNextNote(self):
         if self.noteIndex < len(self.chord):
             note = self.chord[self.noteIndex]
@@ -115,29 +123,24 @@ class ChordWindow(QWidget):
             button = self.main_window.buttons.get(piano_note)
             
             if button:
-                button.setStyleSheet("background-color: rgb(255,165,0)")  # Orange highlight
+                self.main_window.highlights.add(CHORD, [piano_note])  # Orange highlight
                 
                 # If octave shift is active, update the display to show adjusted note names
-                if self.main_window.octave_shift != 0 and len(note) > 1 and note[-1].isdigit():
-                    base_note = note[:-1]
-                    original_octave = int(note[-1])
-                    new_octave = original_octave + self.main_window.octave_shift
-                    adjusted_note = base_note + str(new_octave)
+                if self.main_window.octave_shift != 0 and pitch.note_to_midi(note) is not None:
+                    adjusted_note = pitch.shift_octave(note, self.main_window.octave_shift)
                     
                     # Update the chord label to show octave-shifted notes
                     current_text = self.label.text()
                     if "Chord composed:" in current_text and note in current_text:
                         self.label.setText(current_text.replace(note, adjusted_note))
-                
-                self.main_window.notes_sound(note, self.main_window.volume, self.main_window.octave_shift)
             self.noteIndex += 1
         else:
             self.timer.stop()
             QTimer.singleShot(3000, self.reset)  # Reset highlights after 3 seconds
 
-    # Reset all highlighted piano keys to their original state
+    # Reset the chord's highlighted piano keys to their original state
     def reset(self):
-        self.main_window.reset_all_piano_highlights()
+        self.main_window.highlights.clear(CHORD)
         
         if hasattr(self, "timer") and self.timer.isActive():
             self.timer.stop()
@@ -0,0 +1,10 @@
+from PyQt5.QtGui import QGuiApplication
+
+DEFAULT_REFRESH_RATE = 60.0  # Hz, used when the screen does not report one
+
+
+def frame_interval_ms():
+    # Duration of one display frame in milliseconds
+    screen = QGuiApplication.primaryScreen()
+    rate = screen.refreshRate() if screen is not None else 0
+    return max(1, int(1000 / (rate if rate > 0 else DEFAULT_REFRESH_RATE)))
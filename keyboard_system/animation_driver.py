@@ -0,0 +1,86 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+from frame_timing import frame_interval_ms
+
+
+class AnimationDriver(QObject):
+    # One frame clock for every running animation
+    #
+    # Each animation belongs to a key and is advanced by calling its step
+    # function with the progress (0.0 to 1.0) of its duration. All of them
+    # are advanced together in one timer tick per display frame. Starting
+    # an animation for a key that is already animating restarts it, so a
+    # quick second press can never leave the first one unfinished. The
+    # timer stops while nothing is animating.
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.interval_ms = frame_interval_ms()
+        self._animations = {}    # Key -> (start time, duration in seconds, step, finished)
+        self._last_tick = None
+
+        # Counters
+        self.started = 0
+        self.frames = 0
+        self.dropped_frames = 0
+        self.frame_time_total = 0.0
+        self.frame_time_max = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(self.interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def animate(self, key, duration_ms, step, finished=None):
+        # Run step(key, progress) every frame for duration_ms, then finished(key)
+        self.started += 1
+        self._animations[key] = (time.perf_counter(), duration_ms / 1000.0, step, finished)
+        step(key, 0.0)
+        if not self._timer.isActive():
+            self._last_tick = time.perf_counter()
+            self._timer.start()
+
+    def stop(self, key):
+        # Drop a key's animation without finishing it
+        self._animations.pop(key, None)
+
+    def active(self):
+        # Number of running animations
+        return len(self._animations)
+
+    def _tick(self):
+        # Advance every animation by one frame
+        now = time.perf_counter()
+        gap_ms = (now - self._last_tick) * 1000.0
+        if gap_ms > self.interval_ms * 1.5:
+            self.dropped_frames += int(gap_ms / self.interval_ms) - 1
+        self._last_tick = now
+
+        for key, (start, duration, step, finished) in list(self._animations.items()):
+            progress = min(1.0, (now - start) / duration) if duration > 0 else 1.0
+            step(key, progress)
+            if progress >= 1.0:
+                del self._animations[key]
+                if finished is not None:
+                    finished(key)
+
+        if not self._animations:
+            self._timer.stop()
+
+        frame_time = (time.perf_counter() - now) * 1000.0
+        self.frames += 1
+        self.frame_time_total += frame_time
+        self.frame_time_max = max(self.frame_time_max, frame_time)
+
+    def stats(self):
+        # Work done per tick and frames missed while animating
+        return {
+            "animations_started": self.started,
+            "active": len(self._animations),
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "mean_frame_ms": self.frame_time_total / self.frames if self.frames else 0.0,
+            "max_frame_ms": self.frame_time_max,
+        }
@@ -0,0 +1,82 @@
+from PyQt5.QtCore import QEvent, QObject, Qt
+from PyQt5.QtWidgets import QApplication, QWidget
+
+KEYBOARD = "keyboard"              # Input pipeline source name
+SUSTAIN_KEY = Qt.Key_Control       # Held down, it works as the sustain pedal
+
+
+class ComputerKeyboard(QObject):
+    # Plays the piano from the computer keyboard with real key-down/key-up
+    #
+    # An application event filter sees raw KeyPress/KeyRelease events for
+    # the main window. Mapped keys hold their note through the input
+    # pipeline until they are released, so several keys make a chord.
+    # Auto-repeat presses are swallowed instead of retriggering the note,
+    # and Ctrl works as a sustain pedal.
+
+    def __init__(self, window, pipeline, sound_engine, key_map, parent=None):
+        super().__init__(parent)
+        self.window = window
+        self.pipeline = pipeline
+        self.sound_engine = sound_engine
+        # Qt key code -> note name, e.g. Qt.Key_Z -> "C4"
+        self.key_map = {ord(key.upper()): note for key, note in key_map.items()}
+        self.enabled = True
+        self.sustain = False
+
+        # Counters
+        self.repeats_ignored = 0
+
+        QApplication.instance().installEventFilter(self)
+
+    def setEnabled(self, enabled):
+        # Learning modes turn the computer keyboard off
+        if not enabled:
+            self.release_all()
+        self.enabled = enabled
+
+    def eventFilter(self, obj, event):
+        event_type = event.type()
+        if event_type in (QEvent.KeyPress, QEvent.KeyRelease):
+            if not self.enabled or not isinstance(obj, QWidget) or obj.window() is not self.window:
+                return False
+            return self._key_event(event, event_type == QEvent.KeyPress)
+        if event_type == QEvent.WindowDeactivate and obj is self.window:
+            # Key-ups are not delivered to an inactive window
+            self.release_all()
+        return False
+
+    def _key_event(self, event, down):
+        # Returns True when the event was consumed
+        key = event.key()
+        if key == SUSTAIN_KEY:
+            if not event.isAutoRepeat():
+                self._set_sustain(down)
+            return False  # Let Ctrl reach other shortcuts too
+
+        note_name = self.key_map.get(key)
+        if note_name is None:
+            return False
+        if event.isAutoRepeat():
+            self.repeats_ignored += 1
+            return True
+
+        if down:
+            self.pipeline.press(note_name, KEYBOARD, hold=True)
+        else:
+            self.pipeline.release(note_name, KEYBOARD)
+        return True
+
+    def _set_sustain(self, pressed):
+        if pressed != self.sustain:
+            self.sustain = pressed
+            self.sound_engine.set_sustain(pressed)
+
+    def release_all(self):
+        # Release every held key and the pedal
+        for note_name in self.key_map.values():
+            self.pipeline.release(note_name, KEYBOARD)
+        self._set_sustain(False)
+
+    def close(self):
+        QApplication.instance().removeEventFilter(self)
@@ -0,0 +1,88 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from frame_timing import frame_interval_ms
+from music_theory import chord_recognizer
+
+
+class HeldNotes(QObject):
+    # Set of currently held notes from any source (mouse, computer keyboard,
+    # MIDI input) and the chord they form
+    #
+    # Recognition runs on every change, but the changed signal fires at most
+    # once per display frame, so a burst of key events costs one repaint.
+    # The set as it was at the latest key press is kept for display, so a
+    # quick tap or a ragged release still shows the chord that was played.
+
+    # Emitted after the held set changed, coalesced to the frame rate
+    changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.counts = {}         # MIDI note -> number of sources holding it
+        self.matches = []        # Ranked ChordMatch tuples for the held set
+        self.struck_notes = []   # Held notes right after the latest press
+        self.struck_matches = []
+
+        # Counters
+        self.changes = 0
+        self.repaints = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_interval_ms())
+        self._timer.timeout.connect(self._flush)
+
+    def note_held(self, midi):
+        # A source started holding a note
+        self.counts[midi] = self.counts.get(midi, 0) + 1
+        self._update()
+        self.struck_notes = self.notes()
+        self.struck_matches = self.matches
+
+    def note_released(self, midi):
+        # A source let go of a note
+        count = self.counts.get(midi)
+        if count is None:
+            return
+        if count > 1:
+            self.counts[midi] = count - 1
+        else:
+            del self.counts[midi]
+        self._update()
+
+    def release_all(self):
+        # Forget every held note (e.g., when the window loses focus)
+        if self.counts:
+            self.counts.clear()
+            self._update()
+
+    def notes(self):
+        # Held MIDI notes, lowest first
+        return sorted(self.counts)
+
+    def best_match(self):
+        # Most likely chord for the held notes, or None
+        return self.matches[0] if self.matches else None
+
+    def struck_chord(self):
+        # (notes, best match or None) as of the latest key press
+        return self.struck_notes, (self.struck_matches[0] if self.struck_matches else None)
+
+    def _update(self):
+        self.matches = chord_recognizer.recognize(self.counts)
+        self.changes += 1
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _flush(self):
+        self.repaints += 1
+        self.changed.emit()
+
+    def stats(self):
+        # Held-note counters; changes / repaints shows how much was coalesced
+        return {
+            "held_notes": len(self.counts),
+            "changes": self.changes,
+            "repaints": self.repaints,
+            "frame_interval_ms": self._timer.interval(),
+        }
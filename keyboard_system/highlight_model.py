@@ -0,0 +1,144 @@
+from PyQt5.QtCore import QObject, QTimer
+
+from frame_timing import frame_interval_ms
+
+# Highlight layers, lowest first: a key shows its highest active layer
+QUESTION = "question"        # Learning mode: notes of the question
+CHORD = "chord"              # Chord window: composed chord
+PROGRESSION = "progression"  # Progression window: current chord
+PLAYBACK = "playback"        # MIDI file playback
+SELECTION = "selection"      # Learning mode: keys picked by the user
+HINT = "hint"                # Learning mode: hinted keys
+INCORRECT = "incorrect"      # Learning mode feedback
+CORRECT = "correct"
+PRESSED = "pressed"          # Keys being played
+
+LAYERS = (QUESTION, CHORD, PROGRESSION, PLAYBACK, SELECTION, HINT, INCORRECT, CORRECT, PRESSED)
+
+# Fill colour and border colour of each layer (pressed and playback keys
+# use the keyboard's pressed look; None keeps the key's normal border)
+LAYER_COLORS = {
+    QUESTION: ((70, 130, 255), (50, 100, 200)),
+    CHORD: ((255, 165, 0), None),
+    PROGRESSION: ((0, 100, 255), None),
+    SELECTION: ((150, 100, 255), (120, 80, 200)),
+    HINT: ((255, 220, 100), (210, 170, 60)),
+    INCORRECT: ((255, 100, 100), (200, 80, 80)),
+    CORRECT: ((80, 200, 80), (60, 150, 60)),
+}
+
+
+class HighlightModel(QObject):
+    # Layered highlight state of the piano keys
+    #
+    # Callers add and remove keys on named layers instead of styling
+    # keys. Changes only mark keys dirty; once per display frame the
+    # top layer of each dirty key is compared with what the key shows and
+    # only keys whose look actually changed are repainted. "Reset everything,
+    # then highlight three keys" therefore costs at most a few restyles and
+    # never flickers.
+
+    def __init__(self, keyboard, parent=None):
+        super().__init__(parent)
+        self.keyboard = keyboard                     # KeyboardWidget showing the keys
+        self.layers = {layer: set() for layer in LAYERS}
+        self._shown = {}                             # Key name -> layer shown ("" for none)
+        self._dirty = set()
+
+        # Counters
+        self.events = 0
+        self.flushes = 0
+        self.restyles = 0
+        self.max_restyles_per_flush = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_interval_ms())
+        self._timer.timeout.connect(self.flush)
+
+    # Changes
+
+    def add(self, layer, keys):
+        # Put keys on a layer
+        self.events += 1
+        changed = set(keys) - self.layers[layer]
+        if changed:
+            self.layers[layer] |= changed
+            self._mark(changed)
+
+    def remove(self, layer, keys):
+        # Take keys off a layer
+        self.events += 1
+        changed = set(keys) & self.layers[layer]
+        if changed:
+            self.layers[layer] -= changed
+            self._mark(changed)
+
+    def set_layer(self, layer, keys):
+        # Replace a layer's keys
+        keys = set(keys)
+        self.events += 1
+        changed = keys ^ self.layers[layer]
+        if changed:
+            self.layers[layer] = keys
+            self._mark(changed)
+
+    def clear(self, layer=None):
+        # Empty one layer, or every layer
+        self.events += 1
+        for name in (LAYERS if layer is None else (layer,)):
+            if self.layers[name]:
+                self._mark(self.layers[name])
+                self.layers[name] = set()
+
+    def clear_keys(self, keys):
+        # Take keys off every layer
+        keys = set(keys)
+        self.events += 1
+        for name in LAYERS:
+            changed = self.layers[name] & keys
+            if changed:
+                self.layers[name] -= changed
+                self._mark(changed)
+
+    def _mark(self, keys):
+        self._dirty.update(keys)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    # Rendering
+
+    def top_layer(self, key):
+        # Highest active layer of a key ("" when it shows its normal look)
+        for layer in reversed(LAYERS):
+            if key in self.layers[layer]:
+                return layer
+        return ""
+
+    def flush(self):
+        # Repaint the dirty keys whose visible layer changed
+        self._timer.stop()
+        dirty, self._dirty = self._dirty, set()
+        self.flushes += 1
+        restyled = 0
+        for key in dirty:
+            layer = self.top_layer(key)
+            if self._shown.get(key, "") == layer:
+                continue
+            if not self.keyboard.has_key(key):
+                continue
+            self._shown[key] = layer
+            self.keyboard.set_highlight(key, layer)
+            restyled += 1
+        self.restyles += restyled
+        self.max_restyles_per_flush = max(self.max_restyles_per_flush, restyled)
+
+    def stats(self):
+        # Restyles per change event shows how much work batching saves
+        return {
+            "events": self.events,
+            "flushes": self.flushes,
+            "restyles": self.restyles,
+            "restyles_per_event": self.restyles / self.events if self.events else 0.0,
+            "max_restyles_per_flush": self.max_restyles_per_flush,
+        }
@@ -0,0 +1,145 @@
+import bisect
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from music_theory import pitch
+
+# Input sources (the computer keyboard is "keyboard", see computer_keyboard)
+MOUSE = "mouse"
+SHORTCUT = "shortcut"
+PROGRAM = "program"
+
+# A second press of the same note within this window is the same gesture
+# reported twice (e.g., a press signal and a click signal) and is dropped
+DEDUPE_SECONDS = 0.03
+
+NOTE_DURATION_MS = 500
+
+# Upper bucket edges of the input-to-noteon latency histogram (milliseconds)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, float("inf"))
+
+
+class InputPipeline(QObject):
+    # Single path from every key input source to sound, highlight and label
+    #
+    # Each source (mouse, shortcut, computer keyboard, programmatic) is
+    # normalized into one press/release of a note name with a perf_counter()
+    # timestamp. A press either plays a fixed-length note or, with hold=True,
+    # sounds until its release. Duplicate
+    # reports of one gesture are dropped, the note is sent to the sound
+    # engine once, and the highlight and label stages are fed through the
+    # notePressed / noteReleased signals. The time from input to the noteon
+    # reaching the synth is collected into a latency histogram.
+
+    # Note name and the MIDI note it sounds at
+    notePressed = pyqtSignal(str, int)
+    noteReleased = pyqtSignal(str, int)
+
+    def __init__(self, main_window, parent=None):
+        super().__init__(parent)
+        self.main_window = main_window
+        self._held = {}           # Note name -> (source, MIDI note, hold)
+        self._last_press = {}     # Note name -> timestamp of the last accepted press
+        self._in_flight = deque() # (batch id, input timestamp) awaiting their noteon
+
+        # Counters
+        self.presses = 0
+        self.duplicates = 0
+        self.by_source = {}
+        self.histogram = [0] * len(LATENCY_BUCKETS_MS)
+        self.latency_count = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def press(self, note_name, source, timestamp=None, hold=False):
+        # A key went down; returns False if the event was a duplicate
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        last = self._last_press.get(note_name)
+        if note_name in self._held or (last is not None and timestamp - last < DEDUPE_SECONDS):
+            self.duplicates += 1
+            return False
+
+        midi_note = pitch.note_to_midi(note_name)
+        if midi_note is None:
+            return False
+        midi_note = max(0, min(127, midi_note + self.main_window.octave_shift * 12))
+
+        self._last_press[note_name] = timestamp
+        self._held[note_name] = (source, midi_note, hold)
+        self.presses += 1
+        self.by_source[source] = self.by_source.get(source, 0) + 1
+
+        # Sound stage first, so the highlight and label never delay it
+        velocity = min(int(self.main_window.volume * 1.27), 127)
+        engine = self.main_window.sound_engine
+        if hold:
+            batch_id = engine.hold_note(midi_note, velocity)
+        else:
+            batch_id = engine.play_chord([midi_note], velocity, 0, NOTE_DURATION_MS, owner="keys")
+        if batch_id is not None:
+            self._in_flight.append((batch_id, timestamp))
+        self._collect_latency()
+
+        self.notePressed.emit(note_name, midi_note)
+        return True
+
+    def release(self, note_name, source):
+        # A key came back up; only the source that pressed it releases it
+        held = self._held.get(note_name)
+        if held is None or held[0] != source:
+            return False
+        del self._held[note_name]
+        if held[2]:
+            self.main_window.sound_engine.release_note(held[1])
+        self.noteReleased.emit(note_name, held[1])
+        return True
+
+    def holds(self, note_name):
+        # True while a note pressed with hold=True is down
+        held = self._held.get(note_name)
+        return held is not None and held[2]
+
+    def tap(self, note_name, source=PROGRAM, timestamp=None):
+        # Press and release at once (sources without a key-up, e.g. shortcuts)
+        if self.press(note_name, source, timestamp):
+            self.release(note_name, source)
+
+    def release_all(self):
+        # Let go of every held note (e.g., when the window loses focus)
+        for note_name, (source, _, _) in list(self._held.items()):
+            self.release(note_name, source)
+
+    def _collect_latency(self):
+        # Move batches whose noteon has been sent into the histogram
+        engine = self.main_window.sound_engine
+        while self._in_flight:
+            batch_id, timestamp = self._in_flight[0]
+            sent_at = engine.noteon_time(batch_id)
+            if sent_at is None:
+                if time.perf_counter() - timestamp < 1.0:
+                    return  # Still queued
+                self._in_flight.popleft()  # Cancelled or forgotten
+                continue
+            self._in_flight.popleft()
+            latency = (sent_at - timestamp) * 1000.0
+            self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, latency)] += 1
+            self.latency_count += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def stats(self):
+        # Press counts per source, dropped duplicates and input-to-noteon
+        # latency (histogram keyed by bucket upper edge in ms)
+        self._collect_latency()
+        return {
+            "presses": self.presses,
+            "duplicates": self.duplicates,
+            "by_source": dict(self.by_source),
+            "latency_count": self.latency_count,
+            "mean_latency_ms": self.latency_total / self.latency_count if self.latency_count else 0.0,
+            "max_latency_ms": self.latency_max,
+            "latency_histogram": dict(zip(LATENCY_BUCKETS_MS, self.histogram)),
+        }
@@ -0,0 +1,280 @@
+from PyQt5.QtCore import QObject, QRect, QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QLinearGradient, QPainter, QPen, QPixmap
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+from music_theory import pitch
+from music_theory.voice_leading import KEYBOARD_LOW, KEYBOARD_HIGH
+from keyboard_system.highlight_model import LAYER_COLORS, PRESSED, PLAYBACK
+
+# Full piano range (A0 to C8)
+PIANO_LOW = 21
+PIANO_HIGH = 108
+
+# Black key size relative to a white key
+BLACK_WIDTH_RATIO = 31 / 40
+BLACK_HEIGHT_RATIO = 111 / 181
+
+# Gradient stops of the normal and pressed keys (pressed also shows playback)
+WHITE_KEY = ((255, 255, 255), (240, 240, 240), (210, 210, 210))
+BLACK_KEY = ((40, 40, 40), (20, 20, 20), (5, 5, 5))
+WHITE_KEY_PRESSED = ((210, 230, 255), (150, 200, 255), (100, 180, 255))
+BLACK_KEY_PRESSED = ((80, 100, 120), (40, 60, 100), (20, 40, 80))
+WHITE_BORDER = QColor(0, 0, 0, 200)
+BLACK_BORDER = QColor(0, 0, 0, 255)
+
+
+def is_black(midi):
+    # True for the sharps/flats
+    return "#" in pitch.SHARP_NOTE_NAMES[midi]
+
+
+class KeyButtonAdapter(QObject):
+    # Stands in for the QPushButton a piano key used to be
+    #
+    # Code that looks keys up in Ui_MainWindow.buttons keeps working: the
+    # adapter has the key's objectName and emits pressed, released and
+    # clicked(bool) when the key is played with the mouse.
+
+    pressed = pyqtSignal()
+    released = pyqtSignal()
+    clicked = pyqtSignal(bool)
+
+    def __init__(self, name, keyboard):
+        super().__init__(keyboard)
+        self.setObjectName(name)
+        self.keyboard = keyboard
+
+    def geometry(self):
+        # Key rectangle in keyboard coordinates
+        return self.keyboard.key_rect(self.objectName())
+
+    def update(self):
+        # Repaint just this key
+        self.keyboard.update(self.geometry())
+
+    def click(self):
+        # Play the key as if it was clicked
+        self.pressed.emit()
+        self.released.emit()
+        self.clicked.emit(False)
+
+
+class KeyboardWidget(QWidget):
+    # Piano keyboard drawn by one widget instead of one button per key
+    #
+    # Key rectangles come from geometry tables rebuilt on resize, so the
+    # keyboard fills whatever size it is given and scales to all 88 keys.
+    # A mouse position is hit-tested in constant time: its x picks the
+    # white key and only the black keys on either side of it are checked.
+    # Each key look (colour, highlight layer, size, device pixel ratio) is
+    # rendered to a pixmap once; a highlight change only repaints that
+    # key's rectangle from the cache.
+
+    def __init__(self, low=KEYBOARD_LOW, high=KEYBOARD_HIGH, parent=None):
+        super().__init__(parent)
+        if is_black(low) or is_black(high):
+            raise ValueError("Keyboard range must start and end on white keys")
+        self.low = low
+        self.high = high
+
+        # Geometry tables
+        self.white_keys = [pitch.SHARP_NOTE_NAMES[midi] for midi in range(low, high + 1) if not is_black(midi)]
+        self.black_after = [None] * len(self.white_keys)  # White key index -> black key to its right
+        white_index = -1
+        for midi in range(low, high + 1):
+            if is_black(midi):
+                self.black_after[white_index] = pitch.SHARP_NOTE_NAMES[midi]
+            else:
+                white_index += 1
+        self.white_width = 1.0
+        self.black_width = 1
+        self.black_height = 1
+        self.rects = {}                              # Key name -> QRect
+
+        self.layers = {}                             # Key name -> highlight layer shown
+        self.fades = {}                              # Key name -> pressed look opacity (0.0-1.0)
+        self.buttons = {}                            # Key name -> KeyButtonAdapter
+        for name in self.white_keys + [name for name in self.black_after if name]:
+            self.buttons[name] = KeyButtonAdapter(name, self)
+        self._mouse_key = None
+        self._pixmaps = {}
+
+        # Counters
+        self.paints = 0
+        self.keys_painted = 0
+        self.pixmap_hits = 0
+        self.pixmap_misses = 0
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self._build_geometry()
+
+    # Geometry
+
+    def _build_geometry(self):
+        # Recompute every key rectangle for the current size
+        width, height = self.width(), self.height()
+        self.white_width = (width - 1) / len(self.white_keys)
+        self.black_width = max(1, round(self.white_width * BLACK_WIDTH_RATIO))
+        self.black_height = max(1, round(height * BLACK_HEIGHT_RATIO))
+        self.rects = {}
+        for i, name in enumerate(self.white_keys):
+            left = round(i * self.white_width)
+            # Neighbouring white keys share their border pixel
+            self.rects[name] = QRect(left, 0, round((i + 1) * self.white_width) - left + 1, height)
+            black = self.black_after[i]
+            if black:
+                left = round((i + 1) * self.white_width - self.black_width / 2)
+                self.rects[black] = QRect(left, 0, self.black_width, self.black_height)
+        self._pixmaps.clear()
+
+    def key_rect(self, name):
+        # Rectangle of a key (an empty one for keys not on this keyboard)
+        return self.rects.get(name, QRect())
+
+    def key_at(self, pos):
+        # Key under a point in widget coordinates, or None
+        x, y = pos.x(), pos.y()
+        if x < 0 or y < 0 or x >= self.width() or y >= self.height():
+            return None
+        i = min(int(x // self.white_width), len(self.white_keys) - 1)
+        if y < self.black_height:
+            offset = x - i * self.white_width
+            half = self.black_width / 2
+            if offset >= self.white_width - half and self.black_after[i]:
+                return self.black_after[i]
+            if offset < half and i > 0 and self.black_after[i - 1]:
+                return self.black_after[i - 1]
+        return self.white_keys[i]
+
+    def has_key(self, name):
+        # True for keys on this keyboard
+        return name in self.buttons
+
+    # Highlights
+
+    def set_highlight(self, name, layer):
+        # Show a key with a highlight layer ("" for its normal look)
+        if self.layers.get(name, "") == layer:
+            return
+        if layer:
+            self.layers[name] = layer
+        else:
+            self.layers.pop(name, None)
+        self.update(self.rects[name])
+
+    def set_fade(self, name, level):
+        # Blend the pressed look over a key at an opacity (0.0 removes it)
+        if level > 0.0:
+            self.fades[name] = level
+        elif self.fades.pop(name, None) is None:
+            return
+        self.update(self.rects[name])
+
+    # Painting
+
+    def _key_pixmap(self, name, rect, layer):
+        # Cached rendering of a key in one look
+        black = "#" in name
+        ratio = self.devicePixelRatioF()
+        cache_key = (black, layer, rect.width(), rect.height(), ratio)
+        pixmap = self._pixmaps.get(cache_key)
+        if pixmap is not None:
+            self.pixmap_hits += 1
+            return pixmap
+
+        self.pixmap_misses += 1
+        pixmap = QPixmap(round(rect.width() * ratio), round(rect.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self._draw_key(painter, QRect(0, 0, rect.width(), rect.height()), black, layer)
+        painter.end()
+        self._pixmaps[cache_key] = pixmap
+        return pixmap
+
+    def _draw_key(self, painter, rect, black, layer):
+        # Fill and border of one key, rounded at the bottom
+        border = BLACK_BORDER if black else WHITE_BORDER
+        border_width = 1
+        if layer in (PRESSED, PLAYBACK) or not layer:
+            if layer:
+                stops = BLACK_KEY_PRESSED if black else WHITE_KEY_PRESSED
+            else:
+                stops = BLACK_KEY if black else WHITE_KEY
+            brush = QLinearGradient(rect.topLeft(), rect.bottomRight())
+            for position, color in zip((0.0, 0.5, 1.0), stops):
+                brush.setColorAt(position, QColor(*color))
+        else:
+            fill, layer_border = LAYER_COLORS[layer]
+            brush = QColor(*fill)
+            if layer_border is not None:
+                border = QColor(*layer_border)
+                border_width = 2
+
+        radius = 2 if black else 3
+        inset = border_width / 2
+        painter.setClipRect(rect)
+        painter.setPen(QPen(border, border_width))
+        painter.setBrush(brush)
+        # Extend the shape upwards so only the bottom corners are rounded
+        painter.drawRoundedRect(
+            QRectF(rect.adjusted(0, -radius, 0, 0)).adjusted(inset, inset, -inset, -inset), radius, radius
+        )
+
+    def paintEvent(self, event):
+        # Redraw the keys inside the dirty rectangle, white keys first
+        self.paints += 1
+        area = event.rect()
+        first = max(0, int(area.left() // self.white_width) - 1)
+        last = min(len(self.white_keys) - 1, int(area.right() // self.white_width) + 1)
+        painter = QPainter(self)
+        names = self.white_keys[first:last + 1] + [name for name in self.black_after[first:last + 1] if name]
+        for name in names:
+            rect = self.rects[name]
+            if rect.intersects(area):
+                layer = self.layers.get(name, "")
+                painter.drawPixmap(rect.topLeft(), self._key_pixmap(name, rect, layer))
+                level = self.fades.get(name)
+                if level is not None and layer != PRESSED:
+                    painter.setOpacity(level)
+                    painter.drawPixmap(rect.topLeft(), self._key_pixmap(name, rect, PRESSED))
+                    painter.setOpacity(1.0)
+                self.keys_painted += 1
+        painter.end()
+
+    def resizeEvent(self, event):
+        self._build_geometry()
+        super().resizeEvent(event)
+
+    # Mouse
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton or self._mouse_key is not None:
+            return
+        name = self.key_at(event.pos())
+        if name is not None:
+            self._mouse_key = name
+            self.buttons[name].pressed.emit()
+
+    def mouseReleaseEvent(self, event):
+        # Like a button: released always, clicked only when let go over the key
+        if event.button() != Qt.LeftButton or self._mouse_key is None:
+            return
+        name, self._mouse_key = self._mouse_key, None
+        button = self.buttons[name]
+        button.released.emit()
+        if self.key_at(event.pos()) == name:
+            button.clicked.emit(False)
+
+    def stats(self):
+        # Paint events, keys drawn and how often the pixmap cache was enough
+        lookups = self.pixmap_hits + self.pixmap_misses
+        return {
+            "paints": self.paints,
+            "keys_painted": self.keys_painted,
+            "pixmaps_cached": len(self._pixmaps),
+            "pixmap_hits": self.pixmap_hits,
+            "pixmap_misses": self.pixmap_misses,
+            "pixmap_hit_rate": self.pixmap_hits / lookups if lookups else 0.0,
+        }
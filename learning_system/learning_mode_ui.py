@@ -1,6 +1,7 @@
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWidgets import *
 from note_converter import NoteConverter
+from sound_engine import SoundEngine
 from learning_system.modes.missing_note import MissingNoteMode
 from learning_system.difficulty_manager import DifficultyManager
 from learning_system.modes.chord_construction import ChordConstructionMode
@@ -47,11 +48,21 @@ class LearningModeUI:
         piano_note = NoteConverter.convert_for_piano_button(note)
         self.main_window.notes_sound(piano_note, volume, octave_shift)
 
-    def highlight_note_on_piano(self, note, style):
-        # Highlight a note on the piano with automatic notation conversion
-        button = self.get_piano_button_for_note(note)
-        if button:
-            button.setStyleSheet(style)
+    def play_chord_with_conversion(self, notes, volume=None):
+        # Play a whole chord at once; repeated chords are served from the
+        # sound engine's render cache
+        if volume is None:
+            volume = self.main_window.volume
+
+        midi_notes = [SoundEngine.note_to_midi(NoteConverter.convert_for_piano_button(note)) for note in notes]
+        midi_notes = sorted(midi_note for midi_note in midi_notes if midi_note is not None)
+        self.main_window.sound_engine.play_rendered_chord(midi_notes, volume)
+
+    def highlight_note_on_piano(self, note, layer):
+        # Put a note on a highlight layer with automatic notation conversion
+        piano_note = NoteConverter.convert_for_piano_button(note)
+        if piano_note in self.main_window.buttons:
+            self.main_window.highlights.add(layer, [piano_note])
 
     def is_same_note(self, note1, note2, chord_type=None):
         # Compare two notes considering enharmonic equivalents
@@ -64,6 +75,7 @@ class LearningModeUI:
     def create_learning_widgets(self):
         # Create all learning mode UI elements
         centralwidget = self.main_window.centralwidget
+        panel = self.main_window.controlsPanel  # Below the keyboard
         
         # Header area - Mode selection and progress
         self.learning_widgets['header'] = QWidget(centralwidget)
@@ -103,8 +115,8 @@ class LearningModeUI:
         header_layout.addWidget(self.exit_button)
         
         # Question display area (replaces the note label area)
-        self.learning_widgets['question'] = QLabel(centralwidget)
-        self.learning_widgets['question'].setGeometry(80, 230, 480, 40)
+        self.learning_widgets['question'] = QLabel(panel)
+        self.learning_widgets['question'].setGeometry(80, 19, 480, 40)
         self.learning_widgets['question'].setAlignment(Qt.AlignCenter)
         self.learning_widgets['question'].setStyleSheet('''
             border: 2px solid #4a90e2;
@@ -118,8 +130,8 @@ class LearningModeUI:
         self.learning_widgets['question'].setText("Click 'Start Session' to begin!")
         
         # Control buttons area (below piano)
-        self.learning_widgets['controls'] = QWidget(centralwidget)
-        self.learning_widgets['controls'].setGeometry(120, 275, 400, 35)
+        self.learning_widgets['controls'] = QWidget(panel)
+        self.learning_widgets['controls'].setGeometry(120, 64, 400, 35)
         controls_layout = QHBoxLayout(self.learning_widgets['controls'])
         controls_layout.setContentsMargins(0, 0, 0, 0)
         
@@ -149,15 +161,15 @@ class LearningModeUI:
         controls_layout.addWidget(self.next_button)
         
         # Answer area (multiple choice buttons)
-        self.learning_widgets['answers'] = QWidget(centralwidget)
-        self.learning_widgets['answers'].setGeometry(80, 320, 480, 50)
+        self.learning_widgets['answers'] = QWidget(panel)
+        self.learning_widgets['answers'].setGeometry(80, 109, 480, 50)
         self.answer_layout = QVBoxLayout(self.learning_widgets['answers'])
         self.answer_layout.setContentsMargins(0, 0, 0, 0)
         self.answer_buttons = []
         
         # Status bar (bottom)
-        self.learning_widgets['status'] = QLabel(centralwidget)
-        self.learning_widgets['status'].setGeometry(20, 380, 600, 20)
+        self.learning_widgets['status'] = QLabel(panel)
+        self.learning_widgets['status'].setGeometry(20, 169, 600, 20)
         self.learning_widgets['status'].setAlignment(Qt.AlignCenter)
         self.learning_widgets['status'].setStyleSheet("color: #666; font-size: 12px;")
         self.learning_widgets['status'].setText("Select difficulty and click 'Start Session'")
@@ -3,6 +3,8 @@ from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QMessageBox
 from chord_composer import ChordComposer
 from learning_system.difficulty_manager import DifficultyManager
+from music_theory import chord_recognizer, pitch
+from keyboard_system.highlight_model import CORRECT, INCORRECT, SELECTION
 
 class ChordConstructionMode:
     # Mode 3: User builds a chord by clicking piano keys
@@ -90,9 +92,7 @@ class ChordConstructionMode:
             
             # Highlight the selected note in purple
             # Use learning_ui method to get correct piano button (handles conversion)
-            button = self.learning_ui.get_piano_button_for_note(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(150, 100, 255); border: 2px solid rgb(120, 80, 200);")
+            self.learning_ui.highlight_note_on_piano(note, SELECTION)
     
     def remove_note_selection(self, note):
         # Remove a note from user's chord construction
@@ -103,7 +103,7 @@ class ChordConstructionMode:
             # Use learning_ui method to get correct piano button (handles conversion)
             button = self.learning_ui.get_piano_button_for_note(note)
             if button:
-                self.main_window._reset_button(button)
+                self.main_window.highlights.remove(SELECTION, [button.objectName()])
     
     def clear_all_selections(self):
         # Clear all user selections
@@ -120,9 +120,7 @@ class ChordConstructionMode:
     
     def play_target_chord(self):
         # Play the target chord (for feedback)
-        for note in self.target_chord_notes:
-            # Use learning_ui method to play note with conversion
-            self.learning_ui.play_note_with_conversion(note, self.main_window.volume, 0)
+        self.learning_ui.play_chord_with_conversion(self.target_chord_notes, self.main_window.volume)
 
     def enable_submit_button(self):
         # Enable submit button after user makes selections
@@ -160,13 +158,10 @@ class ChordConstructionMode:
         if not self.user_selected_notes:
             return None
         
-        # Convert user selection to set for comparison, accounting for enharmonic equivalents
-        user_chord_set = set(self.user_selected_notes)
-        target_chord_set = set(self.target_chord_notes)
-        
-        # Check if user's chord matches the target chord, considering enharmonic equivalents
+        # Grade the exact keys; the recognizer only names what was built
         chord_type = self.current_question.get("chord_type")
-        is_correct = self._compare_chord_sets(user_chord_set, target_chord_set, chord_type)
+        matches = self.recognize_user_chord()
+        is_correct = self._is_target_chord()
         
         # Show visual feedback
         if is_correct:
@@ -183,6 +178,9 @@ class ChordConstructionMode:
         # Create user answer string for display
         user_notes = [self.learning_ui.get_note_display_name(note, chord_type) for note in self.user_selected_notes]
         user_answer_text = " ".join(sorted(user_notes))
+        if matches:
+            built = chord_recognizer.chord_name(matches[0], flat=chord_type == "diminished")
+            user_answer_text += f" ({built})"
         
         # Return result data
         return {
@@ -192,31 +190,26 @@ class ChordConstructionMode:
             "score": score
         }
     
-    def _compare_chord_sets(self, user_set, target_set, chord_type):
-        # Compare two chord sets considering enharmonic equivalents
-        if len(user_set) != len(target_set):
-            return False
-        
-        # For each note in target set, check if there's an enharmonic equivalent in user set
-        for target_note in target_set:
-            found_match = False
-            for user_note in user_set:
-                if self.learning_ui.is_same_note(target_note, user_note, chord_type):
-                    found_match = True
-                    break
-            if not found_match:
-                return False
-        
-        return True
+    def recognize_user_chord(self):
+        # Ranked chord readings of the selected notes (enharmonic spellings
+        # map to the same MIDI number)
+        midi_notes = [pitch.note_to_midi(note) for note in self.user_selected_notes]
+        return chord_recognizer.recognize(note for note in midi_notes if note is not None)
+
+    def _is_target_chord(self):
+        # Correct when the selection is exactly the target chord's keys: the
+        # same number of notes at the same pitches (enharmonic spellings of
+        # a key are the same MIDI note)
+        user_notes = [pitch.note_to_midi(note) for note in self.user_selected_notes]
+        target_notes = {pitch.note_to_midi(note) for note in self.target_chord_notes}
+        return len(user_notes) == len(target_notes) and set(user_notes) == target_notes
 
     def show_correct_feedback(self):
         # Show green highlighting for correct answer
         # Show all target chord notes in green
         for note in self.target_chord_notes:
             # Use learning_ui method to get correct piano button (handles conversion)
-            button = self.learning_ui.get_piano_button_for_note(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(80, 200, 80); border: 2px solid rgb(60, 150, 60);")
+            self.learning_ui.highlight_note_on_piano(note, CORRECT)
         
         # Play the correct chord
         QTimer.singleShot(1800, self.play_target_chord)
@@ -226,9 +219,7 @@ class ChordConstructionMode:
         # Show user's wrong selections in red
         for note in self.user_selected_notes:
             # Use learning_ui method to get correct piano button (handles conversion)
-            button = self.learning_ui.get_piano_button_for_note(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(255, 100, 100); border: 2px solid rgb(200, 80, 80);")
+            self.learning_ui.highlight_note_on_piano(note, INCORRECT)
         
         # After 1.5 seconds, show correct answer in green
         QTimer.singleShot(800, self.show_correct_feedback)
@@ -1,6 +1,7 @@
 from PyQt5.QtCore import QTimer
 from chord_composer import ChordComposer
 from learning_system.difficulty_manager import DifficultyManager
+from keyboard_system.highlight_model import CORRECT, INCORRECT, QUESTION
 
 class ChordIdentificationMode:
     # Mode 1: User identifies highlighted chord from multiple choice options
@@ -59,15 +60,11 @@ class ChordIdentificationMode:
         # Highlight chord notes in blue
         for note in self.current_chord_notes:
             # Use learning_ui method to get correct piano button (handles conversion)
-            button = self.learning_ui.get_piano_button_for_note(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(70, 130, 255); border: 2px solid rgb(50, 100, 200);")
+            self.learning_ui.highlight_note_on_piano(note, QUESTION)
     
     def play_question_chord(self):
         # Play the question chord sound
-        for note in self.current_chord_notes:
-            # Use learning_ui method to play note with conversion
-            self.learning_ui.play_note_with_conversion(note, self.main_window.volume, 0)
+        self.learning_ui.play_chord_with_conversion(self.current_chord_notes, self.main_window.volume)
     
     def replay_chord(self):
         # Replay the current question chord
@@ -102,18 +99,14 @@ class ChordIdentificationMode:
         # Show green highlighting for correct answer
         for note in self.current_chord_notes:
             # Use learning_ui method to get correct piano button (handles conversion)
-            button = self.learning_ui.get_piano_button_for_note(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(80, 200, 80); border: 2px solid rgb(60, 150, 60);")
+            self.learning_ui.highlight_note_on_piano(note, CORRECT)
     
     def show_incorrect_feedback(self):
         # Show red highlighting for incorrect answer, then show correct answer
         # First show red (incorrect)
         for note in self.current_chord_notes:
             # Use learning_ui method to get correct piano button (handles conversion)
-            button = self.learning_ui.get_piano_button_for_note(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(255, 100, 100); border: 2px solid rgb(200, 80, 80);")
+            self.learning_ui.highlight_note_on_piano(note, INCORRECT)
         
         # After 1 second, show correct answer in green
         QTimer.singleShot(1000, self.show_correct_feedback)
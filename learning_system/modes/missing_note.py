@@ -3,6 +3,7 @@ from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QMessageBox
 from chord_composer import ChordComposer
 from learning_system.difficulty_manager import DifficultyManager
+from keyboard_system.highlight_model import CORRECT, INCORRECT, QUESTION, SELECTION
 
 class MissingNoteMode:
     # Mode 2: User finds the missing note to complete a chord
@@ -89,24 +90,18 @@ class MissingNoteMode:
         
         # Highlight present notes in blue
         for note in self.incomplete_chord_notes:
-            button = self.learning_ui.get_piano_button_for_note(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(70, 130, 255); border: 2px solid rgb(50, 100, 200);")
+            self.learning_ui.highlight_note_on_piano(note, QUESTION)
         
         # Highlight missing note position with a subtle indicator (optional - shows where it should go)
         # We'll skip this for now to make it more challenging
     
     def play_incomplete_chord(self):
         # Play the incomplete chord sound
-        for note in self.incomplete_chord_notes:
-            # Use learning_ui method to play note with conversion
-            self.learning_ui.play_note_with_conversion(note, self.main_window.volume, 0)
+        self.learning_ui.play_chord_with_conversion(self.incomplete_chord_notes, self.main_window.volume)
     
     def play_complete_chord(self):
         # Play the complete chord sound (for hint/feedback)
-        for note in self.complete_chord_notes:
-            # Use learning_ui method to play note with conversion
-            self.learning_ui.play_note_with_conversion(note, self.main_window.volume, 0)
+        self.learning_ui.play_chord_with_conversion(self.complete_chord_notes, self.main_window.volume)
 
     def replay_chord(self):
         # Replay the current incomplete chord
@@ -134,9 +129,7 @@ class MissingNoteMode:
         
         # Highlight the user's selection in purple
         # Use learning_ui method to get correct piano button (handles conversion)
-        button = self.learning_ui.get_piano_button_for_note(clicked_note)
-        if button:
-            button.setStyleSheet("background-color: rgb(150, 100, 255); border: 2px solid rgb(120, 80, 200);")
+        self.learning_ui.highlight_note_on_piano(clicked_note, SELECTION)
         
         # Add to user selected notes for tracking
         if clicked_note not in self.user_selected_notes:
@@ -159,7 +152,7 @@ class MissingNoteMode:
             # Use learning_ui method to get correct piano button (handles conversion)
             button = self.learning_ui.get_piano_button_for_note(clicked_note)
             if button:
-                self.main_window._reset_button(button)
+                self.main_window.highlights.remove(SELECTION, [button.objectName()])
             
             # Disable submit button if no selections
             if not self.user_selected_notes:
@@ -235,9 +228,7 @@ class MissingNoteMode:
         # Show the complete chord in green
         for note in self.complete_chord_notes:
             # Use learning_ui method to get correct piano button (handles conversion)
-            button = self.learning_ui.get_piano_button_for_note(note)
-            if button:
-                button.setStyleSheet("background-color: rgb(80, 200, 80); border: 2px solid rgb(60, 150, 60);")
+            self.learning_ui.highlight_note_on_piano(note, CORRECT)
         
         # Play the complete chord
         QTimer.singleShot(1800, self.play_complete_chord)
@@ -247,9 +238,7 @@ class MissingNoteMode:
         # Show user's wrong selection in red
         if self.user_answer:
             # Use learning_ui method to get correct piano button (handles conversion)
-            button = self.learning_ui.get_piano_button_for_note(self.user_answer)
-            if button:
-                button.setStyleSheet("background-color: rgb(255, 100, 100); border: 2px solid rgb(200, 80, 80);")
+            self.learning_ui.highlight_note_on_piano(self.user_answer, INCORRECT)
         
         # After 1 second, show correct complete chord in green
         QTimer.singleShot(800, self.show_correct_feedback)
@@ -1,8 +1,16 @@
+import startup_metrics
+import json
 import sys
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore, QtWidgets
 from piano_ui import Ui_MainWindow
 
+# Quit as soon as the window is shown and the synth is ready, printing the
+# startup timings as one JSON line (used by benchmarks/cold_start_benchmark.py)
+EXIT_AFTER_STARTUP = "--exit-after-startup"
+
 if __name__ == "__main__":
+    startup_metrics.mark("imports")
+
     # Create a custom MainWindow class that extends QMainWindow
     class PianoMainWindow(QtWidgets.QMainWindow):
         def closeEvent(self, event):
@@ -28,29 +36,43 @@ if __name__ == "__main__":
                     event.ignore()  # Don't close the window
                     return
             
-            # Clean up FluidSynth
-            if hasattr(self.ui, 'fs'):
-                self.ui.fs.delete()
+            # Stop MIDI file playback before the engine goes away
+            if hasattr(self.ui, 'midi_player'):
+                self.ui.midi_player.stop()
+
+            # Clean up FluidSynth (waits for a SoundFont load still in progress)
+            if hasattr(self.ui, 'sound_engine'):
+                self.ui.sound_engine.cleanup()
             
             # Close all child windows
-            if hasattr(self.ui, 'chordWindow') and self.ui.chordWindow:
-                self.ui.chordWindow.close()
-            
-            if hasattr(self.ui, 'progressionWindow') and self.ui.progressionWindow:
-                self.ui.progressionWindow.close()
+            if hasattr(self.ui, 'windows'):
+                self.ui.windows.close_all()
             
             # Accept the close event
             event.accept()
     
     # Initialize the application
     app = QtWidgets.QApplication(sys.argv)
+    startup_metrics.mark("qapplication")
 
-    # Main window implementation with adjusted size
+    # Main window (Ui_MainWindow sets its default and minimum size)
     MainWindow = PianoMainWindow()
-    MainWindow.setFixedSize(640, 420)  # Set fixed window size for the piano layout
     
     ui = Ui_MainWindow()
     ui.setupUi(MainWindow)
     MainWindow.ui = ui  # Store a reference to the UI for use in closeEvent
     MainWindow.show()
+    startup_metrics.mark("window_shown")
+
+    if EXIT_AFTER_STARTUP in sys.argv:
+        # The synth is started from the event loop (Ui_MainWindow.start_sound);
+        # the built-in synth is ready right away, FluidSynth once it has loaded
+        ui.sound_engine.loader.loaded.connect(app.quit)
+        ui.sound_engine.loader.failed.connect(app.quit)
+        QtCore.QTimer.singleShot(0, lambda: ui.sound_engine.ready and app.quit())
+        app.exec_()
+        ui.cleanup()
+        print("STARTUP " + json.dumps(startup_metrics.as_dict()))
+        sys.exit(0)
+
     sys.exit(app.exec_())
\ No newline at end of file
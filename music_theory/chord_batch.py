@@ -0,0 +1,97 @@
+"""
+Vectorized chord composition and transposition.
+
+Works on NumPy arrays of root MIDI numbers, chord-type codes and inversions,
+so composing or transposing a million chords is a handful of array
+operations and never touches Qt.
+"""
+
+import numpy as np
+
+from music_theory.chord_index import CHORD_INTERVALS, CHORD_TYPES, voice_chord
+
+# Chord type name <-> integer code used in arrays
+CHORD_TYPE_CODES = {chord_type: code for code, chord_type in enumerate(CHORD_TYPES)}
+
+# OFFSETS[type_code, inversion] -> semitone offsets of the chord tones from the root
+OFFSETS = np.array(
+    [[voice_chord(0, CHORD_INTERVALS[chord_type], inversion) for inversion in range(3)]
+     for chord_type in CHORD_TYPES],
+    dtype=np.int16,
+)
+OFFSETS.setflags(write=False)
+
+# Same table flattened to one row per (type, inversion) so composing is a
+# single take() instead of 2-D fancy indexing
+_FLAT_OFFSETS = OFFSETS.reshape(-1, OFFSETS.shape[2])
+_INVERSIONS = OFFSETS.shape[1]
+
+
+def type_codes(chord_types):
+    """
+    Convert chord type names to codes.
+
+    Args:
+        chord_types (iterable): Names such as "major", "minor", "diminished"
+
+    Returns:
+        np.ndarray: int8 array of chord type codes
+    """
+    return np.fromiter((CHORD_TYPE_CODES[name] for name in chord_types), dtype=np.int8)
+
+
+def compose(roots, codes, inversions=0):
+    """
+    Compose many chords at once.
+
+    Args:
+        roots (array-like): Root MIDI numbers, shape (N,)
+        codes (array-like): Chord type codes, shape (N,) or scalar
+        inversions (array-like): Inversions 0-2, shape (N,) or scalar
+
+    Returns:
+        np.ndarray: (N, 3) int16 array of chord tones, lowest first
+    """
+    roots = np.asarray(roots, dtype=np.int16)
+    rows = np.asarray(codes, dtype=np.intp) * _INVERSIONS + np.asarray(inversions, dtype=np.intp)
+    if rows.ndim == 0:
+        return roots[:, None] + _FLAT_OFFSETS[rows]
+    return roots[:, None] + _FLAT_OFFSETS.take(rows, axis=0)
+
+
+def transpose(chords, semitones):
+    """
+    Transpose chords by a scalar or by one amount per chord.
+
+    Args:
+        chords (np.ndarray): (N, k) chord tones
+        semitones (int or array-like): Shift, scalar or shape (N,)
+
+    Returns:
+        np.ndarray: (N, k) transposed chord tones
+    """
+    semitones = np.asarray(semitones, dtype=np.int16)
+    if semitones.ndim == 1:
+        semitones = semitones[:, None]
+    return chords + semitones
+
+
+def pitch_classes(chords):
+    """Reduce chord tones to pitch classes 0-11."""
+    return chords % 12
+
+
+def pitch_class_masks(chords):
+    """
+    Reduce each chord to a 12-bit pitch-class set (bit n set = pitch class n).
+
+    Returns:
+        np.ndarray: (N,) uint16 array of masks
+    """
+    bits = np.left_shift(np.uint16(1), (chords % 12).astype(np.uint16))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def in_midi_range(chords):
+    """Boolean mask of chords whose tones all lie in 0-127."""
+    return (chords.min(axis=1) >= 0) & (chords.max(axis=1) <= 127)
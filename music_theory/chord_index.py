@@ -0,0 +1,96 @@
+"""
+Precomputed chord index for the Piano Chord Learning App.
+
+Every root across the MIDI range, every chord type and every inversion is
+resolved once at import time into an immutable ChordEntry. Lookups are a
+single dict access and return both sharp and flat spellings.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+from music_theory import pitch
+
+# Semitone offsets from the root, in root position
+CHORD_INTERVALS = MappingProxyType({
+    "major": (0, 4, 7),        # Root + major 3rd + perfect 5th
+    "minor": (0, 3, 7),        # Root + minor 3rd + perfect 5th
+    "diminished": (0, 3, 6),   # Root + minor 3rd + diminished 5th
+})
+
+CHORD_TYPES = tuple(CHORD_INTERVALS)
+
+# root: MIDI number of the chord root (the note the chord is named after)
+# midi: chord tones from lowest to highest for this inversion
+# sharp/flat: note names with octave; sharp_label/flat_label: "C E G" style
+ChordEntry = namedtuple(
+    "ChordEntry", "root chord_type inversion midi sharp flat sharp_label flat_label"
+)
+
+
+def voice_chord(root, intervals, inversion):
+    """
+    Build the MIDI notes of a chord in a given inversion.
+
+    Args:
+        root (int): MIDI number of the root
+        intervals (tuple): Root-position semitone offsets
+        inversion (int): 0 = root position, 1 = first inversion, ...
+
+    Returns:
+        tuple: MIDI numbers from lowest to highest
+    """
+    notes = [root + interval for interval in intervals]
+    for _ in range(inversion):
+        notes.append(notes.pop(0) + 12)
+    return tuple(notes)
+
+
+def _build_index():
+    # Resolve every (root, chord type, inversion) that fits in 0-127
+    index = {}
+    for chord_type, intervals in CHORD_INTERVALS.items():
+        for inversion in range(len(intervals)):
+            for root in pitch.MIDI_RANGE:
+                midi = voice_chord(root, intervals, inversion)
+                if midi[-1] > 127:
+                    continue
+                sharp = tuple(pitch.SHARP_NOTE_NAMES[note] for note in midi)
+                flat = tuple(pitch.FLAT_NOTE_NAMES[note] for note in midi)
+                index[(root, chord_type, inversion)] = ChordEntry(
+                    root, chord_type, inversion, midi, sharp, flat,
+                    " ".join(pitch.strip_octave(name) for name in sharp),
+                    " ".join(pitch.strip_octave(name) for name in flat),
+                )
+    return MappingProxyType(index)
+
+
+CHORD_INDEX = _build_index()
+
+
+def lookup(root, chord_type, inversion=0):
+    """
+    Look up a chord.
+
+    Args:
+        root (int): MIDI number of the chord root
+        chord_type (str): "major", "minor" or "diminished"
+        inversion (int): 0 = root position, 1 = first inversion, ...
+
+    Returns:
+        ChordEntry: The resolved chord, or None if it does not fit in 0-127
+    """
+    return CHORD_INDEX.get((root, chord_type, inversion))
+
+
+def lookup_name(root_name, chord_type, inversion=0):
+    """
+    Look up a chord by root note name (e.g., "C#4" or "Db4").
+
+    Returns:
+        ChordEntry: The resolved chord, or None if unknown or out of range
+    """
+    root = pitch.note_to_midi(root_name)
+    if root is None:
+        return None
+    return CHORD_INDEX.get((root, chord_type, inversion))
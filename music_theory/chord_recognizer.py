@@ -0,0 +1,162 @@
+"""
+Chord recognition from a set of notes.
+
+Any combination of notes reduces to a 12-bit pitch-class set (bit n set =
+pitch class n is present), so there are only 4096 possible inputs. The
+ranked candidate chords for every set are computed once at import time;
+recognizing held notes is then a table lookup plus a bass-note check.
+"""
+
+from collections import namedtuple
+from itertools import combinations
+from types import MappingProxyType
+
+from music_theory import pitch
+from music_theory.chord_index import CHORD_INTERVALS
+
+# Chord templates recognised, as root-position semitone offsets. The triads
+# the rest of the app composes come first so they win ties.
+CHORD_TEMPLATES = MappingProxyType(dict(CHORD_INTERVALS, **{
+    "augmented": (0, 4, 8),
+    "sus2": (0, 2, 7),
+    "sus4": (0, 5, 7),
+    "dominant 7th": (0, 4, 7, 10),
+    "major 7th": (0, 4, 7, 11),
+    "minor 7th": (0, 3, 7, 10),
+    "half-diminished 7th": (0, 3, 6, 10),
+    "diminished 7th": (0, 3, 6, 9),
+}))
+
+MASK_COUNT = 1 << 12
+MIN_CONFIDENCE = 0.5      # Weaker candidates are not stored
+MAX_CANDIDATES = 5        # Candidates kept per pitch-class set
+ROOT_IN_BASS_BONUS = 0.05  # Ranking nudge for a root-position reading
+
+# root_pc: pitch class of the root; inversion: index of the bass note in the
+# root-position chord (0 = root position), or None if the bass is not a chord
+# tone; confidence: 1.0 for an exact match, lower for missing or extra notes
+ChordMatch = namedtuple("ChordMatch", "root_pc chord_type inversion confidence")
+
+# Per-template data: (chord_type, size, {pitch class offset: chord tone index})
+_TEMPLATE_TONES = tuple(
+    (chord_type, len(intervals), {interval % 12: index for index, interval in enumerate(intervals)})
+    for chord_type, intervals in CHORD_TEMPLATES.items()
+)
+
+
+def pitch_class_mask(midi_notes):
+    """
+    Reduce notes to a 12-bit pitch-class set.
+
+    Args:
+        midi_notes (iterable): MIDI numbers
+
+    Returns:
+        int: Mask with bit n set for every pitch class n present
+    """
+    mask = 0
+    for note in midi_notes:
+        mask |= 1 << (note % 12)
+    return mask
+
+
+def _build_table():
+    # For every pitch-class set, the stored candidates as
+    # (root_pc, template number, confidence), best first. Rather than
+    # testing all 4096 sets against every chord, each chord enumerates the
+    # sets close enough to it: subsets of its tones that keep the root, plus
+    # as many extra notes as the confidence floor allows.
+    found = [[] for _ in range(MASK_COUNT)]
+    for number, intervals in enumerate(CHORD_TEMPLATES.values()):
+        template_size = len(intervals)
+        for root_pc in range(12):
+            tones = [1 << (root_pc + interval) % 12 for interval in intervals]
+            others = [1 << pc for pc in range(12) if 1 << pc not in tones]
+            for matched in range(2, template_size + 1):
+                # Missing chord tones and extra notes both lower confidence
+                max_extra = int(matched / MIN_CONFIDENCE) - template_size
+                for kept in combinations(tones[1:], matched - 1):
+                    base = tones[0] + sum(kept)
+                    for extra_count in range(max_extra + 1):
+                        entry = (root_pc, number, matched / (template_size + extra_count))
+                        for extra in combinations(others, extra_count):
+                            found[base + sum(extra)].append(entry)
+    for candidates in found:
+        candidates.sort(key=lambda item: (-item[2], item[1]))
+    return tuple(tuple(candidates[:MAX_CANDIDATES]) for candidates in found)
+
+
+RECOGNITION_TABLE = _build_table()
+
+
+def candidates_for_mask(mask):
+    """
+    Ranked candidates for a pitch-class set, ignoring the bass note.
+
+    Args:
+        mask (int): 12-bit pitch-class set
+
+    Returns:
+        tuple: (root_pc, chord_type, confidence) tuples, best first
+    """
+    return tuple(
+        (root_pc, _TEMPLATE_TONES[number][0], confidence)
+        for root_pc, number, confidence in RECOGNITION_TABLE[mask & (MASK_COUNT - 1)]
+    )
+
+
+def recognize(midi_notes):
+    """
+    Identify the chord formed by a set of notes.
+
+    Args:
+        midi_notes (iterable): MIDI numbers of the sounding notes
+
+    Returns:
+        list: ChordMatch tuples, best first (empty if nothing matches)
+    """
+    midi_notes = list(midi_notes)
+    if not midi_notes:
+        return []
+    bass_pc = min(midi_notes) % 12
+    mask = pitch_class_mask(midi_notes)
+
+    matches = []
+    for root_pc, number, confidence in RECOGNITION_TABLE[mask]:
+        chord_type, _, tones = _TEMPLATE_TONES[number]
+        inversion = tones.get((bass_pc - root_pc) % 12)
+        matches.append(ChordMatch(root_pc, chord_type, inversion, confidence))
+    # A reading with its root in the bass wins close calls (C6 vs Am7)
+    matches.sort(key=lambda match: -(match.confidence + (ROOT_IN_BASS_BONUS if match.inversion == 0 else 0)))
+    return matches
+
+
+def best_match(midi_notes):
+    """Top-ranked ChordMatch for the notes, or None."""
+    matches = recognize(midi_notes)
+    return matches[0] if matches else None
+
+
+def recognize_many(chords):
+    """
+    Recognize a sequence of note sets (e.g., a recorded performance).
+
+    Returns:
+        list: The best ChordMatch (or None) for each note set
+    """
+    return [best_match(notes) for notes in chords]
+
+
+def chord_name(match, flat=False):
+    """
+    Display name of a match (e.g., "C major", "Bb minor 7th / D").
+
+    Inversions whose bass is a chord tone other than the root are shown as a
+    slash chord with the bass note name.
+    """
+    names = pitch.FLAT_NAMES if flat else pitch.SHARP_NAMES
+    name = f"{names[match.root_pc]} {match.chord_type}"
+    if match.inversion:
+        intervals = CHORD_TEMPLATES[match.chord_type]
+        name += f" / {names[(match.root_pc + intervals[match.inversion]) % 12]}"
+    return name
@@ -0,0 +1,174 @@
+"""
+Integer pitch core for the Piano Chord Learning App.
+
+Every note is a MIDI number (0-127, C4 = 60). All spellings of all 128 notes
+are precomputed at import time, so parsing a name like "C#4" or "Db4" and
+formatting a MIDI number back to text are single table lookups.
+"""
+
+SHARP_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+FLAT_NAMES = ("C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B")
+
+MIDI_RANGE = range(128)
+
+# Per-MIDI-number tables
+PITCH_CLASS = tuple(midi % 12 for midi in MIDI_RANGE)
+OCTAVE = tuple(midi // 12 - 1 for midi in MIDI_RANGE)
+SHARP_NOTE_NAMES = tuple(SHARP_NAMES[midi % 12] + str(midi // 12 - 1) for midi in MIDI_RANGE)
+FLAT_NOTE_NAMES = tuple(FLAT_NAMES[midi % 12] + str(midi // 12 - 1) for midi in MIDI_RANGE)
+
+# Note name without octave -> pitch class (both spellings)
+NAME_TO_PITCH_CLASS = {}
+for _pitch_class, (_sharp, _flat) in enumerate(zip(SHARP_NAMES, FLAT_NAMES)):
+    NAME_TO_PITCH_CLASS[_sharp] = _pitch_class
+    NAME_TO_PITCH_CLASS[_flat] = _pitch_class
+
+# Full note name ("C#4", "Db4", "C-1") -> MIDI number
+NOTE_TO_MIDI = {}
+for _midi in MIDI_RANGE:
+    NOTE_TO_MIDI[SHARP_NOTE_NAMES[_midi]] = _midi
+    NOTE_TO_MIDI[FLAT_NOTE_NAMES[_midi]] = _midi
+
+# Any spelling, with or without octave -> (name without octave, octave or None)
+SPLIT_NOTE = {name: (name, None) for name in NAME_TO_PITCH_CLASS}
+for _name, _midi in NOTE_TO_MIDI.items():
+    SPLIT_NOTE[_name] = (_name[:len(_name) - len(str(OCTAVE[_midi]))], OCTAVE[_midi])
+
+# Spelling conversion tables (with and without octave)
+TO_SHARP = {}
+TO_FLAT = {}
+for _name, (_base, _octave) in SPLIT_NOTE.items():
+    _suffix = "" if _octave is None else str(_octave)
+    _pitch_class = NAME_TO_PITCH_CLASS[_base]
+    TO_SHARP[_name] = SHARP_NAMES[_pitch_class] + _suffix
+    TO_FLAT[_name] = FLAT_NAMES[_pitch_class] + _suffix
+
+FLAT_SPELLINGS = frozenset(name for name, (base, _) in SPLIT_NOTE.items() if base.endswith("b"))
+
+del _pitch_class, _sharp, _flat, _midi, _name, _base, _octave, _suffix
+
+
+class Note:
+    """
+    Interned, immutable note. There is exactly one Note object per MIDI
+    number; use Note.from_midi() or Note.parse() instead of the constructor.
+    """
+
+    __slots__ = ("midi", "pitch_class", "octave", "sharp", "flat")
+
+    def __init__(self, midi):
+        self.midi = midi
+        self.pitch_class = PITCH_CLASS[midi]
+        self.octave = OCTAVE[midi]
+        self.sharp = SHARP_NOTE_NAMES[midi]
+        self.flat = FLAT_NOTE_NAMES[midi]
+
+    @staticmethod
+    def from_midi(midi):
+        """
+        Get the interned note for a MIDI number.
+
+        Args:
+            midi (int): MIDI number 0-127
+
+        Returns:
+            Note: The shared Note instance
+        """
+        return NOTES[midi]
+
+    @staticmethod
+    def parse(name):
+        """
+        Get the interned note for a note name in either spelling.
+
+        Args:
+            name (str): Note name with octave (e.g., "C#4", "Db4", "C-1")
+
+        Returns:
+            Note: The shared Note instance, or None if the name is invalid
+        """
+        midi = NOTE_TO_MIDI.get(name)
+        return None if midi is None else NOTES[midi]
+
+    def name(self, flat=False):
+        """Note name with octave in the requested spelling."""
+        return self.flat if flat else self.sharp
+
+    def transpose(self, semitones):
+        """Interned note a number of semitones away, or None if out of range."""
+        midi = self.midi + semitones
+        return NOTES[midi] if 0 <= midi < 128 else None
+
+    def __repr__(self):
+        return f"Note({self.sharp})"
+
+
+NOTES = tuple(Note(midi) for midi in MIDI_RANGE)
+
+
+def note_to_midi(name):
+    """
+    Convert a note name to its MIDI number.
+
+    Args:
+        name (str): Note name with octave (e.g., "C4", "F#3", "Bb5", "A-1")
+
+    Returns:
+        int: MIDI number (C4 = 60), or None if the name is invalid
+    """
+    return NOTE_TO_MIDI.get(name)
+
+
+def midi_to_name(midi, flat=False):
+    """
+    Convert a MIDI number to a note name.
+
+    Numbers outside 0-127 are still formatted (e.g., for display of an
+    octave-shifted key) but are computed rather than looked up.
+
+    Args:
+        midi (int): MIDI number
+        flat (bool): Use flat spelling instead of sharp
+
+    Returns:
+        str: Note name with octave (e.g., "C#4" or "Db4")
+    """
+    if 0 <= midi < 128:
+        return FLAT_NOTE_NAMES[midi] if flat else SHARP_NOTE_NAMES[midi]
+    octave, pitch_class = divmod(midi, 12)
+    return (FLAT_NAMES if flat else SHARP_NAMES)[pitch_class] + str(octave - 1)
+
+
+def split_note(name):
+    """
+    Split a note name into its name and octave.
+
+    Args:
+        name (str): Note name with or without octave (e.g., "C#4", "Db")
+
+    Returns:
+        tuple: (name without octave, octave or None), or (name, None) if unknown
+    """
+    return SPLIT_NOTE.get(name, (name, None))
+
+
+def strip_octave(name):
+    """Note name without its octave number (e.g., "C#4" -> "C#")."""
+    return SPLIT_NOTE.get(name, (name, None))[0]
+
+
+def shift_octave(name, octaves):
+    """
+    Move a note name by whole octaves, keeping its spelling.
+
+    Args:
+        name (str): Note name with octave (e.g., "Bb4")
+        octaves (int): Number of octaves to shift (may be negative)
+
+    Returns:
+        str: Shifted note name (e.g., "Bb3"), or the input if it has no octave
+    """
+    midi = NOTE_TO_MIDI.get(name)
+    if midi is None:
+        return name
+    return midi_to_name(midi + 12 * octaves, name in FLAT_SPELLINGS)
@@ -0,0 +1,271 @@
+"""
+Roman-numeral progression compiler for the Piano Chord Learning App.
+
+A pattern such as "I-V/V-V6-bVII" is parsed once into an interval program:
+one (semitones above the tonic, chord type, inversion) step per chord,
+read from diatonic tables precomputed for all 24 major and minor keys.
+Resolving a program in a key is one addition per chord. Compiled programs
+and resolved progressions are both kept in LRU caches, so regenerating or
+transposing a progression is a lookup.
+
+Numeral syntax:
+    [b|#]... numeral [°|o] [6|64] [/ numeral]
+
+    - Case sets the quality: "IV" is major, "ii" is minor. A lowercase
+      numeral on a degree whose diatonic triad is diminished (e.g. "vii" in
+      a major key) is diminished; "°" or "o" forces diminished.
+    - Unaltered numerals follow the key's own scale. Accidentals are
+      relative to the major scale, so "bVII" and "bVI" are the usual
+      borrowed chords in any key.
+    - In a minor key, "vii°" (or "vii") is the diminished triad on the
+      raised seventh degree, as in harmonic minor (G#dim in A minor);
+      "VII" stays the natural minor's major triad a whole step below the
+      tonic.
+    - "6" is first inversion and "64" second inversion.
+    - "V/V" is a secondary chord: the part before the slash is read in the
+      key of the chord after it.
+
+Roots are spelled from the numeral and the key it is read in: "b" numerals
+with flats, "#" numerals and the minor key's raised seventh with sharps,
+and the other degrees the way the key signature does (Bb in F major, F# in
+G major, so vii°/V in C is F#dim).
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from music_theory import pitch
+
+MAJOR = "major"
+MINOR = "minor"
+
+# Semitones above the tonic and triad quality of each scale degree
+SCALE_STEPS = MappingProxyType({
+    MAJOR: (0, 2, 4, 5, 7, 9, 11),
+    MINOR: (0, 2, 3, 5, 7, 8, 10),     # Natural minor
+})
+SCALE_QUALITIES = MappingProxyType({
+    MAJOR: ("major", "minor", "minor", "major", "major", "minor", "diminished"),
+    MINOR: ("minor", "diminished", "major", "minor", "minor", "major", "major"),
+})
+
+# Tonic pitch classes of the keys whose signatures use flats
+FLAT_KEYS = MappingProxyType({
+    MAJOR: frozenset({5, 10, 3, 8, 1}),    # F, Bb, Eb, Ab, Db
+    MINOR: frozenset({2, 7, 0, 5, 10}),    # D, G, C, F, Bb
+})
+
+ROMAN_NUMERALS = ("I", "II", "III", "IV", "V", "VI", "VII")
+FIGURE_INVERSIONS = MappingProxyType({"": 0, "5": 0, "53": 0, "6": 1, "63": 1, "64": 2})
+
+# Built-in patterns for the progression window, per key mode
+PROGRESSION_PATTERNS = MappingProxyType({
+    MAJOR: (
+        "I-V-vi-IV",
+        "I-IV-V-V",
+        "ii-V-I-vi",
+        "I-vi-IV-V",
+        "I-iii-vi-IV",
+        "I-V-vi-iii-IV-I-IV-V",
+        "I-V6-vi-IV",
+        "I-V/vi-vi-IV",
+        "I-ii-V/V-V",
+        "I-bVII-IV-I",
+        "I-iv-I64-V",
+    ),
+    MINOR: (
+        "i-VI-III-VII",
+        "i-iv-v-i",
+        "i-iv-V-i",
+        "ii-V-i-VI",
+        "i-VII-VI-V",
+        "i-III-VII-iv",
+        "i-V/iv-iv-V",
+        "i-i64-V-i",
+    ),
+})
+
+# One compiled chord: semitones above the tonic (0-11), chord type, inversion
+ProgressionStep = namedtuple("ProgressionStep", "semitones chord_type inversion")
+
+# One resolved chord: root note name with octave, chord type, inversion
+ProgressionChord = namedtuple("ProgressionChord", "root chord_type inversion")
+
+# How a compiled chord's root is spelled: the key its numeral is read in
+# (semitones above the tonic, mode) and the numeral's accidental (-1, 0, 1)
+_Spelling = namedtuple("_Spelling", "key_offset key_mode accidental")
+
+_NUMERAL_PATTERN = re.compile(r"^([b#♭♯]*)(VII|VI|IV|V|III|II|I)([°o]?)(\d*)$", re.IGNORECASE)
+_ACCIDENTALS = {"b": -1, "♭": -1, "#": 1, "♯": 1}
+
+
+def _build_diatonic_tables():
+    # (tonic pitch class, mode) -> seven (root pitch class, chord type) pairs
+    tables = {}
+    for mode, steps in SCALE_STEPS.items():
+        for tonic in range(12):
+            tables[(tonic, mode)] = tuple(
+                ((tonic + step) % 12, quality) for step, quality in zip(steps, SCALE_QUALITIES[mode])
+            )
+    return MappingProxyType(tables)
+
+
+DIATONIC_TABLES = _build_diatonic_tables()
+
+
+def _parse_numeral(numeral, mode):
+    # One numeral (no slash) -> (semitones above the tonic, chord type,
+    # inversion, accidental)
+    match = _NUMERAL_PATTERN.match(numeral.strip())
+    if match is None or match.group(4) not in FIGURE_INVERSIONS:
+        raise ValueError(f"Invalid Roman numeral: {numeral!r}")
+    accidentals, roman, diminished, figure = match.groups()
+
+    degree = ROMAN_NUMERALS.index(roman.upper())
+    # Programs are relative to the tonic, so read the degree in the key of C
+    semitones, diatonic_quality = DIATONIC_TABLES[(0, mode)][degree]
+    accidental = 0
+    if mode == MINOR and roman.upper() == "VII" and not accidentals and (diminished or roman.islower()):
+        # Leading-tone chord of harmonic minor
+        semitones, diatonic_quality = DIATONIC_TABLES[(0, MAJOR)][degree]
+        accidental = 1
+    if accidentals:
+        shift = sum(_ACCIDENTALS[symbol] for symbol in accidentals)
+        semitones = (DIATONIC_TABLES[(0, MAJOR)][degree][0] + shift) % 12
+        accidental = (shift > 0) - (shift < 0)
+
+    if diminished:
+        chord_type = "diminished"
+    elif roman.isupper():
+        chord_type = "major"
+    elif not accidentals and diatonic_quality == "diminished":
+        chord_type = "diminished"
+    else:
+        chord_type = "minor"
+    return semitones, chord_type, FIGURE_INVERSIONS[figure], accidental
+
+
+@lru_cache(maxsize=256)
+def _compile_step(symbol, mode):
+    # A numeral with optional secondary target(s), e.g. "V/V" or "V/V/V"
+    # -> (ProgressionStep, _Spelling)
+    parts = symbol.split("/")
+    # Walk the targets from the outermost inwards, re-centring the key
+    offset = 0
+    local_mode = mode
+    for target in reversed(parts[1:]):
+        semitones, chord_type, _, _ = _parse_numeral(target, local_mode)
+        offset = (offset + semitones) % 12
+        local_mode = MINOR if chord_type == "minor" else MAJOR
+    semitones, chord_type, inversion, accidental = _parse_numeral(parts[0], local_mode)
+    return (
+        ProgressionStep((offset + semitones) % 12, chord_type, inversion),
+        _Spelling(offset, local_mode, accidental),
+    )
+
+
+def _as_symbols(pattern):
+    # Accept "I-V-vi-IV" or a sequence of numerals
+    if isinstance(pattern, str):
+        return tuple(symbol for symbol in pattern.split("-") if symbol.strip())
+    return tuple(pattern)
+
+
+@lru_cache(maxsize=128)
+def _compile(symbols, mode):
+    return tuple(_compile_step(symbol, mode)[0] for symbol in symbols)
+
+
+@lru_cache(maxsize=128)
+def _spellings(symbols, mode):
+    return tuple(_compile_step(symbol, mode)[1] for symbol in symbols)
+
+
+def compile_progression(pattern, mode=MAJOR):
+    """
+    Compile a Roman-numeral pattern into an interval program.
+
+    Args:
+        pattern (str or sequence): "I-V-vi-IV" or ("I", "V", "vi", "IV")
+        mode (str): "major" or "minor"
+
+    Returns:
+        tuple: ProgressionStep tuples
+
+    Raises:
+        ValueError: If a numeral cannot be parsed
+    """
+    if mode not in SCALE_STEPS:
+        raise ValueError(f"Unknown key mode: {mode}")
+    return _compile(_as_symbols(pattern), mode)
+
+
+@lru_cache(maxsize=1024)
+def _resolve(symbols, tonic, mode):
+    chords = []
+    for step, spelling in zip(_compile(symbols, mode), _spellings(symbols, mode)):
+        # Altered numerals follow their accidental, the others the
+        # signature of the key they are read in
+        if spelling.accidental:
+            flat = spelling.accidental < 0
+        else:
+            flat = (tonic + spelling.key_offset) % 12 in FLAT_KEYS[spelling.key_mode]
+        chords.append(ProgressionChord(
+            pitch.midi_to_name(tonic + step.semitones, flat=flat),
+            step.chord_type,
+            step.inversion,
+        ))
+    return tuple(chords)
+
+
+def resolve_progression(pattern, tonic, mode=MAJOR):
+    """
+    Resolve a pattern in a key.
+
+    Args:
+        pattern (str or sequence): Roman-numeral pattern
+        tonic (int or str): MIDI number or note name of the tonic (e.g., "D4");
+            chord roots are placed at or above it
+        mode (str): "major" or "minor"
+
+    Returns:
+        tuple: ProgressionChord tuples
+
+    Raises:
+        ValueError: If the tonic or a numeral is invalid
+    """
+    if isinstance(tonic, str):
+        name = tonic
+        if pitch.split_note(tonic)[1] is None:
+            tonic = tonic + "4"
+        tonic = pitch.note_to_midi(tonic)
+        if tonic is None:
+            raise ValueError(f"Invalid tonic: {name!r}")
+    if mode not in SCALE_STEPS:
+        raise ValueError(f"Unknown key mode: {mode}")
+    return _resolve(_as_symbols(pattern), tonic, mode)
+
+
+def diatonic_chords(tonic_pitch_class, mode=MAJOR):
+    """Seven (root pitch class, chord type) pairs of a key."""
+    return DIATONIC_TABLES[(tonic_pitch_class % 12, mode)]
+
+
+def key_mode(chord_type):
+    """Key mode implied by a root chord type (minor chords give minor keys)."""
+    return MINOR if chord_type == "minor" else MAJOR
+
+
+def cache_info():
+    """LRU statistics of the compile and resolve caches."""
+    return {"compile": _compile.cache_info(), "resolve": _resolve.cache_info()}
+
+
+def chord_label(chord):
+    """Display label of a resolved chord (e.g., "G major", "G major (1st inv.)")."""
+    label = f"{pitch.strip_octave(chord.root)} {chord.chord_type}"
+    if chord.inversion:
+        label += " (1st inv.)" if chord.inversion == 1 else " (2nd inv.)"
+    return label
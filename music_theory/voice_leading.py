@@ -0,0 +1,130 @@
+"""
+Voice-leading optimizer for chord progressions.
+
+Every chord can be played in several inversions and octaves. This module
+picks one voicing per chord so that the total movement of the voices over
+the whole progression is as small as possible, with every note inside a
+playable range. The search is a dynamic program over the candidate voicings
+(Viterbi style): O(chords x candidates^2), so it scales linearly with the
+length of the progression.
+"""
+
+from functools import lru_cache
+
+from music_theory import chord_index, pitch
+
+# Range of the on-screen keyboard (C4-C6, 25 keys)
+KEYBOARD_LOW = 60
+KEYBOARD_HIGH = 84
+
+
+@lru_cache(maxsize=1024)
+def voicing_candidates(root_pc, chord_type, low=KEYBOARD_LOW, high=KEYBOARD_HIGH, inversion=None):
+    """
+    All voicings of a chord that fit inside a range.
+
+    Args:
+        root_pc (int): Pitch class of the chord root (0-11)
+        chord_type (str): "major", "minor" or "diminished"
+        low (int): Lowest allowed MIDI note
+        high (int): Highest allowed MIDI note
+        inversion (int): Only this inversion, or None for any
+
+    Returns:
+        tuple: ChordEntry tuples from the chord index
+    """
+    inversions = range(len(chord_index.CHORD_INTERVALS[chord_type])) if inversion is None else (inversion,)
+    candidates = []
+    for root in range(root_pc % 12, 128, 12):
+        for chord_inversion in inversions:
+            entry = chord_index.lookup(root, chord_type, chord_inversion)
+            if entry is not None and entry.midi[0] >= low and entry.midi[-1] <= high:
+                candidates.append(entry)
+    return tuple(candidates)
+
+
+def movement(previous, current):
+    """Total semitones the voices move between two voicings (lowest to lowest, ...)."""
+    return sum(abs(a - b) for a, b in zip(previous, current))
+
+
+def optimize_voicings(chords, low=KEYBOARD_LOW, high=KEYBOARD_HIGH):
+    """
+    Choose the smoothest sequence of voicings.
+
+    Args:
+        chords (iterable): (root_pc, chord_type, inversion) tuples; an
+            inversion of None or 0 lets the optimizer choose, a figured
+            inversion (1 or 2) is kept
+        low (int): Lowest allowed MIDI note
+        high (int): Highest allowed MIDI note
+
+    Returns:
+        list: One ChordEntry per chord
+
+    Raises:
+        ValueError: If a chord has no voicing inside the range
+    """
+    centre = (low + high) / 2
+    costs = None
+    back_pointers = []
+    layers = []
+
+    for root_pc, chord_type, inversion in chords:
+        candidates = voicing_candidates(root_pc, chord_type, low, high, inversion or None)
+        if not candidates:
+            raise ValueError(f"No voicing of {pitch.SHARP_NAMES[root_pc % 12]} {chord_type} fits in {low}-{high}")
+
+        if costs is None:
+            # Start near the middle of the range
+            costs = [abs(entry.midi[1] - centre) for entry in candidates]
+            back_pointers.append(None)
+        else:
+            previous_layer = layers[-1]
+            new_costs = []
+            pointers = []
+            for entry in candidates:
+                best_cost, best = min(
+                    (cost + movement(previous.midi, entry.midi), index)
+                    for index, (cost, previous) in enumerate(zip(costs, previous_layer))
+                )
+                new_costs.append(best_cost)
+                pointers.append(best)
+            costs = new_costs
+            back_pointers.append(pointers)
+        layers.append(candidates)
+
+    if not layers:
+        return []
+
+    # Walk the cheapest path backwards
+    index = min(range(len(costs)), key=costs.__getitem__)
+    voicings = [None] * len(layers)
+    for step in range(len(layers) - 1, -1, -1):
+        voicings[step] = layers[step][index]
+        if back_pointers[step] is not None:
+            index = back_pointers[step][index]
+    return voicings
+
+
+def voice_progression(progression, low=KEYBOARD_LOW, high=KEYBOARD_HIGH):
+    """
+    Voice a resolved progression (e.g., from music_theory.progression).
+
+    Args:
+        progression (iterable): (root name, chord type, inversion) tuples
+
+    Returns:
+        list: One ChordEntry per chord
+    """
+    return optimize_voicings(
+        ((pitch.NAME_TO_PITCH_CLASS[pitch.strip_octave(root)], chord_type, inversion)
+         for root, chord_type, inversion in progression),
+        low,
+        high,
+    )
+
+
+def total_movement(voicings):
+    """Total voice movement of a voiced progression, in semitones."""
+    return sum(movement(a.midi, b.midi) for a, b in zip(voicings, voicings[1:]))
@@ -1,8 +1,12 @@
+from music_theory import pitch
+
+
 class NoteConverter:
     """
     Unified note conversion system for the Piano Chord Learning App.
     Handles all note conversions between sharp and flat notation,
     specifically for diminished chords and piano button mapping.
+    Conversions are lookups into the precomputed tables of music_theory.pitch.
     """
     
     # Sharp to flat conversion mapping (for diminished chords)
@@ -29,18 +33,9 @@ class NoteConverter:
         """
         if not note:
             return note
-            
-        # Extract base note and octave
-        if len(note) > 1 and note[-1].isdigit():
-            base_note = note[:-1]
-            octave = note[-1]
-        else:
-            base_note = note
-            octave = ""
-        
-        # Convert if it's a sharp note, otherwise keep original
-        flat_note = NoteConverter.SHARP_TO_FLAT.get(base_note, base_note)
-        return flat_note + octave
+
+        # Table lookup; unknown input is returned unchanged
+        return pitch.TO_FLAT.get(note, note)
     
     @staticmethod
     def to_sharp_notation(note):
@@ -56,18 +51,9 @@ class NoteConverter:
         """
         if not note:
             return note
-            
-        # Extract base note and octave
-        if len(note) > 1 and note[-1].isdigit():
-            base_note = note[:-1]
-            octave = note[-1]
-        else:
-            base_note = note
-            octave = ""
-        
-        # Convert if it's a flat note, otherwise keep original
-        sharp_note = NoteConverter.FLAT_TO_SHARP.get(base_note, base_note)
-        return sharp_note + octave
+
+        # Table lookup; unknown input is returned unchanged
+        return pitch.TO_SHARP.get(note, note)
     
     @staticmethod
     def convert_for_diminished_chord(note):
@@ -153,11 +139,8 @@ class NoteConverter:
             str: Note name without octave in appropriate notation
         """
         # Remove octave number for display
-        if len(note) > 1 and note[-1].isdigit():
-            base_note = note[:-1]
-        else:
-            base_note = note
-        
+        base_note = pitch.strip_octave(note)
+
         # For diminished chords, use flat notation
         if chord_type == "diminished":
             return NoteConverter.to_flat_notation(base_note)
@@ -1,13 +1,23 @@
-import pygame
-import functools
-from PyQt5 import QtCore, QtGui, QtWidgets
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
-from PyQt5.QtWidgets import *
-
+from PyQt5 import QtCore, QtWidgets
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtWidgets import (
+    QFileDialog, QFrame, QHBoxLayout, QLabel, QMenu, QPushButton, QSizePolicy, QSlider, QToolButton,
+    QVBoxLayout, QWidget
+)
+
+import startup_metrics
+from music_theory import chord_recognizer, pitch
 from sound_engine import SoundEngine
-from chord_window import ChordWindow
-from chord_progression import ChordProgressionWindow
+from keyboard_system.held_notes import HeldNotes
+from keyboard_system.input_pipeline import InputPipeline, MOUSE, PROGRAM
+from keyboard_system.computer_keyboard import ComputerKeyboard
+from keyboard_system.highlight_model import HighlightModel, PRESSED, PLAYBACK
+from keyboard_system.keyboard_widget import KeyboardWidget
+from keyboard_system.animation_driver import AnimationDriver
+from sound_system.midi_file import MidiFilePlayer, MidiRecorder
+from window_manager import WindowManager, CHORD_FINDER, CHORD_PROGRESSION
+
+KEY_FADE_MS = 150  # Pressed look of a tapped key fades out over this time
 
 class Ui_MainWindow(object):
     # Main UI class for Piano Chord Learning App
@@ -15,8 +25,9 @@ class Ui_MainWindow(object):
     def __init__(self):
         # Initialize the main window
         # ========== Core Settings ==========
-        self.sound_engine = SoundEngine()
-        self.fs = self.sound_engine.fs  # For compatibility with existing code
+        # The synth itself is created by start_sound() once the window is up
+        self.sound_engine = SoundEngine(start=False)
+        self.fs = None  # sound_engine.fs once started, for compatibility with existing code
         
         # UI State
         self.learning_mode_active = False
@@ -29,6 +40,16 @@ class Ui_MainWindow(object):
         # Data Storage
         self.chordNotes = []  # To store currently played chord notes
         self.buttons = {}     # Piano button storage
+        self.held_keys = {}   # Held piano button label -> sounding MIDI note
+        self.lit_keys = set() # Keys kept lit while held on the computer keyboard
+        self.midi_recorder = MidiRecorder()
+
+        # Tool windows, created on first open and reused afterwards
+        self.windows = WindowManager()
+        self.windows.register(CHORD_FINDER, self._create_chord_finder)
+        self.windows.register(CHORD_PROGRESSION, self._create_chord_progression)
+        self.chordWindow = None
+        self.progressionWindow = None
         
         # Octave mapping
         self.octave_names = {
@@ -51,6 +72,7 @@ class Ui_MainWindow(object):
         self._setup_note_display()
         self._setup_octave_controls()
         self._setup_control_buttons()
+        self._setup_midi_controls()
         self._setup_status_bar()
         
         # Finalizations
@@ -60,7 +82,8 @@ class Ui_MainWindow(object):
     def _setup_main_window(self):
         # Setup main window properties
         self.mw.setObjectName("MainWindow")
-        self.mw.resize(640, 400)
+        self.mw.setMinimumSize(640, 420)
+        self.mw.resize(640, 420)
         
         # Central widget setup
         self.centralwidget = QWidget(self.mw)
@@ -68,6 +91,21 @@ class Ui_MainWindow(object):
         self.centralwidget.setStyleSheet("background-color: white;")
         self.mw.setCentralWidget(self.centralwidget)
 
+        # The keyboard fills the window above a fixed-size panel of controls
+        # (the top margin leaves room for the learning mode header)
+        self.mainLayout = QVBoxLayout(self.centralwidget)
+        self.mainLayout.setContentsMargins(0, 30, 0, 0)
+        self.mainLayout.setSpacing(0)
+        self.keyboardLayout = QHBoxLayout()
+        self.keyboardLayout.setContentsMargins(20, 0, 19, 0)
+        self.mainLayout.addLayout(self.keyboardLayout, 1)
+
+        # Controls below the keyboard; positions are relative to the panel
+        self.controlsPanel = QWidget(self.centralwidget)
+        self.controlsPanel.setObjectName("controlsPanel")
+        self.controlsPanel.setFixedSize(640, 189)
+        self.mainLayout.addWidget(self.controlsPanel, 0, Qt.AlignHCenter)
+
     def _setup_piano_keyboard(self):
         # Setup the piano keyboard section
         self._create_piano_buttons()
@@ -76,29 +114,29 @@ class Ui_MainWindow(object):
     def _setup_volume_controls(self):
         # Setup volume control section
         # Vertical volume slider (left side)
-        self.volumeSlider = QtWidgets.QSlider(self.centralwidget)
+        self.volumeSlider = QtWidgets.QSlider(self.controlsPanel)
         self.volumeSlider.setRange(0, 100)
         self.volumeSlider.setValue(self.volume)
-        self.volumeSlider.setGeometry(QRect(10, 260, 25, 100))
+        self.volumeSlider.setGeometry(QRect(10, 49, 25, 100))
         self.volumeSlider.setOrientation(Qt.Vertical)
         self.volumeSlider.setTickPosition(QSlider.TicksLeft)
         self.volumeSlider.setTickInterval(25)
         self.volumeSlider.setStyleSheet("QSlider::tick { background: red; }")
         
         # Volume label (above slider)
-        self.volumeName = QLabel("Vol", self.centralwidget)
-        self.volumeName.setGeometry(QRect(7, 240, 30, 15))
+        self.volumeName = QLabel("Vol", self.controlsPanel)
+        self.volumeName.setGeometry(QRect(7, 29, 30, 15))
         self.volumeName.setAlignment(Qt.AlignCenter)
         
         # Volume value label (below slider)
-        self.volumeValueLabel = QLabel(f"{self.volume}", self.centralwidget)
-        self.volumeValueLabel.setGeometry(QRect(7, 365, 30, 15))
+        self.volumeValueLabel = QLabel(f"{self.volume}", self.controlsPanel)
+        self.volumeValueLabel.setGeometry(QRect(7, 154, 30, 15))
         self.volumeValueLabel.setAlignment(Qt.AlignCenter)
         self.volumeValueLabel.setStyleSheet("font-size: 10px;")
 
     def _setup_note_display(self):
         # Setup note display section
-        self.notelabel = QtWidgets.QLabel(self.centralwidget)
+        self.notelabel = QtWidgets.QLabel(self.controlsPanel)
         self.notelabel.setStyleSheet('''
             border: 2px solid #515251;
             border-radius: 4px;
@@ -110,13 +148,23 @@ class Ui_MainWindow(object):
         # Center the label
         label_width, label_height = 280, 30
         x_position = (640 - label_width) // 2
-        self.notelabel.setGeometry(QRect(x_position, 230, label_width, label_height))
+        self.notelabel.setGeometry(QRect(x_position, 19, label_width, label_height))
+
+        # Live chord readout for the held keys
+        self.held_notes = HeldNotes(self.mw)
+
+        # Mouse, computer keyboard and programmatic key input -> sound,
+        # highlight, label
+        self.input_pipeline = InputPipeline(self, self.mw)
+        self.computer_keyboard = ComputerKeyboard(
+            self.mw, self.input_pipeline, self.sound_engine, self.key_map, self.mw
+        )
 
     def _setup_octave_controls(self):
         # Setup octave control section
         # Create octave control frame to contain all octave widgets
-        self.octaveControlFrame = QFrame(self.centralwidget)
-        self.octaveControlFrame.setGeometry(QRect(60, 240, 40, 140))
+        self.octaveControlFrame = QFrame(self.controlsPanel)
+        self.octaveControlFrame.setGeometry(QRect(60, 29, 40, 140))
 
         # Create vertical layout for the frame
         octave_layout = QVBoxLayout(self.octaveControlFrame)
@@ -125,7 +173,7 @@ class Ui_MainWindow(object):
 
         # Octave label (above controls)
         self.octaveLabel = QLabel("Octave")
-        self.octaveLabel.setGeometry(QRect(60, 240, 35, 15))
+        self.octaveLabel.setGeometry(QRect(60, 29, 35, 15))
         self.octaveLabel.setAlignment(Qt.AlignCenter)
 
         # Octave increase button (top)
@@ -199,28 +247,62 @@ class Ui_MainWindow(object):
         """
         
         # Chord Finder button
-        self.buttonChordFind = QPushButton(self.centralwidget)
-        self.buttonChordFind.setGeometry(QRect(180, 310, 140, 30))
+        self.buttonChordFind = QPushButton(self.controlsPanel)
+        self.buttonChordFind.setGeometry(QRect(180, 99, 140, 30))
         self.buttonChordFind.setText("Chord Finder")
         self.buttonChordFind.setStyleSheet(button_style)
         
         # Chord Progression button
-        self.buttonChordProgression = QPushButton(self.centralwidget)
-        self.buttonChordProgression.setGeometry(QRect(325, 310, 140, 30))
+        self.buttonChordProgression = QPushButton(self.controlsPanel)
+        self.buttonChordProgression.setGeometry(QRect(325, 99, 140, 30))
         self.buttonChordProgression.setText("Chord Progression")
         self.buttonChordProgression.setStyleSheet(button_style)
         
         # Learning Mode button
-        self.buttonLearningMode = QPushButton(self.centralwidget)
-        self.buttonLearningMode.setGeometry(QRect(180, 345, 285, 30))
+        self.buttonLearningMode = QPushButton(self.controlsPanel)
+        self.buttonLearningMode.setGeometry(QRect(180, 134, 285, 30))
         self.buttonLearningMode.setText("Learning Mode")
         self.buttonLearningMode.setStyleSheet(button_style)
 
+    def _setup_midi_controls(self):
+        # Setup MIDI file menu (play files, record the keyboard)
+        self.buttonMidi = QToolButton(self.controlsPanel)
+        self.buttonMidi.setGeometry(QRect(480, 99, 140, 30))
+        self.buttonMidi.setText("MIDI")
+        self.buttonMidi.setPopupMode(QToolButton.InstantPopup)
+        self.buttonMidi.setStyleSheet("""
+            QToolButton {
+                background-color: white;
+                border: 2px solid #ccc;
+                border-radius: 5px;
+                padding: 4px;
+                font-weight: bold;
+            }
+            QToolButton:hover {
+                background-color: #f0f0f0;
+                border-color: #4a90e2;
+            }
+        """)
+
+        midi_menu = QMenu(self.buttonMidi)
+        self.actionPlayMidi = midi_menu.addAction("Play MIDI File...")
+        self.actionStopMidi = midi_menu.addAction("Stop MIDI Playback")
+        self.actionStopMidi.setEnabled(False)
+        midi_menu.addSeparator()
+        self.actionRecordMidi = midi_menu.addAction("Record Keyboard")
+        self.actionRecordMidi.setCheckable(True)
+        self.buttonMidi.setMenu(midi_menu)
+
+        # Player feeding the sound engine and the key highlights
+        self.midi_player = MidiFilePlayer(self.sound_engine, self.mw)
+
     def _setup_status_bar(self):
         # Setup status bar section
         self.statusbar = QtWidgets.QStatusBar(self.mw)
         self.statusbar.setObjectName("statusbar")
         self.mw.setStatusBar(self.statusbar)
+        if not self.sound_engine.ready:
+            self.statusbar.showMessage("Loading piano sounds...")
 
     def _connect_signals(self):
         # Connect all signals to their respective slots
@@ -236,130 +318,83 @@ class Ui_MainWindow(object):
         self.buttonChordProgression.clicked.connect(self.open_chord_progression)
         self.buttonLearningMode.clicked.connect(self.enter_learning_mode)
 
+        # Key input stages: highlight and held-key label (sound is played by
+        # the pipeline itself)
+        self.input_pipeline.notePressed.connect(self._key_held)
+        self.input_pipeline.notePressed.connect(self._highlight_pressed_key)
+        self.input_pipeline.noteReleased.connect(self._key_released)
+        self.input_pipeline.noteReleased.connect(self._unhighlight_released_key)
+
+        # Held keys -> live chord readout
+        self.held_notes.changed.connect(self._show_held_chord)
+
+        # MIDI files
+        self.actionPlayMidi.triggered.connect(self.play_midi_file)
+        self.actionStopMidi.triggered.connect(self.stop_midi_playback)
+        self.actionRecordMidi.toggled.connect(self.toggle_midi_recording)
+        self.midi_player.keysChanged.connect(self._on_midi_keys)
+        self.midi_player.finished.connect(self._on_midi_finished)
+
+        # Sound engine readiness (SoundFont loads in the background)
+        self.sound_engine.loader.loaded.connect(self._on_sound_ready)
+        self.sound_engine.loader.failed.connect(self._on_sound_failed)
+
     def _finalize_setup(self):
         # Finalize the UI setup
         self.retranslateUi(self.mw)
         QtCore.QMetaObject.connectSlotsByName(self.mw)
 
+        # Runs from the event loop, i.e. after the window has been shown
+        QtCore.QTimer.singleShot(0, self.start_sound)
+
+    def start_sound(self):
+        # Create the synth (FluidSynth, NumPy, the audio process); importing
+        # it is the slowest part of startup, so the window comes first and
+        # keys pressed until the synth is ready are buffered
+        if self.sound_engine.started:
+            return
+        self.sound_engine.start()
+        self.fs = self.sound_engine.fs
+        if self.sound_engine.ready:
+            self._on_sound_ready()
+
     # Piano Keyboards Creation Section
 
     def _create_piano_buttons(self):
-        # Create the piano keyboard buttons
+        # Create the piano keyboard and its per-key button adapters
         # Keyboard mappings
         keyboard_white = ["Z", "X", "C", "V", "B", "N", "M", "Q", "W", "E", "R", "T", "Y", "U", "I"]
         keyboard_black = ["S", "D", " ", "G", "H", "J", "2", "3", " ", "5", "6", "7"]
-        
-        # Note labels
-        labels_white = ["C4", "D4", "E4", "F4", "G4", "A4", "B4", "C5", "D5", "E5", "F5", "G5", "A5", "B5", "C6"]
-        labels_black = ["C#4", "D#4", " ", "F#4", "G#4", "A#4", " ", "C#5", "D#5", " ", "F#5", "G#5", "A#5"]
-        
-        # Create white keys
-        self._create_white_keys(keyboard_white, labels_white)
-        
-        # Create black keys
-        self._create_black_keys(keyboard_black, labels_black)
-
-    def _create_white_keys(self, keyboard_white, labels_white):
-        # Create white piano keys
-        for i, label in enumerate(labels_white):
-            button = QPushButton(self.centralwidget)
-            button.setGeometry(QtCore.QRect((40*i)+20, 30, 41, 181))
-            button.setObjectName(label)
-            
-            # Connect events
-            button.clicked.connect(functools.partial(self.handle_key_click, button))
-            button.pressed.connect(lambda key=label: self.notes_sound(key, self.volume, self.octave_shift))
-            
-            # Add keyboard shortcut
+
+        # One painted widget for all keys (see keyboard_system.keyboard_widget)
+        self.keyboard = KeyboardWidget(parent=self.centralwidget)
+        self.keyboard.setMinimumSize(601, 181)
+        self.keyboard.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.keyboardLayout.addWidget(self.keyboard)
+        self.keyboard.setObjectName("keyboard")
+
+        # Computer key -> note name (a black key sits right of each white key)
+        self.key_map = {}
+        for i, label in enumerate(self.keyboard.white_keys):
             if i < len(keyboard_white):
-                shortcut = QShortcut(self.centralwidget)
-                shortcut.setKey(QKeySequence(keyboard_white[i]))
-                shortcut.activated.connect(button.click)
-            
+                self.key_map[keyboard_white[i]] = label
+            black = self.keyboard.black_after[i]
+            if black and i < len(keyboard_black) and keyboard_black[i] != " ":
+                self.key_map[keyboard_black[i]] = black
+
+        # Connect events (every source goes through the input pipeline)
+        for label, button in self.keyboard.buttons.items():
+            button.pressed.connect(lambda key=label: self.input_pipeline.press(key, MOUSE))
+            button.released.connect(lambda key=label: self.input_pipeline.release(key, MOUSE))
             self.buttons[label] = button
 
-    def _create_black_keys(self, keyboard_black, labels_black):
-        # Create black piano keys
-        for i, label in enumerate(labels_black):
-            if i != 2 and label != " ":  # Skip positions where there are no black keys
-                button = QPushButton(self.centralwidget)
-                button.setGeometry(QtCore.QRect((40*i)+40, 30, 31, 111))
-                button.setObjectName(label)
-                
-                # Connect events
-                button.clicked.connect(functools.partial(self.handle_key_click, button))
-                button.pressed.connect(lambda key=label: self.notes_sound(key, self.volume, self.octave_shift))
-                
-                # Add keyboard shortcut
-                if i < len(keyboard_black) and keyboard_black[i] != " ":
-                    shortcut = QShortcut(self.centralwidget)
-                    shortcut.setKey(QKeySequence(keyboard_black[i]))
-                    shortcut.activated.connect(button.click)
-                
-                self.buttons[label] = button
-
     def _apply_piano_styling(self):
-        # Apply visual styling to piano keys        
-        # Apply styles to all keys
-        for button in self.buttons.values():
-            name = button.objectName()
-            if "#" in name:
-                button.setStyleSheet(self._black_key_style())
-            else:
-                button.setStyleSheet(self._white_key_style())
-        
-        # Store pressed styles for animation effects
-        self._store_pressed_styles()
-
-    def _white_key_style(self):
-        # White key style
-        return '''
-            background-color: qlineargradient(
-                spread:pad, x1:0, y1:0, x2:1, y2:1,
-                stop:0 rgba(255, 255, 255, 255),
-                stop:0.5 rgba(240, 240, 240, 255),
-                stop:1 rgba(210, 210, 210, 255)
-            );
-            border: 1px solid rgba(0, 0, 0, 200);
-            border-radius: 0px 0px 3px 3px;
-        '''
-        
-    def _black_key_style(self):    
-        # Black key style
-        return '''
-            background-color: qlineargradient(
-                spread:pad, x1:0, y1:0, x2:1, y2:1,
-                stop:0 rgba(40, 40, 40, 255),
-                stop:0.5 rgba(20, 20, 20, 255),
-                stop:1 rgba(5, 5, 5, 255)
-            );
-            border: 1px solid rgba(0, 0, 0, 255);
-            border-radius: 0px 0px 2px 2px;
-        '''
-
-    def _store_pressed_styles(self):
-        # Store pressed styles for key animation
-        self.white_key_pressed_style = '''
-            background-color: qlineargradient(
-                spread:pad, x1:0, y1:0, x2:1, y2:1,
-                stop:0 rgba(210, 230, 255, 255),
-                stop:0.5 rgba(150, 200, 255, 255),
-                stop:1 rgba(100, 180, 255, 255)
-            );
-            border: 1px solid rgba(0, 0, 0, 200);
-            border-radius: 0px 0px 3px 3px;
-        '''
-        
-        self.black_key_pressed_style = '''
-            background-color: qlineargradient(
-                spread:pad, x1:0, y1:0, x2:1, y2:1,
-                stop:0 rgba(80, 100, 120, 255),
-                stop:0.5 rgba(40, 60, 100, 255),
-                stop:1 rgba(20, 40, 80, 255)
-            );
-            border: 1px solid rgba(0, 0, 0, 255);
-            border-radius: 0px 0px 2px 2px;
-        '''
+        # Layered key highlights, applied once per frame (the keyboard
+        # widget draws each key's normal, pressed and highlight looks)
+        self.highlights = HighlightModel(self.keyboard, self.mw)
+
+        # Key press fades, all advanced by one frame clock
+        self.animations = AnimationDriver(self.mw)
 
     # Audio & Visual Interactions Section
 
@@ -367,25 +402,38 @@ class Ui_MainWindow(object):
         # Update volume setting
         self.volume = value
         self.volumeValueLabel.setText(f"{value}")
+        self.midi_player.velocity_scale = value / 50  # 50 plays files as written
 
     def notes_sound(self, note, volume, octave_shift):
-        # Play sound for a given note
-        if self.octave_shift != 0 and len(note) > 1 and note[-1].isdigit():
-            # Extract base note and octave
-            base_note = note[:-1]
-            original_octave = int(note[-1])
-            
-            # Apply the octave shift
-            new_octave = original_octave + octave_shift
-            
-            # Create new note name with adjusted octave
-            adjusted_note = base_note + str(new_octave)
-            
-            # Pass 0 as octave shift since we've already applied it to the note name
-            self.sound_engine.play_note(adjusted_note, volume, 0)
-        else:
-            # Normal case - pass the octave shift directly
-            self.sound_engine.play_note(note, volume, octave_shift)
+        # Play sound for a given note; the octave shift is applied to the
+        # MIDI number, so shifts below octave 0 or above 9 stay correct
+        self.sound_engine.play_note(note, volume, octave_shift)
+
+    def chord_sound(self, notes, volume, octave_shift, strum_ms=0, duration_ms=500):
+        # Play a whole chord in one scheduled batch (one call per chord)
+        midi_notes = []
+        for note in notes:
+            midi_note = pitch.note_to_midi(note)
+            if midi_note is not None:
+                midi_notes.append(midi_note + octave_shift * 12)
+        midi_volume = min(int(volume * 1.27), 127)
+        return self.sound_engine.play_chord(midi_notes, midi_volume, strum_ms, duration_ms)
+
+    def _on_sound_ready(self, sfid=None):
+        # Report startup timing once the SoundFont is usable
+        window_time = startup_metrics.elapsed("window_shown")
+        ready_time = startup_metrics.elapsed("synth_ready")
+        message = "Piano ready (built-in synth)" if self.sound_engine.fallback else "Piano ready"
+        if window_time is not None and ready_time is not None:
+            message += f" (window {window_time:.2f}s, sound {ready_time:.2f}s)"
+        self.statusbar.showMessage(message, 5000)
+        print(startup_metrics.report())
+        if startup_metrics.import_times:
+            print(startup_metrics.import_report())
+
+    def _on_sound_failed(self, error):
+        # Let the user know why the piano sounds different
+        self.statusbar.showMessage(f"{error} - using the built-in synth")
 
     def play_success_sound(self):
         # Play success sound for correct answers
@@ -396,60 +444,142 @@ class Ui_MainWindow(object):
         self.sound_engine.play_error_sound(self.volume)
 
     def handle_key_click(self, button):
-        # Handle piano key click events
-        sender = self.mw.sender()
-        note_name = sender.objectName()
-        
-        # Extract note info
-        if len(note_name) > 1 and note_name[-1].isdigit():
-            base_note = note_name[:-1]
-            original_octave = int(note_name[-1])
+        # Play a piano key programmatically (sound, highlight and label)
+        self.input_pipeline.tap(button.objectName(), PROGRAM)
+
+    def _highlight_pressed_key(self, note_name, midi_note):
+        # Highlight stage of the input pipeline (learning modes colour the
+        # keys themselves)
+        if self.learning_mode_active:
+            return
+        button = self.buttons.get(note_name)
+        if button is None:
+            return
+        if self.input_pipeline.holds(note_name):
+            # Held from the computer keyboard: stays down until key-up
+            self.highlights.add(PRESSED, [note_name])
+            self.lit_keys.add(note_name)
         else:
-            base_note = note_name
-            original_octave = 4
-        
-        # Calculate actual octave with shift
-        actual_octave = original_octave + self.octave_shift
-        actual_note_name = base_note + str(actual_octave)
-        octave_name = self.octave_names.get(actual_octave, f"Octave {actual_octave}")
-        
-        # Update display
-        self.notelabel.setText(f"{actual_note_name} ({octave_name} octave, shifted by {self.octave_shift})")
-        
-        # Play sound and animate
-        QTimer.singleShot(0, lambda: self.notes_sound(note_name, self.volume, self.octave_shift))
-        self._animate_key_press(button)
+            self._animate_key_press(button)
+
+    def _unhighlight_released_key(self, note_name, midi_note):
+        # Release a key held down from the computer keyboard
+        if note_name in self.lit_keys:
+            self.lit_keys.discard(note_name)
+            self.highlights.remove(PRESSED, [note_name])
+
+    def _key_held(self, note_name, midi_note):
+        # A piano key went down; remember the pitch it sounds at so a later
+        # octave change cannot release the wrong note
+        self.held_keys[note_name] = midi_note
+        self.held_notes.note_held(midi_note)
+        self.midi_recorder.note_on(midi_note, min(int(self.volume * 1.27), 127))
+
+    def _key_released(self, note_name, midi_note=None):
+        # A piano key came back up
+        midi_note = self.held_keys.pop(note_name, None)
+        if midi_note is not None:
+            self.held_notes.note_released(midi_note)
+            self.midi_recorder.note_off(midi_note)
+
+    def _show_held_chord(self):
+        # Show the chord formed by the held keys (at most once per frame)
+        if self.learning_mode_active:
+            return
+        notes, match = self.held_notes.struck_chord()
+        if not notes:
+            return
+
+        if len(notes) == 1:
+            actual_octave = notes[0] // 12 - 1
+            octave_name = self.octave_names.get(actual_octave, f"Octave {actual_octave}")
+            self.notelabel.setText(
+                f"{pitch.midi_to_name(notes[0])} ({octave_name} octave, shifted by {self.octave_shift})"
+            )
+            return
 
-    def _animate_key_press(self, button):
-        # Animate key press visual feedback
-        # Apply pressed style
-        if "#" not in button.objectName():
-            button.setStyleSheet(self.white_key_pressed_style)
+        note_names = " ".join(pitch.strip_octave(pitch.midi_to_name(note)) for note in notes)
+        if match is None:
+            self.notelabel.setText(note_names)
         else:
-            button.setStyleSheet(self.black_key_pressed_style)
-        
-        # Reset after 100ms
-        self.timer = QTimer()
-        self.timer.setSingleShot(True)
-        self.timer.timeout.connect(functools.partial(self._reset_button, button))
-        self.timer.start(100)
-        
-        # Visual feedback
-        button.setChecked(True)
-        button.setChecked(False)
+            self.notelabel.setText(f"{chord_recognizer.chord_name(match)} ({note_names})")
+
+    # MIDI File Section
+
+    def play_midi_file(self):
+        # Choose a MIDI file and play it with synchronized key highlights
+        path, _ = QFileDialog.getOpenFileName(self.mw, "Play MIDI File", "", "MIDI files (*.mid *.midi)")
+        if not path:
+            return
+        try:
+            self.midi_player.play(path)
+        except (OSError, ValueError) as error:
+            print(f"Error: could not play MIDI file: {error}")
+            self.statusbar.showMessage(f"Could not play MIDI file: {error}", 5000)
+            return
+        self.actionStopMidi.setEnabled(True)
+        self.statusbar.showMessage(f"Playing {path}")
+
+    def stop_midi_playback(self):
+        # Stop the MIDI file and release its notes
+        self.midi_player.stop()
+        self.actionStopMidi.setEnabled(False)
+        self.statusbar.clearMessage()
+
+    def _on_midi_keys(self, turned_on, turned_off):
+        # Apply one frame's worth of key changes from the MIDI player
+        self.highlights.remove(PLAYBACK, [pitch.SHARP_NOTE_NAMES[midi_note] for midi_note in turned_off])
+        self.highlights.add(PLAYBACK, [pitch.SHARP_NOTE_NAMES[midi_note] for midi_note in turned_on])
+        for midi_note in turned_off:
+            self.held_notes.note_released(midi_note)
+        for midi_note in turned_on:
+            self.held_notes.note_held(midi_note)
+
+    def _on_midi_finished(self):
+        # File played to the end
+        self.actionStopMidi.setEnabled(False)
+        stats = self.midi_player.stats()
+        self.statusbar.showMessage(
+            f"MIDI playback finished ({stats['events_scheduled']} events, "
+            f"{stats['highlight_updates']} highlight updates)", 5000
+        )
+
+    def toggle_midi_recording(self, recording):
+        # Start recording the keyboard, or stop and save the take
+        if recording:
+            self.midi_recorder.start()
+            self.statusbar.showMessage("Recording keyboard...")
+            return
+
+        self.midi_recorder.stop()
+        self.statusbar.clearMessage()
+        if not self.midi_recorder.events:
+            return
+        path, _ = QFileDialog.getSaveFileName(self.mw, "Save Recording", "recording.mid", "MIDI files (*.mid)")
+        if path:
+            try:
+                count = self.midi_recorder.save(path)
+                self.statusbar.showMessage(f"Saved {count} events to {path}", 5000)
+            except OSError as error:
+                print(f"Error: could not save recording: {error}")
+
+    def _animate_key_press(self, button):
+        # Animate key press visual feedback: the pressed look fades out
+        # over KEY_FADE_MS (a new press of the key restarts the fade)
+        self.animations.animate(button.objectName(), KEY_FADE_MS, self._fade_key)
+
+    def _fade_key(self, note_name, progress):
+        # One frame of a key's fade
+        self.keyboard.set_fade(note_name, 1.0 - progress)
 
     def _reset_button(self, button):
-        # Reset button to original style
-        name = button.objectName()
-        if "#" in name:
-            button.setStyleSheet(self._black_key_style())
-        else:
-            button.setStyleSheet(self._white_key_style())
+        # Reset button to original style (takes it off every highlight layer)
+        self.highlights.clear_keys([button.objectName()])
 
     def reset_all_piano_highlights(self):
-        # Reset all piano key highlights
-        for button in self.buttons.values():
-            self._reset_button(button)
+        # Reset all piano key highlights (applied with the next frame's
+        # highlights, so reset-then-highlight does not flicker)
+        self.highlights.clear()
 
     def _reset_button_to_default(self, button):
         # Reset single button to default state
@@ -485,16 +615,8 @@ class Ui_MainWindow(object):
         # Update chord displays when octave changes
         # Update chord window if exists
         if hasattr(self, 'chordWindow') and self.chordWindow and hasattr(self.chordWindow, 'chord') and self.chordWindow.chord:
-            adjusted_chord = []
-            for note in self.chordWindow.chord:
-                if len(note) > 1 and note[-1].isdigit():
-                    base_note = note[:-1]
-                    original_octave = int(note[-1])
-                    new_octave = original_octave + self.octave_shift
-                    adjusted_chord.append(base_note + str(new_octave))
-                else:
-                    adjusted_chord.append(note)
-            
+            adjusted_chord = [pitch.shift_octave(note, self.octave_shift) for note in self.chordWindow.chord]
+
             chord_text = " ".join(adjusted_chord)
             self.chordWindow.label.setText(f"Chord composed: {chord_text}")
         
@@ -504,39 +626,39 @@ class Ui_MainWindow(object):
 
     # Window Managements Section
 
+    def _create_chord_finder(self):
+        # Build the chord finder window (first open only; imported here so
+        # startup does not pay for it)
+        from chord_window import ChordWindow
+        window = ChordWindow(self)
+        window.setWindowTitle("Chord Finder")
+        window.resize(300, 200)
+        window.move(1300, 200)
+        self.windows.wire("chord_label", window.chordComposed, self.update_note_label)
+        return window
+
+    def _create_chord_progression(self):
+        # Build the chord progression window (first open only)
+        from chord_progression import ChordProgressionWindow
+        window = ChordProgressionWindow(self)
+        window.move(1300, 450)
+        return window
+
     def open_chord_finder(self):
-        # Open chord finder window
-        self.chordWindow = ChordWindow(self)
-        self.chordWindow.chordComposed.connect(self.update_note_label)
-        self.chordWindow.setWindowTitle("Chord Finder")
-        self.chordWindow.resize(300, 200)
-        self.chordWindow.move(1300, 200)
-        self.chordWindow.show()
+        # Open chord finder window (the same window is reused)
+        self.chordWindow = self.windows.open(CHORD_FINDER)
 
     def open_chord_progression(self):
-        # Open chord progression window
-        # Open chord finder if not already open
-        if not hasattr(self, 'chordWindow') or not self.chordWindow.isVisible():
-            self.chordWindow = ChordWindow(self)
-            self.chordWindow.chordComposed.connect(self.update_note_label)
-            self.chordWindow.setWindowTitle("Chord Finder")
-            self.chordWindow.resize(300, 200)
-            self.chordWindow.move(1300, 200)
-            self.chordWindow.show()
-        
-        # Open progression window if not already open
-        if not hasattr(self, 'progressionWindow') or not self.progressionWindow.isVisible():
-            self.progressionWindow = ChordProgressionWindow(self)
-            self.progressionWindow.move(1300, 450)
-            self.progressionWindow.show()
-
-        # Connect signals between windows
-        if hasattr(self, 'chordWindow') and hasattr(self, 'progressionWindow'):
-            self.chordWindow.composer.chordComposed.connect(
-                lambda chordName, chord: self.progressionWindow.set_root_chord(
-                    chord[0], self.chordWindow.chordTypeCombo.currentText()
-                )
-            )
+        # Open chord progression window, with the chord finder feeding it
+        self.open_chord_finder()
+        self.progressionWindow = self.windows.open(CHORD_PROGRESSION)
+
+        # Connect signals between windows (once per session)
+        self.windows.wire("chord_to_progression", self.chordWindow.composer.chordComposed, self._send_chord_to_progression)
+
+    def _send_chord_to_progression(self, chord_name, chord):
+        # A chord composed in the chord finder becomes the progression's root
+        self.progressionWindow.set_root_chord(chord[0], self.chordWindow.chordTypeCombo.currentText())
 
     def update_note_label(self, chord_name):
         # Update the note label when a chord is selected
@@ -551,7 +673,9 @@ class Ui_MainWindow(object):
         self.buttonChordProgression.hide()
         self.octaveControlFrame.hide()
         self.buttonLearningMode.hide()
+        self.buttonMidi.hide()
         self.statusbar.hide()
+        self.midi_player.stop()
 
         # Disable keyboard shortcuts
         self._disable_keyboard_shortcuts()
@@ -579,6 +703,7 @@ class Ui_MainWindow(object):
         self.buttonChordProgression.show()
         self.octaveControlFrame.show()
         self.buttonLearningMode.show()
+        self.buttonMidi.show()
         self.statusbar.show()
         
         # Re-enable keyboard shortcuts
@@ -591,19 +716,12 @@ class Ui_MainWindow(object):
         self.notelabel.setText("No chord selected")
 
     def _disable_keyboard_shortcuts(self):
-        # Disable keyboard shortcuts
-        if not hasattr(self, 'stored_shortcuts'):
-            self.stored_shortcuts = []
-        
-        for child in self.centralwidget.findChildren(QShortcut):
-            self.stored_shortcuts.append(child)
-            child.setEnabled(False)
+        # Stop playing from the computer keyboard (releases held keys)
+        self.computer_keyboard.setEnabled(False)
 
     def _enable_keyboard_shortcuts(self):
-        # Re-enable keyboard shortcuts
-        if hasattr(self, 'stored_shortcuts'):
-            for shortcut in self.stored_shortcuts:
-                shortcut.setEnabled(True)
+        # Play from the computer keyboard again
+        self.computer_keyboard.setEnabled(True)
 
     # Utility Section
 
@@ -621,13 +739,13 @@ class Ui_MainWindow(object):
 
     def cleanup(self):
         # Clean up resources when closing
+        if hasattr(self, 'midi_player'):
+            self.midi_player.stop()
+
         # Clean up sound engine
         if hasattr(self, 'sound_engine'):
             self.sound_engine.cleanup()
         
         # Close child windows
-        if hasattr(self, 'chordWindow') and self.chordWindow:
-            self.chordWindow.close()
-        
-        if hasattr(self, 'progressionWindow') and self.progressionWindow:
-            self.progressionWindow.close()
\ No newline at end of file
+        if hasattr(self, 'windows'):
+            self.windows.close_all()
\ No newline at end of file
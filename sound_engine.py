@@ -1,13 +1,152 @@
-import fluidsynth
-from PyQt5.QtCore import QTimer
+import os
+import threading
+import time
+from collections import deque
+import startup_metrics
+from music_theory import pitch
+from music_theory.voice_leading import KEYBOARD_LOW, KEYBOARD_HIGH
+from sound_system.event_scheduler import EventScheduler, NOTE_ON, NOTE_OFF, PROGRAM, CONTROL
+from sound_system.soundfont_loader import SoundFontLoader
+from sound_system.voice_manager import VoiceManager, STEAL_OLDEST, SUSTAIN_CC
+
+SOUNDFONT_PATH = "Sounds/FluidR3_GM.sf2"
+
+# Notes pressed while the SoundFont is still loading are replayed once it is
+# ready, as long as they are this recent (older presses are dropped)
+WARMUP_REPLAY_WINDOW = 0.3
+WARMUP_BUFFER_SIZE = 16
 
 class SoundEngine:
-    def __init__(self):
-        # Initialize the FluidSynth sound engine
-        self.fs = fluidsynth.Synth()
-        self.fs.start(driver="dsound")  # DirectSound driver for Windows
-        self.sfid = self.fs.sfload("Sounds/FluidR3_GM.sf2")  # Load SoundFont
-        self.fs.program_select(0, self.sfid, 0, 0)  # Select piano instrument
+    def __init__(self, backend=None, period_size=None, periods=None,
+                 max_polyphony=32, steal_policy=STEAL_OLDEST, audio_process=None, start=True):
+        # With start=False nothing heavy is set up until start() is called:
+        # the window can be shown first and notes played before then are
+        # buffered like during SoundFont loading
+        self._audio_settings = (backend, period_size, periods)
+        self._audio_process = audio_process
+        self.started = False
+        self.fs = None
+        self.backend = None
+        self.fallback = False
+        self.remote = False
+
+        # Active-voice table: retrigger-safe note-offs, polyphony cap, sustain
+        # (the synth is attached by start())
+        self.voices = VoiceManager(None, max_polyphony, steal_policy)
+
+        # All timed note events go through one scheduler thread instead of
+        # per-note Qt timers
+        self.scheduler = EventScheduler(self.voices)
+
+        # Load the (large) SoundFont in the background; until it is ready,
+        # note requests are buffered
+        self.sfid = None
+        self.ready = False
+        self._warmup_buffer = deque(maxlen=WARMUP_BUFFER_SIZE)
+        self.loader = SoundFontLoader(None, SOUNDFONT_PATH)
+        self.loader.loaded.connect(self._on_soundfont_loaded)
+        self.loader.failed.connect(self._on_soundfont_failed)
+
+        # Pre-rendered chord cache for replays (renderer is created on first miss)
+        self.render_cache = None
+        self.pcm_player = None
+        self.soundfont_id = None
+        self._renderer = None
+        self._render_lock = threading.Lock()
+
+        if start:
+            self.start()
+
+    def start(self):
+        # Create the synth, the audio output and the render cache. This is
+        # what imports FluidSynth, NumPy and (with the audio process)
+        # multiprocessing, so it is kept out of the constructor.
+        if self.started:
+            return
+        self.started = True
+        try:
+            import fluidsynth
+        except ImportError:  # Missing pyfluidsynth / libfluidsynth: built-in synth only
+            fluidsynth = None
+        from sound_system.audio_process import RemoteSynth, enabled as audio_process_enabled
+        from sound_system.render_cache import RenderCache, soundfont_id
+        from sound_system.pcm_player import PcmPlayer
+
+        backend, period_size, periods = self._audio_settings
+        audio_process = self._audio_process
+        if audio_process is None:
+            audio_process = audio_process_enabled()
+
+        # Without FluidSynth or the SoundFont, the built-in NumPy synth plays
+        # instead (see fallback_synth); it needs no loading
+        self.fallback = fluidsynth is None or not os.path.exists(SOUNDFONT_PATH)
+
+        if self.fallback:
+            from sound_system.fallback_synth import FallbackSynth
+            self.fs = FallbackSynth()
+            self.backend = self._open_backend(False)
+            self._warm_fallback()
+        elif audio_process:
+            # FluidSynth and the audio output live in a worker process; the
+            # proxy forwards note events over shared memory (see audio_process)
+            self.fs = RemoteSynth(SOUNDFONT_PATH, backend, period_size, periods)
+            self.remote = True
+        else:
+            # Initialize the FluidSynth sound engine
+            from sound_system.audio_backends import SYNTH_GAIN
+            self.fs = fluidsynth.Synth(gain=SYNTH_GAIN)
+
+            # Audio output: probed driver, null sink or file sink (see audio_backends)
+            self.backend = self._open_backend(True)
+
+        self.voices.synth = self.fs
+        self.loader.synth = self.fs
+        self.render_cache = RenderCache()
+        self.pcm_player = PcmPlayer()
+        self.soundfont_id = soundfont_id(SOUNDFONT_PATH)
+
+        if self.fallback:
+            self.soundfont_id = FallbackSynth.SOUNDFONT_ID
+            self.ready = True
+            startup_metrics.mark("synth_ready")
+        else:
+            self.loader.start()
+
+    def _open_backend(self, synth_drivers):
+        # Audio output: probed driver, Qt output, null sink or file sink (see
+        # audio_backends); falls back to silent output if it cannot be opened
+        from sound_system.audio_backends import create_backend, NullBackend
+        backend, period_size, periods = self._audio_settings
+        output = create_backend(backend, period_size, periods, synth_drivers)
+        try:
+            output.open(self.fs)
+        except RuntimeError as error:
+            print(f"Error: {error}. Falling back to silent output.")
+            output = NullBackend(period_size, periods)
+            output.open(self.fs)
+        return output
+
+    def _warm_fallback(self):
+        # Synthesize the on-screen keys at a typical velocity in the
+        # background; other notes are built on first use
+        from sound_system.fallback_synth import velocity_layer
+        notes = range(KEYBOARD_LOW, KEYBOARD_HIGH + 1)
+        threading.Thread(target=self.fs.warm, args=(notes, (velocity_layer(64),)), daemon=True).start()
+
+    def _use_fallback(self):
+        # Swap FluidSynth for the built-in synth (the SoundFont failed to
+        # load). Nothing has been scheduled yet: requests are still buffered.
+        from sound_system.fallback_synth import FallbackSynth
+        if self.backend is not None:
+            self.backend.close()
+        self.fs.delete()
+        self.fs = FallbackSynth()
+        self.voices.synth = self.fs
+        self.backend = self._open_backend(False)
+        self._warm_fallback()
+        self.fallback = True
+        self.remote = False
+        self.soundfont_id = FallbackSynth.SOUNDFONT_ID
     
     def play_note(self, note, volume, octave):
         # Play a note with the specified volume and octave
@@ -21,77 +160,257 @@ class SoundEngine:
             # Convert volume from 0-100 range to 0-127 range for MIDI
             midi_volume = min(int(volume * 1.27), 127)
             
-            # Schedule automatic note-off after shorter duration
-            QTimer.singleShot(500, lambda: self.fs.noteoff(0, midi_note))
-
-            # Play the note
-            self.fs.noteon(0, midi_note, midi_volume)
+            # Play the note and schedule automatic note-off after shorter duration
+            self._schedule([
+                (0, NOTE_ON, 0, midi_note, midi_volume),
+                (500, NOTE_OFF, 0, midi_note, 0),
+            ], owner="keys")
             return midi_note
         return None
         
-    def note_to_midi(self, note):
+    @staticmethod
+    def note_to_midi(note):
         # Convert note name (like 'C4', 'F#3', 'A-1') to MIDI note number
-        try:
-            # Handle negative octaves (like C-1)
-            if note.endswith('-1'):
-                note_name = note[:-2]
-                octave_num = -1
-            elif len(note) > 1 and note[-1].isdigit():
-                note_name = note[:-1]
-                octave_num = int(note[-1])
-            else:
-                return None
-            
-            # Map note names to semitones (C = 0, C# = 1, etc.)
-            # Updated to handle both sharp and flat notation
-            note_to_semitone = {
-                "C": 0, "C#": 1, "Db": 1, "D": 2, "D#": 3, "Eb": 3, "E": 4, "F": 5, "F#": 6, 
-                "Gb": 6, "G": 7, "G#": 8, "Ab": 8, "A": 9, "A#": 10, "Bb": 10, "B": 11
-            }
-            
-            if note_name not in note_to_semitone:
-                return None
-            
-            # Calculate MIDI note number
-            # Formula: MIDI = (octave + 1) * 12 + semitone
-            # This makes C4 = 60 (middle C)
-            midi_note = (octave_num + 1) * 12 + note_to_semitone[note_name]
-            
-            return midi_note
-            
-        except (ValueError, IndexError):
-            return None
+        # (C4 = 60); a single lookup in the precomputed pitch tables
+        return pitch.note_to_midi(note)
     
     def play_success_sound(self, volume):
         # Play a major chord arpeggio going up (C-E-G-C) for correct answer
         success_notes = [60, 64, 67, 72]  # C4, E4, G4, C5 in MIDI
         
+        # Convert volume from 0-100 to 0-127 for MIDI
+        midi_volume = min(int(volume * 1.27), 127)
+
+        # Drop any feedback sound that is still playing
+        self.scheduler.cancel_owner("feedback")
+
+        events = []
         for i, midi_note in enumerate(success_notes):
-            # Convert volume from 0-100 to 0-127 for MIDI
-            midi_volume = min(int(volume * 1.27), 127)
-            
             # Play each note with a slight delay to create an arpeggio effect
-            QTimer.singleShot(i * 270, lambda note=midi_note, vol=midi_volume: self.fs.noteon(0, note, vol))
+            events.append((i * 270, NOTE_ON, 0, midi_note, midi_volume))
             # Stop each note after a short duration
-            QTimer.singleShot(i * 270 + 200, lambda note=midi_note: self.fs.noteoff(0, note))
+            events.append((i * 270 + 200, NOTE_OFF, 0, midi_note, 0))
+        self._schedule(events, owner="feedback")
 
     def play_error_sound(self, volume):
         # Play a descending minor pattern (F-D-Bb) for wrong answer
         error_notes = [65, 62, 58]  # F4, D4, Bb3 in MIDI
         
+        # Convert volume from 0-100 to 0-127 for MIDI
+        midi_volume = min(int(volume * 1.27), 127)
+
+        # Drop any feedback sound that is still playing
+        self.scheduler.cancel_owner("feedback")
+
+        events = []
         for i, midi_note in enumerate(error_notes):
-            # Convert volume from 0-100 to 0-127 for MIDI
-            midi_volume = min(int(volume * 1.27), 127)
-            
             # Play each note with a slight delay
-            QTimer.singleShot(i * 150, lambda note=midi_note, vol=midi_volume: self.fs.noteon(0, note, vol))
+            events.append((i * 150, NOTE_ON, 0, midi_note, midi_volume))
             # Stop each note after a short duration
-            QTimer.singleShot(i * 150 + 250, lambda note=midi_note: self.fs.noteoff(0, note))
+            events.append((i * 150 + 250, NOTE_OFF, 0, midi_note, 0))
+        self._schedule(events, owner="feedback")
+
+    def hold_note(self, midi_note, velocity, owner="keys"):
+        # Start a note that sounds until release_note() (a held key);
+        # returns the batch id
+        return self._schedule([(0, NOTE_ON, 0, max(0, min(127, midi_note)), velocity)], owner)
+
+    def release_note(self, midi_note, owner="keys"):
+        # Release a held note; queued behind its noteon, so it can never
+        # overtake it
+        return self._schedule([(0, NOTE_OFF, 0, max(0, min(127, midi_note)), 0)], owner)
 
     def stop_note(self, midi_note):
         # Stop a currently playing note
-        self.fs.noteoff(0, midi_note)
+        self.voices.noteoff(0, midi_note)
+
+    def set_sustain(self, pressed):
+        # Sustain pedal on the piano channel
+        self.voices.set_sustain(0, pressed)
+
+    def voice_stats(self):
+        # Live active-voice and voice-stealing counters
+        return self.voices.stats()
     
+    def _schedule(self, events, owner=None):
+        # Single entry point to the scheduler; buffers requests during warm-up
+        if not self.ready:
+            self._warmup_buffer.append((time.perf_counter(), events, owner))
+            return None
+        if "first_sound" not in startup_metrics.marks and any(event[1] == NOTE_ON for event in events):
+            startup_metrics.mark("first_sound")
+            # Scripts using the engine without a window do not get a report
+            if "window_shown" in startup_metrics.marks:
+                print(startup_metrics.report())
+        return self.scheduler.schedule(events, owner)
+
+    def _on_soundfont_loaded(self, sfid):
+        # SoundFont is in memory: select the piano and flush recent presses
+        self.sfid = sfid
+        self.fs.program_select(0, self.sfid, 0, 0)  # Select piano instrument
+        self.ready = True
+        startup_metrics.mark("synth_ready")
+        self._flush_warmup()
+
+    def _flush_warmup(self):
+        # Replay the presses buffered during warm-up that are still recent
+        now = time.perf_counter()
+        buffered = list(self._warmup_buffer)
+        self._warmup_buffer.clear()
+        for pressed_at, events, owner in buffered:
+            if now - pressed_at <= WARMUP_REPLAY_WINDOW:
+                self._schedule(events, owner)
+
+    def _on_soundfont_failed(self, error):
+        # Keep the app usable with the built-in synth if the SoundFont
+        # cannot be loaded
+        print(f"Error: {error}")
+        self._use_fallback()
+        self.ready = True
+        startup_metrics.mark("synth_ready")
+        self._flush_warmup()
+
+    def play_chord(self, midi_notes, velocity=100, strum_ms=0, duration_ms=500, owner="chords"):
+        # Dispatch a whole chord as one scheduled batch. velocity is a MIDI
+        # velocity or a list with one velocity per note; strum_ms offsets
+        # each note from the previous one. Returns the batch id, which can be
+        # passed to chord_spread_ms() once the chord has sounded.
+        if isinstance(velocity, (list, tuple)):
+            velocities = velocity
+        else:
+            velocities = [velocity] * len(midi_notes)
+
+        events = []
+        for i, (midi_note, note_velocity) in enumerate(zip(midi_notes, velocities)):
+            if midi_note is None:
+                continue
+            midi_note = max(0, min(127, midi_note))
+            onset = i * strum_ms
+            events.append((onset, NOTE_ON, 0, midi_note, max(0, min(127, int(note_velocity)))))
+            events.append((onset + duration_ms, NOTE_OFF, 0, midi_note, 0))
+        if not events:
+            return None
+        return self._schedule(events, owner)
+
+    def play_events(self, events, owner=None):
+        # Schedule raw (time_ms, kind, channel, key, value) events, e.g. from
+        # a MIDI file; returns the batch id
+        return self._schedule(events, owner)
+
+    def stop_events(self, owner, channels=()):
+        # Cancel an owner's pending events and release every note it
+        # started. The channels it used are reset: pedal up, notes on
+        # channels other than the piano's silenced and the piano program
+        # restored on channel 0.
+        cancelled = self.scheduler.cancel_owner(owner)
+        self.scheduler.release_owner(owner)
+        self.reset_channels(channels)
+        return cancelled
+
+    def reset_channels(self, channels):
+        # Undo what a MIDI file left behind on the channels it used
+        events = [(0, CONTROL, channel, SUSTAIN_CC, 0) for channel in sorted(channels)]
+        if 0 in channels:
+            events.append((0, PROGRAM, 0, 0, 0))  # Acoustic grand piano
+        if events:
+            self._schedule(events, owner=None)
+        for channel in channels:
+            if channel != 0:
+                self.voices.all_notes_off(channel)
+
+    def chord_spread_ms(self, batch_id):
+        # Measured first-to-last noteon spread of a play_chord() batch
+        if batch_id is None:
+            return None
+        return self.scheduler.batch_spread_ms(batch_id)
+
+    def noteon_time(self, batch_id):
+        # When a batch's first noteon reached the synth (perf_counter), or None
+        if batch_id is None:
+            return None
+        return self.scheduler.batch_noteon_time(batch_id)
+
+    def play_rendered_chord(self, midi_notes, volume, duration_ms=500):
+        # Play a chord from the render cache; on a miss the chord is played
+        # live and rendered in the background so the next replay is a copy
+        from sound_system.render_cache import make_key, bucket_velocity
+        midi_notes = [max(0, min(127, note)) for note in midi_notes if note is not None]
+        if not midi_notes:
+            return False
+
+        midi_volume = min(int(volume * 1.27), 127)
+        if not self.started:
+            # Nothing to render with yet; buffered like any other press
+            self.play_chord(midi_notes, midi_volume, 0, duration_ms)
+            return False
+        key = make_key(midi_notes, midi_volume, duration_ms, self.soundfont_id)
+
+        pcm = self.render_cache.get(key)
+        # The chord was rendered at the loudest velocity of its bucket
+        volume = self._velocity_gain(midi_volume) / self._velocity_gain(bucket_velocity(key[1]))
+        if pcm is not None and self.pcm_player.play(pcm, volume):
+            return True
+
+        # Cache miss (or no PCM output): play through the synth
+        self.play_chord(midi_notes, midi_volume, 0, duration_ms)
+
+        if self.ready and self.pcm_player.available and pcm is None:
+            threading.Thread(target=self._render_into_cache, args=(key,), daemon=True).start()
+        return False
+
+    def _velocity_gain(self, velocity):
+        # Amplitude of a note at a velocity on the live synth, relative to
+        # velocity 127: linear for the built-in synth, FluidSynth's default
+        # concave curve (40 log10(127 / velocity) dB) otherwise
+        level = velocity / 127.0
+        return level if self.fallback else level * level
+
+    def _render_into_cache(self, key):
+        # Render a cache entry with the offline renderer (worker thread)
+        from sound_system.render_cache import bucket_velocity
+        midi_notes, bucket, duration_ms, _ = key
+        with self._render_lock:
+            if self.render_cache.contains(key):
+                return
+            if self.fallback:
+                # One vectorized mix of the cached note waveforms
+                self.render_cache.put(key, self.fs.render_chord(midi_notes, bucket_velocity(bucket), duration_ms))
+                return
+            try:
+                if self._renderer is None:
+                    from sound_system.offline_renderer import OfflineRenderer
+                    self._renderer = OfflineRenderer(SOUNDFONT_PATH)
+                events = self._renderer.chord_events(midi_notes, bucket_velocity(bucket), duration_ms)
+                self.render_cache.put(key, self._renderer.render_events(events))
+            except (OSError, ImportError) as error:
+                print(f"Error: could not render chord for cache: {error}")
+
+    def render_cache_stats(self):
+        # Hit/miss/eviction counters of the render cache (None before start())
+        if self.render_cache is None:
+            return None
+        return self.render_cache.stats()
+
+    def scheduler_stats(self):
+        # Queue depth and lateness statistics of the event scheduler
+        return self.scheduler.stats()
+
+    def audio_process_stats(self):
+        # Health and event latency of the audio process (None when in-process)
+        if self.remote:
+            return self.fs.stats()
+        return None
+
     def cleanup(self):
         # Clean up FluidSynth resources
-        self.fs.delete()
\ No newline at end of file
+        self.loader.wait()
+        self.scheduler.shutdown()
+        self.voices.all_notes_off()
+        if not self.started:
+            return
+        self.pcm_player.stop_all()
+        if self._renderer is not None:
+            self._renderer.cleanup()
+        if self.backend is not None:
+            self.backend.close()
+        self.fs.delete()
@@ -0,0 +1,294 @@
+import os
+import sys
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+
+from PyQt5.QtCore import QIODevice
+
+try:
+    import fluidsynth
+except ImportError:  # No pyfluidsynth / libfluidsynth: only the fallback synth
+    fluidsynth = None
+
+try:
+    from PyQt5.QtMultimedia import QAudioFormat, QAudioOutput
+except ImportError:  # QtMultimedia is optional (missing system audio libraries)
+    QAudioOutput = None
+
+# Environment overrides, so the same app runs interactive, headless or under
+# load tests without code changes:
+#   PIANOCHORD_AUDIO=auto | null | file:out.wav | qt | alsa | pulseaudio,alsa | ...
+#   PIANOCHORD_AUDIO_PERIOD_SIZE=256   (frames per period)
+#   PIANOCHORD_AUDIO_PERIODS=2         (number of periods)
+AUDIO_ENV = "PIANOCHORD_AUDIO"
+PERIOD_SIZE_ENV = "PIANOCHORD_AUDIO_PERIOD_SIZE"
+PERIODS_ENV = "PIANOCHORD_AUDIO_PERIODS"
+
+# Master gain of every FluidSynth instance: the live synth, the audio process
+# and offline renders, so a rendered chord is exactly as loud as a live one
+SYNTH_GAIN = 0.2
+
+# Drivers probed in order of preference for each platform
+PLATFORM_DRIVERS = {
+    "win32": ["dsound", "wasapi", "waveout"],
+    "darwin": ["coreaudio", "portaudio"],
+    "linux": ["pipewire", "pulseaudio", "alsa", "jack", "sdl2"],
+}
+
+
+def default_drivers():
+    # Driver probe order for the current platform
+    for prefix, drivers in PLATFORM_DRIVERS.items():
+        if sys.platform.startswith(prefix):
+            return list(drivers)
+    return ["portaudio", "sdl2"]
+
+
+class AudioBackend(ABC):
+    # Connects a synth to an audio sink
+
+    name = "base"
+
+    def __init__(self, period_size=None, periods=None):
+        self.period_size = period_size
+        self.periods = periods
+        self.synth = None
+
+    def configure(self, synth):
+        # Apply latency settings; must happen before the output is created
+        if self.period_size:
+            synth.setting("audio.period-size", int(self.period_size))
+        if self.periods:
+            synth.setting("audio.periods", int(self.periods))
+
+    @abstractmethod
+    def open(self, synth):
+        # Start delivering the synth's audio to the sink
+        pass
+
+    def close(self):
+        # Stop delivering audio
+        self.synth = None
+
+    def describe(self):
+        # Human-readable description for status messages
+        return self.name
+
+
+class DriverBackend(AudioBackend):
+    # Real-time output through a FluidSynth audio driver, probing candidates
+    # in order until one opens
+
+    name = "driver"
+
+    def __init__(self, drivers=None, period_size=None, periods=None):
+        super().__init__(period_size, periods)
+        self.candidates = list(drivers) if drivers else default_drivers()
+        self.driver = None
+        self.failed_drivers = []
+
+    def open(self, synth):
+        # Probe drivers without touching MIDI input (unlike Synth.start)
+        self.configure(synth)
+        for driver in self.candidates:
+            synth.setting("audio.driver", driver)
+            audio_driver = fluidsynth.new_fluid_audio_driver(synth.settings, synth.synth)
+            if audio_driver:
+                synth.audio_driver = audio_driver
+                self.synth = synth
+                self.driver = driver
+                return
+            self.failed_drivers.append(driver)
+        raise RuntimeError(f"No audio driver could be opened (tried: {', '.join(self.candidates)})")
+
+    def close(self):
+        # Stop the driver thread before the synth is deleted
+        if self.synth is not None and self.synth.audio_driver:
+            fluidsynth.delete_fluid_audio_driver(self.synth.audio_driver)
+            self.synth.audio_driver = None
+        super().close()
+
+    def describe(self):
+        return f"driver:{self.driver}" if self.driver else "driver:none"
+
+
+class _RenderThreadBackend(AudioBackend):
+    # Pulls blocks from the synth at real-time pace on a dedicated thread,
+    # the way an audio driver would, and hands them to _consume()
+
+    DEFAULT_PERIOD_SIZE = 512
+
+    def __init__(self, period_size=None, periods=None, samplerate=44100):
+        super().__init__(period_size or self.DEFAULT_PERIOD_SIZE, periods)
+        self.samplerate = samplerate
+        self.frames_rendered = 0
+        self.underruns = 0
+        self._running = False
+        self._thread = None
+
+    def open(self, synth):
+        self.configure(synth)
+        self.synth = synth
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-audio", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        # Render loop paced against the wall clock
+        started = time.perf_counter()
+        while self._running:
+            block = self.synth.get_samples(self.period_size)
+            self._consume(block)
+            self.frames_rendered += self.period_size
+
+            due = started + self.frames_rendered / self.samplerate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.period_size / self.samplerate:
+                self.underruns += 1
+
+    @abstractmethod
+    def _consume(self, block):
+        # Handle one interleaved int16 stereo block
+        pass
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        super().close()
+
+
+class NullBackend(_RenderThreadBackend):
+    # Renders and discards audio: full synth load, no sound (benchmarks, CI)
+
+    name = "null"
+
+    def _consume(self, block):
+        pass
+
+
+class FileBackend(_RenderThreadBackend):
+    # Records everything the synth plays to a 16-bit stereo WAV file
+
+    name = "file"
+
+    def __init__(self, path, period_size=None, periods=None, samplerate=44100):
+        super().__init__(period_size, periods, samplerate)
+        self.path = path
+        self._wav = None
+
+    def open(self, synth):
+        self._wav = wave.open(self.path, "wb")
+        self._wav.setnchannels(2)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(self.samplerate)
+        super().open(synth)
+
+    def _consume(self, block):
+        self._wav.writeframes(block.tobytes())
+
+    def close(self):
+        super().close()
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+    def describe(self):
+        return f"file:{self.path}"
+
+
+class _SynthDevice(QIODevice):
+    # Read-only device that renders the synth on demand (QAudioOutput pull mode)
+
+    def __init__(self, synth):
+        super().__init__()
+        self.synth = synth
+
+    def isSequential(self):
+        return True
+
+    def readData(self, max_size):
+        frames = max_size // 4  # 16-bit stereo
+        if frames <= 0:
+            return b""
+        return self.synth.get_samples(frames).tobytes()
+
+    def writeData(self, data):
+        return -1
+
+
+class QtAudioBackend(AudioBackend):
+    # Real-time output through QtMultimedia for synths without a FluidSynth
+    # audio driver (the NumPy fallback synth): Qt pulls blocks from the synth
+
+    name = "qt"
+    DEFAULT_PERIOD_SIZE = 512
+    DEFAULT_PERIODS = 4
+
+    def __init__(self, period_size=None, periods=None, samplerate=44100):
+        super().__init__(period_size or self.DEFAULT_PERIOD_SIZE, periods or self.DEFAULT_PERIODS)
+        self.samplerate = samplerate
+        self.output = None
+        self.device = None
+
+    def open(self, synth):
+        if QAudioOutput is None:
+            raise RuntimeError("QtMultimedia is not available")
+        audio_format = QAudioFormat()
+        audio_format.setSampleRate(self.samplerate)
+        audio_format.setChannelCount(2)
+        audio_format.setSampleSize(16)
+        audio_format.setCodec("audio/pcm")
+        audio_format.setByteOrder(QAudioFormat.LittleEndian)
+        audio_format.setSampleType(QAudioFormat.SignedInt)
+
+        self.configure(synth)
+        self.synth = synth
+        self.device = _SynthDevice(synth)
+        self.device.open(QIODevice.ReadOnly)
+        self.output = QAudioOutput(audio_format)
+        self.output.setBufferSize(self.period_size * self.periods * 4)
+        self.output.start(self.device)
+
+    def close(self):
+        if self.output is not None:
+            self.output.stop()
+            self.output = None
+        if self.device is not None:
+            self.device.close()
+            self.device = None
+        super().close()
+
+
+def create_backend(spec=None, period_size=None, periods=None, synth_drivers=True):
+    # Build a backend from a spec string (argument, then environment, then
+    # auto). Without synth_drivers (a synth that is not FluidSynth), driver
+    # specs map to the QtMultimedia output.
+    spec = spec or os.environ.get(AUDIO_ENV, "auto")
+    period_size = period_size or _env_int(PERIOD_SIZE_ENV)
+    periods = periods or _env_int(PERIODS_ENV)
+
+    if spec == "null":
+        return NullBackend(period_size, periods)
+    if spec.startswith("file:"):
+        return FileBackend(spec[len("file:"):], period_size, periods)
+    if spec == "qt" or not synth_drivers:
+        return QtAudioBackend(period_size, periods)
+    if spec == "auto":
+        return DriverBackend(None, period_size, periods)
+    return DriverBackend(spec.split(","), period_size, periods)
+
+
+def _env_int(name):
+    # Integer environment setting or None
+    value = os.environ.get(name)
+    try:
+        return int(value) if value else None
+    except ValueError:
+        print(f"Error: {name} must be an integer, got '{value}'")
+        return None
@@ -0,0 +1,281 @@
+import multiprocessing
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+
+# Opt in to out-of-process synthesis without code changes:
+#   PIANOCHORD_AUDIO_PROCESS=1
+AUDIO_PROCESS_ENV = "PIANOCHORD_AUDIO_PROCESS"
+
+RING_CAPACITY = 4096          # Event slots in the shared ring
+HEARTBEAT_INTERVAL = 0.1      # Worker wakes at least this often (seconds)
+HEARTBEAT_TIMEOUT = 2.0       # Worker is restarted when silent this long
+HEALTH_CHECK_INTERVAL = 0.5   # How often the parent checks the worker
+LOAD_TIMEOUT = 60.0           # Longest wait for the worker's SoundFont load
+
+# Event codes on the wire
+NOTE_ON_CODE = 1
+NOTE_OFF_CODE = 2
+PROGRAM_CODE = 3
+CONTROL_CODE = 4
+
+# Shared memory header, one 8-byte field each:
+#   write index, read index, worker heartbeat (perf_counter), events consumed,
+#   total latency, max latency (seconds), SoundFont id, stop flag
+_HEADER = struct.Struct("<QQdQddqQ")
+_WRITE, _READ, _HEARTBEAT, _CONSUMED, _LATENCY_TOTAL, _LATENCY_MAX, _SFID, _STOP = range(8)
+_OFFSETS = [8 * field for field in range(8)]
+_FIELD_FORMATS = "QQdQddqQ"
+
+# One event: send time (perf_counter, system-wide monotonic on all supported
+# platforms), code, channel, key, value
+_RECORD = struct.Struct("<dBBBB4x")
+
+
+def enabled():
+    # True when the environment asks for the audio process
+    return os.environ.get(AUDIO_PROCESS_ENV, "") not in ("", "0")
+
+
+class EventRing:
+    # Single-producer / single-consumer ring of fixed-size event records in
+    # shared memory. The producer only advances the write index after the
+    # record is in place and the consumer only advances the read index after
+    # copying records out, so no lock is shared between the processes.
+
+    def __init__(self, buffer, capacity):
+        self.buffer = buffer
+        self.capacity = capacity
+
+    @staticmethod
+    def size(capacity):
+        return _HEADER.size + capacity * _RECORD.size
+
+    def get(self, field):
+        return struct.unpack_from("<" + _FIELD_FORMATS[field], self.buffer, _OFFSETS[field])[0]
+
+    def set(self, field, value):
+        struct.pack_into("<" + _FIELD_FORMATS[field], self.buffer, _OFFSETS[field], value)
+
+    def reset(self):
+        _HEADER.pack_into(self.buffer, 0, 0, 0, 0.0, 0, 0.0, 0.0, -1, 0)
+
+    def push(self, code, channel, key, value):
+        # Producer side; returns False when the ring is full
+        write = self.get(_WRITE)
+        if write - self.get(_READ) >= self.capacity:
+            return False
+        offset = _HEADER.size + (write % self.capacity) * _RECORD.size
+        _RECORD.pack_into(self.buffer, offset, time.perf_counter(), code, channel, key, value)
+        self.set(_WRITE, write + 1)
+        return True
+
+    def pop_all(self):
+        # Consumer side: every record written so far
+        read = self.get(_READ)
+        write = self.get(_WRITE)
+        records = [
+            _RECORD.unpack_from(self.buffer, _HEADER.size + (index % self.capacity) * _RECORD.size)
+            for index in range(read, write)
+        ]
+        self.set(_READ, write)
+        return records
+
+    def pending(self):
+        return self.get(_WRITE) - self.get(_READ)
+
+
+def _worker_main(shm_name, capacity, soundfont, backend_spec, period_size, periods, ready, wakeup):
+    # Audio process body: owns FluidSynth and the audio output
+    import fluidsynth
+    from sound_system.audio_backends import create_backend, NullBackend, SYNTH_GAIN
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = EventRing(shm.buf, capacity)
+
+    synth = fluidsynth.Synth(gain=SYNTH_GAIN)
+    backend = create_backend(backend_spec, period_size, periods)
+    try:
+        backend.open(synth)
+    except RuntimeError as error:
+        print(f"Error: {error}. Audio process falls back to silent output.")
+        backend = NullBackend(period_size, periods)
+        backend.open(synth)
+
+    sfid = synth.sfload(soundfont) if os.path.exists(soundfont) else -1
+    if sfid >= 0:
+        synth.program_select(0, sfid, 0, 0)
+    ring.set(_SFID, sfid)
+    ring.set(_HEARTBEAT, time.perf_counter())
+    ready.set()
+
+    # Counters carry on across restarts
+    consumed = ring.get(_CONSUMED)
+    latency_total = ring.get(_LATENCY_TOTAL)
+    latency_max = ring.get(_LATENCY_MAX)
+    try:
+        while not ring.get(_STOP):
+            wakeup.acquire(timeout=HEARTBEAT_INTERVAL)
+            now = time.perf_counter()
+            ring.set(_HEARTBEAT, now)
+
+            records = ring.pop_all()
+            for sent, code, channel, key, value in records:
+                if code == NOTE_ON_CODE:
+                    synth.noteon(channel, key, value)
+                elif code == NOTE_OFF_CODE:
+                    synth.noteoff(channel, key)
+                elif code == PROGRAM_CODE:
+                    synth.program_change(channel, key)
+                elif code == CONTROL_CODE:
+                    synth.cc(channel, key, value)
+                latency = now - sent
+                latency_total += latency
+                latency_max = max(latency_max, latency)
+            if records:
+                consumed += len(records)
+                ring.set(_CONSUMED, consumed)
+                ring.set(_LATENCY_TOTAL, latency_total)
+                ring.set(_LATENCY_MAX, latency_max)
+    finally:
+        backend.close()
+        synth.delete()
+        del ring
+        shm.close()
+
+
+class RemoteSynth:
+    # Proxy for a FluidSynth instance running in a worker process
+    #
+    # It offers the subset of the fluidsynth.Synth interface the engine uses
+    # (noteon/noteoff/program_change/cc/sfload/program_select/delete), so it
+    # can stand in for the synth behind the voice manager and scheduler.
+    # Events are 16-byte records in a shared-memory ring; a semaphore wakes
+    # the worker. A monitor thread restarts the worker if it dies or stops
+    # sending heartbeats.
+
+    def __init__(self, soundfont, backend=None, period_size=None, periods=None, capacity=RING_CAPACITY):
+        self.soundfont = soundfont
+        self._worker_args = (capacity, soundfont, backend, period_size, periods)
+        self._context = multiprocessing.get_context("spawn")  # Never fork a Qt process
+
+        self._shm = shared_memory.SharedMemory(create=True, size=EventRing.size(capacity))
+        self.ring = EventRing(self._shm.buf, capacity)
+        self.ring.reset()
+        self._ready = self._context.Event()
+        self._wakeup = self._context.Semaphore(0)
+        self._lock = threading.Lock()   # The scheduler and GUI threads both send
+        self._process = None
+        self._closed = False
+
+        # Counters
+        self.restarts = 0
+        self.dropped = 0
+
+        self._start_worker()
+        self._monitor = threading.Thread(target=self._watch, name="AudioProcessMonitor", daemon=True)
+        self._monitor.start()
+
+    # Worker lifecycle
+
+    def _start_worker(self):
+        self._ready.clear()
+        self.ring.set(_STOP, 0)
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(self._shm.name,) + self._worker_args + (self._ready, self._wakeup),
+            name="PianoChordAudio",
+            daemon=True,
+        )
+        self._process.start()
+
+    def _watch(self):
+        # Health check loop (monitor thread)
+        while not self._closed:
+            time.sleep(HEALTH_CHECK_INTERVAL)
+            if self._closed:
+                return
+            if not self.is_healthy():
+                print("Error: audio process is not responding; restarting it")
+                self.restart()
+
+    def is_healthy(self):
+        # Alive, and beating once the SoundFont has loaded
+        if self._process is None or not self._process.is_alive():
+            return False
+        if not self._ready.is_set():
+            return True  # Still loading the SoundFont
+        return time.perf_counter() - self.ring.get(_HEARTBEAT) < HEARTBEAT_TIMEOUT
+
+    def restart(self):
+        # Replace the worker; events queued for the old one are dropped
+        with self._lock:
+            if self._process is not None:
+                self._process.terminate()
+                self._process.join(timeout=1.0)
+            self.ring.set(_READ, self.ring.get(_WRITE))
+            self.restarts += 1
+            self._start_worker()
+
+    # Synth interface
+
+    def _send(self, code, channel, key, value):
+        with self._lock:
+            if self.ring.push(code, channel, key, value):
+                self._wakeup.release()
+            else:
+                self.dropped += 1
+
+    def noteon(self, channel, key, velocity):
+        self._send(NOTE_ON_CODE, channel, key, velocity)
+
+    def noteoff(self, channel, key):
+        self._send(NOTE_OFF_CODE, channel, key, 0)
+
+    def program_change(self, channel, program):
+        self._send(PROGRAM_CODE, channel, program, 0)
+
+    def cc(self, channel, controller, value):
+        self._send(CONTROL_CODE, channel, controller, value)
+
+    def sfload(self, path):
+        # The worker loads the SoundFont it was started with; wait for it
+        if not self._ready.wait(LOAD_TIMEOUT):
+            return -1
+        return self.ring.get(_SFID)
+
+    def program_select(self, channel, sfid, bank, preset):
+        # The worker already selected its SoundFont; pick the preset
+        self.program_change(channel, preset)
+
+    def delete(self):
+        # Stop the worker and release the shared memory
+        self._closed = True
+        if self._process is not None:
+            self.ring.set(_STOP, 1)
+            self._wakeup.release()
+            self._process.join(timeout=1.0)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(timeout=1.0)
+            self._process = None
+        self.ring.buffer = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def stats(self):
+        # Health and event-queue latency of the audio process
+        consumed = self.ring.get(_CONSUMED)
+        return {
+            "alive": self._process is not None and self._process.is_alive(),
+            "ready": self._ready.is_set(),
+            "heartbeat_age_ms": (time.perf_counter() - self.ring.get(_HEARTBEAT)) * 1000.0,
+            "queued": self.ring.pending(),
+            "consumed": consumed,
+            "dropped": self.dropped,
+            "restarts": self.restarts,
+            "mean_latency_ms": self.ring.get(_LATENCY_TOTAL) / consumed * 1000.0 if consumed else 0.0,
+            "max_latency_ms": self.ring.get(_LATENCY_MAX) * 1000.0,
+        }
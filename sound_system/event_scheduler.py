@@ -0,0 +1,271 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+# Event kinds understood by the scheduler
+NOTE_ON = "noteon"
+NOTE_OFF = "noteoff"
+PROGRAM = "program"
+CONTROL = "cc"
+
+# Number of recent batches whose noteon spread / first noteon is remembered
+SPREAD_HISTORY = 256
+
+
+class EventScheduler:
+    # Time-ordered MIDI event queue dispatched from a dedicated thread
+    #
+    # Events are (time_ms, kind, channel, key, value) tuples where time_ms is
+    # relative to the moment the batch is scheduled. For NOTE_ON the value is
+    # the velocity, for PROGRAM the key is the program number and the value is
+    # ignored, for CONTROL the key is the controller number. The sink is
+    # anything with noteon/noteoff/program_change/cc methods (a
+    # fluidsynth.Synth works as-is).
+
+    def __init__(self, sink):
+        self.sink = sink
+        self._queue = []
+        self._sequence = itertools.count()
+        self._batch_ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._running = True
+
+        # Statistics
+        self.dispatched = 0
+        self.cancelled = 0
+        self.max_depth = 0
+        self._lateness_total = 0.0
+        self._lateness_max = 0.0
+
+        # Batch id -> [first noteon time, last noteon time, noteons left]
+        self._batch_spans = OrderedDict()
+        # Batch id -> measured first-to-last noteon spread (seconds)
+        self._batch_spreads = OrderedDict()
+        self.last_batch_spread = None
+        # Batch id -> dispatch time of its first noteon (perf_counter)
+        self._first_noteons = OrderedDict()
+        # (owner, channel, key) -> noteons sent and not yet matched by a noteoff
+        self._sounding = {}
+
+        self._thread = threading.Thread(target=self._run, name="EventScheduler", daemon=True)
+        self._thread.start()
+
+    def schedule(self, events, owner=None):
+        # Queue a batch of events in one call and return the batch id
+        start = time.perf_counter()
+        batch_id = next(self._batch_ids)
+        with self._condition:
+            note_ons = 0
+            for time_ms, kind, channel, key, value in events:
+                due = start + time_ms / 1000.0
+                heapq.heappush(self._queue, (due, next(self._sequence), kind, channel, key, value, owner, batch_id))
+                if kind == NOTE_ON:
+                    note_ons += 1
+            if note_ons > 1:
+                self._batch_spans[batch_id] = [None, None, note_ons]
+                if len(self._batch_spans) > SPREAD_HISTORY:
+                    self._batch_spans.popitem(last=False)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._condition.notify()
+        return batch_id
+
+    def note_on(self, channel, key, velocity, delay_ms=0, owner=None):
+        # Convenience wrapper for a single noteon
+        return self.schedule([(delay_ms, NOTE_ON, channel, key, velocity)], owner)
+
+    def note_off(self, channel, key, delay_ms=0, owner=None):
+        # Convenience wrapper for a single noteoff
+        return self.schedule([(delay_ms, NOTE_OFF, channel, key, 0)], owner)
+
+    def cancel_channel(self, channel):
+        # Drop all pending events on a channel
+        return self._cancel(lambda entry: entry[3] == channel)
+
+    def cancel_owner(self, owner):
+        # Drop all pending events queued by an owner
+        return self._cancel(lambda entry: entry[6] == owner)
+
+    def release_owner(self, owner):
+        # Queue a noteoff for every note an owner started and has not
+        # released yet (e.g. notes whose noteoff was never scheduled).
+        # They go through the queue so they land after any noteon that is
+        # being dispatched right now.
+        with self._condition:
+            notes = [(note, count) for note, count in self._sounding.items() if note[0] == owner]
+            now = time.perf_counter()
+            for note, count in notes:
+                del self._sounding[note]
+                for _ in range(count):
+                    heapq.heappush(self._queue, (now, next(self._sequence), NOTE_OFF, note[1], note[2], 0, owner, 0))
+            if notes:
+                self._condition.notify()
+        return sum(count for _, count in notes)
+
+    def _cancel(self, predicate):
+        # Remove matching events; pending noteoffs of notes that already
+        # started are sent right away so they never hang
+        with self._condition:
+            removed = [entry for entry in self._queue if predicate(entry)]
+            if not removed:
+                return 0
+            self._queue = [entry for entry in self._queue if not predicate(entry)]
+            heapq.heapify(self._queue)
+            self.cancelled += len(removed)
+            releases = self._started_note_offs(removed)
+            self._condition.notify()
+
+        for channel, key in releases:
+            self.sink.noteoff(channel, key)
+        return len(removed)
+
+    def _started_note_offs(self, entries):
+        # (channel, key) of the noteoffs among entries whose noteon has been
+        # sent by the same owner; a noteoff whose noteon never went out would
+        # release a voice some other owner is holding. Call with the lock held.
+        releases = []
+        for entry in sorted(entries):
+            if entry[2] != NOTE_OFF:
+                continue
+            note = (entry[6], entry[3], entry[4])
+            count = self._sounding.get(note, 0)
+            if count > 0:
+                self._release_sounding(note)
+                releases.append((entry[3], entry[4]))
+        return releases
+
+    def _release_sounding(self, note):
+        # One noteon of (owner, channel, key) has been matched by its noteoff
+        count = self._sounding.get(note, 0)
+        if count > 1:
+            self._sounding[note] = count - 1
+        else:
+            self._sounding.pop(note, None)
+
+    def batch_spread_ms(self, batch_id):
+        # Measured time between the first and last noteon of a batch, or
+        # None while the batch is still playing (or had a single noteon)
+        with self._condition:
+            spread = self._batch_spreads.get(batch_id)
+        return spread * 1000.0 if spread is not None else None
+
+    def batch_noteon_time(self, batch_id):
+        # perf_counter() time the batch's first noteon was sent to the sink,
+        # or None if it has not been sent yet
+        with self._condition:
+            return self._first_noteons.get(batch_id)
+
+    def queue_depth(self):
+        # Number of events still waiting to be dispatched
+        with self._condition:
+            return len(self._queue)
+
+    def stats(self):
+        # Snapshot of queue depth and lateness statistics (milliseconds)
+        with self._condition:
+            depth = len(self._queue)
+            dispatched = self.dispatched
+            mean_lateness = self._lateness_total / dispatched if dispatched else 0.0
+            return {
+                "queue_depth": depth,
+                "max_queue_depth": self.max_depth,
+                "dispatched": dispatched,
+                "cancelled": self.cancelled,
+                "mean_lateness_ms": mean_lateness * 1000.0,
+                "max_lateness_ms": self._lateness_max * 1000.0,
+                "last_batch_spread_ms": (
+                    self.last_batch_spread * 1000.0 if self.last_batch_spread is not None else None
+                ),
+            }
+
+    def _run(self):
+        # Dispatch loop: sleep until the earliest event is due, then fire
+        # every event whose time has come
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                wait = self._queue[0][0] - time.perf_counter()
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+
+                now = time.perf_counter()
+                due_events = []
+                while self._queue and self._queue[0][0] <= now:
+                    entry = heapq.heappop(self._queue)
+                    due_events.append(entry)
+                    # Counted as it leaves the queue, so a cancel from now on
+                    # knows the note has started
+                    note = (entry[6], entry[3], entry[4])
+                    if entry[2] == NOTE_ON:
+                        self._sounding[note] = self._sounding.get(note, 0) + 1
+                    elif entry[2] == NOTE_OFF:
+                        self._release_sounding(note)
+
+            for entry in due_events:
+                self._dispatch(entry)
+
+    def _dispatch(self, entry):
+        # Send one event to the sink and record how late it was
+        due, _, kind, channel, key, value, _, batch_id = entry
+        if kind == NOTE_ON:
+            self.sink.noteon(channel, key, value)
+            sent_at = time.perf_counter()
+            self._record_noteon(batch_id, sent_at)
+            self._record_spread(batch_id, sent_at)
+        elif kind == NOTE_OFF:
+            self.sink.noteoff(channel, key)
+        elif kind == PROGRAM:
+            self.sink.program_change(channel, key)
+        elif kind == CONTROL:
+            self.sink.cc(channel, key, value)
+
+        lateness = max(0.0, time.perf_counter() - due)
+        with self._condition:
+            self.dispatched += 1
+            self._lateness_total += lateness
+            self._lateness_max = max(self._lateness_max, lateness)
+
+    def _record_noteon(self, batch_id, sent_at):
+        # Remember when each batch's first noteon reached the sink
+        with self._condition:
+            if batch_id not in self._first_noteons:
+                self._first_noteons[batch_id] = sent_at
+                if len(self._first_noteons) > SPREAD_HISTORY:
+                    self._first_noteons.popitem(last=False)
+
+    def _record_spread(self, batch_id, sent_at):
+        # Track first/last noteon dispatch times of multi-note batches
+        with self._condition:
+            span = self._batch_spans.get(batch_id)
+            if span is None:
+                return
+            if span[0] is None:
+                span[0] = sent_at
+            span[1] = sent_at
+            span[2] -= 1
+            if span[2] == 0:
+                del self._batch_spans[batch_id]
+                self.last_batch_spread = span[1] - span[0]
+                self._batch_spreads[batch_id] = self.last_batch_spread
+                if len(self._batch_spreads) > SPREAD_HISTORY:
+                    self._batch_spreads.popitem(last=False)
+
+    def shutdown(self, flush_note_offs=True):
+        # Stop the dispatch thread, optionally releasing pending notes first
+        with self._condition:
+            pending = self._queue
+            self._queue = []
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=1.0)
+
+        if flush_note_offs:
+            with self._condition:
+                releases = self._started_note_offs(pending)
+            for channel, key in releases:
+                self.sink.noteoff(channel, key)
@@ -0,0 +1,228 @@
+import threading
+import time
+
+import numpy as np
+
+SAMPLERATE = 44100
+VELOCITY_LAYERS = 4         # Timbre layers across the velocity range
+NOTE_SECONDS = 1.5          # Length of each cached note (the envelope has decayed by then)
+PARTIALS = 8                # Harmonics per note
+INHARMONICITY = 0.0004      # Piano-like stretching of the upper partials
+
+# ADSR envelope
+ATTACK_SECONDS = 0.005
+DECAY_SECONDS = 0.35
+SUSTAIN_LEVEL = 0.25
+RELEASE_SECONDS = 0.12
+
+MASTER_GAIN = 0.2           # Headroom for chords before the mix is clipped
+
+VOLUME_CC = 7
+ALL_SOUND_OFF_CC = 120
+ALL_NOTES_OFF_CC = 123
+
+
+def velocity_layer(velocity):
+    # Velocity (1-127) -> timbre layer index
+    return min(VELOCITY_LAYERS - 1, max(0, velocity - 1) * VELOCITY_LAYERS // 127)
+
+
+def _envelope(frames, midi_note):
+    # Attack-decay-sustain part of the ADSR; the sustain level fades slowly,
+    # faster for high notes, like a struck string
+    t = np.arange(frames, dtype=np.float32) / SAMPLERATE
+    attack = np.minimum(t / ATTACK_SECONDS, 1.0)
+    decay = SUSTAIN_LEVEL + (1.0 - SUSTAIN_LEVEL) * np.exp(-np.maximum(t - ATTACK_SECONDS, 0.0) / DECAY_SECONDS)
+    fade = np.exp(-t * (0.6 + max(0, midi_note - 48) * 0.05))
+    return attack * decay * fade
+
+
+def _release(positions, released_at):
+    # Linear release ramp from the frame the key was let go
+    return np.clip(1.0 - (positions - released_at) / (RELEASE_SECONDS * SAMPLERATE), 0.0, 1.0)
+
+
+class _Voice:
+    __slots__ = ("channel", "key", "wave", "position", "gain", "released_at")
+
+    def __init__(self, channel, key, wave, gain):
+        self.channel = channel
+        self.key = key
+        self.wave = wave
+        self.position = 0
+        self.gain = gain
+        self.released_at = None
+
+
+class FallbackSynth:
+    # Pure-NumPy additive synthesizer used when FluidSynth or the SoundFont
+    # is unavailable
+    #
+    # It has the subset of the fluidsynth.Synth interface the engine uses
+    # (noteon/noteoff/program_change/cc/get_samples/...), so the voice
+    # manager, scheduler and audio backends drive it unchanged. Each
+    # (note, velocity layer) waveform is synthesized once with its ADSR
+    # envelope baked in and cached; playback is slicing and summing the
+    # cached arrays.
+
+    SOUNDFONT_ID = "fallback"  # Render-cache identity of this "sound font"
+
+    def __init__(self, samplerate=SAMPLERATE):
+        self.samplerate = samplerate
+        self.settings = {}
+        self.audio_driver = None
+        self._table = {}          # (midi note, layer) -> float32 waveform
+        self._voices = []
+        self._volume = {}         # channel -> CC 7 gain
+        self._lock = threading.Lock()
+
+        # Counters
+        self.blocks_rendered = 0
+        self.render_seconds = 0.0
+        self.peak_voices = 0
+
+    # Wavetable
+
+    def wave(self, midi_note, layer):
+        # Cached waveform of one note in one velocity layer
+        wave = self._table.get((midi_note, layer))
+        if wave is None:
+            wave = self._synthesize(midi_note, layer)
+            self._table[(midi_note, layer)] = wave
+        return wave
+
+    def _synthesize(self, midi_note, layer):
+        # Additive synthesis: inharmonic partials, brighter in louder layers
+        frames = int(NOTE_SECONDS * self.samplerate)
+        fundamental = 440.0 * 2.0 ** ((midi_note - 69) / 12.0)
+        harmonics = np.arange(1, PARTIALS + 1, dtype=np.float64)
+        frequencies = fundamental * harmonics * np.sqrt(1.0 + INHARMONICITY * harmonics ** 2)
+        amplitudes = harmonics ** -(2.0 - layer * 0.35)
+        amplitudes[frequencies >= self.samplerate / 2] = 0.0
+
+        t = np.arange(frames, dtype=np.float64) / self.samplerate
+        wave = (amplitudes[:, None] * np.sin(2.0 * np.pi * frequencies[:, None] * t)).sum(axis=0)
+        wave /= amplitudes.sum() or 1.0
+        return (wave * _envelope(frames, midi_note)).astype(np.float32)
+
+    def warm(self, notes=range(48, 97), layers=range(VELOCITY_LAYERS)):
+        # Pre-build waveforms (e.g., the keyboard's range) off the hot path
+        for midi_note in notes:
+            for layer in layers:
+                self.wave(midi_note, layer)
+
+    def table_size(self):
+        # Cached waveforms and their memory in bytes
+        return len(self._table), sum(wave.nbytes for wave in self._table.values())
+
+    # Synth interface
+
+    def setting(self, name, value):
+        self.settings[name] = value
+
+    def sfload(self, path):
+        return 1
+
+    def program_select(self, channel, sfid, bank, preset):
+        pass
+
+    def program_change(self, channel, program):
+        pass  # One timbre
+
+    def noteon(self, channel, key, velocity):
+        if velocity <= 0:
+            return self.noteoff(channel, key)
+        wave = self.wave(key, velocity_layer(velocity))
+        with self._lock:
+            self._release_key(channel, key)
+            self._voices.append(_Voice(channel, key, wave, velocity / 127.0))
+            self.peak_voices = max(self.peak_voices, len(self._voices))
+
+    def noteoff(self, channel, key):
+        with self._lock:
+            self._release_key(channel, key)
+
+    def _release_key(self, channel, key):
+        for voice in self._voices:
+            if voice.channel == channel and voice.key == key and voice.released_at is None:
+                voice.released_at = voice.position
+
+    def cc(self, channel, controller, value):
+        if controller == VOLUME_CC:
+            self._volume[channel] = value / 127.0
+        elif controller in (ALL_SOUND_OFF_CC, ALL_NOTES_OFF_CC):
+            self.all_sounds_off(channel)
+
+    def all_sounds_off(self, channel):
+        with self._lock:
+            self._voices = [voice for voice in self._voices if voice.channel != channel]
+
+    def get_samples(self, frames):
+        # Mix the sounding voices into an interleaved int16 stereo block,
+        # the same layout fluidsynth.Synth.get_samples() returns
+        started = time.perf_counter()
+        mix = np.zeros(frames, dtype=np.float32)
+        with self._lock:
+            sounding = []
+            for voice in self._voices:
+                start = voice.position
+                chunk = voice.wave[start:start + frames]
+                count = len(chunk)
+                if not count:
+                    continue
+                gain = voice.gain * self._volume.get(voice.channel, 1.0)
+                if voice.released_at is not None:
+                    envelope = _release(np.arange(start, start + count, dtype=np.float32), voice.released_at)
+                    mix[:count] += chunk * envelope * gain
+                    finished = count < frames or envelope[-1] <= 0.0
+                else:
+                    mix[:count] += chunk * gain
+                    finished = count < frames
+                voice.position += count
+                if not finished:
+                    sounding.append(voice)
+            self._voices = sounding
+
+        self.blocks_rendered += 1
+        self.render_seconds += time.perf_counter() - started
+        return np.repeat(self._to_int16(mix), 2)
+
+    def render_chord(self, midi_notes, velocity=100, duration_ms=500):
+        # Render a whole chord in one vectorized mix: (frames, 2) int16,
+        # the render-cache format
+        midi_notes = [max(0, min(127, int(note))) for note in midi_notes]
+        if not midi_notes:
+            return np.zeros((0, 2), dtype=np.int16)
+        layer = velocity_layer(velocity)
+        waves = np.stack([self.wave(note, layer) for note in midi_notes])
+
+        held = int(duration_ms * self.samplerate / 1000)
+        frames = min(waves.shape[1], held + int(RELEASE_SECONDS * self.samplerate))
+        envelope = _release(np.arange(frames, dtype=np.float32), held)
+        mix = waves[:, :frames].sum(axis=0) * envelope * (velocity / 127.0)
+        return np.repeat(self._to_int16(mix)[:, None], 2, axis=1)
+
+    @staticmethod
+    def _to_int16(mix):
+        return (np.clip(mix * MASTER_GAIN, -1.0, 1.0) * 32767).astype(np.int16)
+
+    def active_voices(self):
+        with self._lock:
+            return len(self._voices)
+
+    def stats(self):
+        # Wavetable size and mixing cost (a baseline for synth benchmarks)
+        waves, table_bytes = self.table_size()
+        return {
+            "cached_waves": waves,
+            "table_bytes": table_bytes,
+            "active_voices": self.active_voices(),
+            "peak_voices": self.peak_voices,
+            "blocks_rendered": self.blocks_rendered,
+            "mean_block_ms": self.render_seconds / self.blocks_rendered * 1000.0 if self.blocks_rendered else 0.0,
+        }
+
+    def delete(self):
+        with self._lock:
+            self._voices = []
+        self._table.clear()
@@ -0,0 +1,353 @@
+import heapq
+import struct
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from frame_timing import frame_interval_ms
+from sound_system.event_scheduler import NOTE_ON, NOTE_OFF, PROGRAM, CONTROL
+
+DEFAULT_TICKS_PER_BEAT = 480
+DEFAULT_BPM = 120          # Quarter notes per minute when a file has no tempo
+DRUM_CHANNEL = 9           # General MIDI percussion (not shown on the keys)
+LOOKAHEAD_MS = 250         # How far ahead of the clock events are scheduled
+
+_TEMPO = "tempo"           # Internal reader event: value = microseconds per quarter
+
+
+# Writing
+
+def _varlen(value):
+    # MIDI variable-length quantity
+    encoded = bytearray([value & 0x7F])
+    value >>= 7
+    while value:
+        encoded.insert(0, (value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(encoded)
+
+
+def encode_track(events, bpm=DEFAULT_BPM, beats_per_bar=4, beat_unit=4, ticks_per_beat=DEFAULT_TICKS_PER_BEAT):
+    # Encode (time_ms, kind, channel, key, value) events as one MTrk body.
+    # bpm counts quarter notes; note-offs sort before note-ons at the same
+    # time so repeated notes are not cut short.
+    track = bytearray()
+    tempo = round(60_000_000 / bpm)
+    track += b"\x00\xff\x51\x03" + tempo.to_bytes(3, "big")
+    track += b"\x00\xff\x58\x04" + bytes((beats_per_bar, beat_unit.bit_length() - 1, 24, 8))
+
+    ticks_per_ms = ticks_per_beat * bpm / 60000.0
+    last_tick = 0
+    for time_ms, kind, channel, key, value in sorted(events, key=lambda event: (event[0], event[1] != NOTE_OFF)):
+        tick = max(last_tick, round(time_ms * ticks_per_ms))
+        if kind == NOTE_ON:
+            message = bytes((0x90 | channel, key, value))
+        elif kind == NOTE_OFF:
+            message = bytes((0x80 | channel, key, 0))
+        elif kind == PROGRAM:
+            message = bytes((0xC0 | channel, key))
+        elif kind == CONTROL:
+            message = bytes((0xB0 | channel, key, value))
+        else:
+            continue
+        track += _varlen(tick - last_tick) + message
+        last_tick = tick
+
+    track += b"\x00\xff\x2f\x00"
+    return bytes(track)
+
+
+def write_midi(path, events, bpm=DEFAULT_BPM, beats_per_bar=4, beat_unit=4, ticks_per_beat=DEFAULT_TICKS_PER_BEAT):
+    # Write events to a format 0 Standard MIDI File
+    track = encode_track(events, bpm, beats_per_bar, beat_unit, ticks_per_beat)
+    with open(path, "wb") as midi_file:
+        midi_file.write(b"MThd" + struct.pack(">IHHH", 6, 0, 1, ticks_per_beat))
+        midi_file.write(b"MTrk" + struct.pack(">I", len(track)))
+        midi_file.write(track)
+
+
+class MidiRecorder:
+    # Records live keyboard input as scheduler-format events
+
+    def __init__(self):
+        self.events = []
+        self.recording = False
+        self._started = None
+
+    def start(self):
+        self.events = []
+        self._started = time.perf_counter()
+        self.recording = True
+
+    def stop(self):
+        # Stop recording and release any notes still held
+        if not self.recording:
+            return
+        held = {}
+        for event in self.events:
+            if event[1] == NOTE_ON:
+                held[(event[2], event[3])] = held.get((event[2], event[3]), 0) + 1
+            elif event[1] == NOTE_OFF and held.get((event[2], event[3])):
+                held[(event[2], event[3])] -= 1
+        for (channel, key), count in held.items():
+            for _ in range(count):
+                self.note_off(key, channel)
+        self.recording = False
+
+    def _now_ms(self):
+        return (time.perf_counter() - self._started) * 1000.0
+
+    def note_on(self, key, velocity, channel=0):
+        if self.recording:
+            self.events.append((self._now_ms(), NOTE_ON, channel, key, velocity))
+
+    def note_off(self, key, channel=0):
+        if self.recording:
+            self.events.append((self._now_ms(), NOTE_OFF, channel, key, 0))
+
+    def save(self, path, bpm=DEFAULT_BPM):
+        # Write the recording (timed from the moment recording started)
+        write_midi(path, self.events, bpm)
+        return len(self.events)
+
+
+# Reading
+
+def _read_varlen(data, pos):
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos
+
+
+def _track_events(data, track_index):
+    # Decode one track lazily: yields (tick, track, kind, channel, key, value)
+    tick = 0
+    pos = 0
+    status = None
+    while pos < len(data):
+        delta, pos = _read_varlen(data, pos)
+        tick += delta
+        byte = data[pos]
+
+        if byte == 0xFF:
+            # Meta event; only tempo and end of track matter for playback
+            meta_type = data[pos + 1]
+            length, pos = _read_varlen(data, pos + 2)
+            if meta_type == 0x51:
+                yield tick, track_index, _TEMPO, 0, 0, int.from_bytes(data[pos:pos + length], "big")
+            elif meta_type == 0x2F:
+                return
+            pos += length
+            continue
+        if byte in (0xF0, 0xF7):
+            # System exclusive: skip
+            length, pos = _read_varlen(data, pos + 1)
+            pos += length
+            continue
+
+        if byte & 0x80:
+            status = byte
+            pos += 1
+        elif status is None:
+            raise ValueError(f"Track {track_index}: data byte without a status byte")
+
+        message = status & 0xF0
+        channel = status & 0x0F
+        if message in (0xC0, 0xD0):
+            key, value = data[pos], 0
+            pos += 1
+        else:
+            key, value = data[pos], data[pos + 1]
+            pos += 2
+
+        if message == 0x90 and value > 0:
+            yield tick, track_index, NOTE_ON, channel, key, value
+        elif message in (0x80, 0x90):
+            yield tick, track_index, NOTE_OFF, channel, key, 0
+        elif message == 0xC0:
+            yield tick, track_index, PROGRAM, channel, key, 0
+        elif message == 0xB0:
+            yield tick, track_index, CONTROL, channel, key, value
+
+
+class MidiFileReader:
+    # Streaming Standard MIDI File reader
+    #
+    # Tracks are decoded lazily and merged by tick with heapq.merge; the tempo
+    # map is applied while merging, so events come out in time order as
+    # (time_ms, kind, channel, key, value) without building the whole song.
+
+    def __init__(self, path):
+        with open(path, "rb") as midi_file:
+            data = midi_file.read()
+        if data[:4] != b"MThd":
+            raise ValueError(f"Not a Standard MIDI File: {path}")
+        header_length, self.format, track_count, division = struct.unpack(">IHHH", data[4:14])
+        if division & 0x8000:
+            raise ValueError("SMPTE time division is not supported")
+        self.ticks_per_beat = division
+
+        # Locate the track chunks (unknown chunks are skipped)
+        self.tracks = []
+        pos = 8 + header_length
+        while pos + 8 <= len(data) and len(self.tracks) < track_count:
+            chunk_type, length = data[pos:pos + 4], struct.unpack(">I", data[pos + 4:pos + 8])[0]
+            if chunk_type == b"MTrk":
+                self.tracks.append(memoryview(data)[pos + 8:pos + 8 + length])
+            pos += 8 + length
+
+    def events(self):
+        # Yield events in time order across all tracks
+        merged = heapq.merge(
+            *(_track_events(track, index) for index, track in enumerate(self.tracks)),
+            key=lambda event: (event[0], event[1]),
+        )
+        tempo = 60_000_000 // DEFAULT_BPM
+        last_tick = 0
+        elapsed_ms = 0.0
+        for tick, _, kind, channel, key, value in merged:
+            elapsed_ms += (tick - last_tick) * tempo / 1000.0 / self.ticks_per_beat
+            last_tick = tick
+            if kind == _TEMPO:
+                tempo = value
+            else:
+                yield elapsed_ms, kind, channel, key, value
+
+
+class MidiFilePlayer(QObject):
+    # Plays a MIDI file through the sound engine with look-ahead scheduling
+    #
+    # Once per display frame the player pulls the events due in the next
+    # LOOKAHEAD_MS from the reader and hands them to the scheduler as one
+    # batch, then applies every key change that has become due since the
+    # last frame as a single diff. Dense files therefore cost one batch and
+    # one highlight update per frame however many notes they contain.
+
+    OWNER = "midifile"
+
+    # MIDI notes whose highlight turned on / off this frame
+    keysChanged = pyqtSignal(list, list)
+    finished = pyqtSignal()
+
+    def __init__(self, sound_engine, parent=None):
+        super().__init__(parent)
+        self.sound_engine = sound_engine
+        self.velocity_scale = 1.0
+
+        self._events = None
+        self._next_event = None
+        self._started = 0.0
+        self._last_event_ms = 0.0  # File time of the latest event scheduled
+        self._pending = deque()   # (time_ms, on, key) key changes not shown yet
+        self._held = {}           # MIDI note -> number of sounding file notes
+        self._shown = set()       # Notes currently highlighted
+        self._channels = set()    # Channels the file has sent events on
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(frame_interval_ms())
+        self._timer.timeout.connect(self._on_frame)
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.events_scheduled = 0
+        self.frames = 0
+        self.key_changes = 0
+        self.highlight_updates = 0
+        self.max_events_per_frame = 0
+
+    def play(self, path):
+        # Start playing a file (raises OSError/ValueError for unreadable files)
+        reader = MidiFileReader(path)
+        self.stop()
+        self._events = reader.events()
+        self._next_event = next(self._events, None)
+        self._pending.clear()
+        self._held.clear()
+        self._channels.clear()
+        self._last_event_ms = 0.0
+        self._reset_stats()
+        self._started = time.perf_counter()
+        self._timer.start()
+        self._on_frame()
+
+    def stop(self):
+        # Stop playback, release sounding notes, reset the channels the
+        # file used (pedal, piano program) and clear the highlights
+        if self._events is None:
+            return
+        self._timer.stop()
+        self._events = None
+        self._next_event = None
+        self.sound_engine.stop_events(self.OWNER, self._channels)
+        self._pending.clear()
+        self._held.clear()
+        if self._shown:
+            released = sorted(self._shown)
+            self._shown.clear()
+            self.keysChanged.emit([], released)
+
+    def is_playing(self):
+        return self._events is not None
+
+    def _on_frame(self):
+        now_ms = (time.perf_counter() - self._started) * 1000.0
+        self.frames += 1
+
+        # Schedule everything inside the look-ahead window as one batch
+        batch = []
+        horizon = now_ms + LOOKAHEAD_MS
+        while self._next_event is not None and self._next_event[0] <= horizon:
+            time_ms, kind, channel, key, value = self._next_event
+            if kind == NOTE_ON:
+                value = max(1, min(127, int(value * self.velocity_scale)))
+            batch.append((max(0.0, time_ms - now_ms), kind, channel, key, value))
+            self._channels.add(channel)
+            self._last_event_ms = time_ms
+            if kind in (NOTE_ON, NOTE_OFF) and channel != DRUM_CHANNEL:
+                self._pending.append((time_ms, kind == NOTE_ON, key))
+            self._next_event = next(self._events, None)
+        if batch:
+            self.sound_engine.play_events(batch, self.OWNER)
+            self.events_scheduled += len(batch)
+            self.max_events_per_frame = max(self.max_events_per_frame, len(batch))
+
+        # Fold the key changes that are due into one highlight diff
+        while self._pending and self._pending[0][0] <= now_ms:
+            _, on, key = self._pending.popleft()
+            self.key_changes += 1
+            if on:
+                self._held[key] = self._held.get(key, 0) + 1
+            elif self._held.get(key, 0) > 1:
+                self._held[key] -= 1
+            else:
+                self._held.pop(key, None)
+        lit = set(self._held)
+        if lit != self._shown:
+            self.highlight_updates += 1
+            turned_on = sorted(lit - self._shown)
+            turned_off = sorted(self._shown - lit)
+            self._shown = lit
+            self.keysChanged.emit(turned_on, turned_off)
+
+        # Done once every event has gone out, drums and controllers included
+        if self._next_event is None and not self._pending and now_ms >= self._last_event_ms:
+            self._timer.stop()
+            self._events = None
+            # The file's pedal and program changes must not outlive it
+            self.sound_engine.reset_channels(self._channels)
+            self.finished.emit()
+
+    def stats(self):
+        # Playback counters; key_changes / highlight_updates shows coalescing
+        return {
+            "events_scheduled": self.events_scheduled,
+            "frames": self.frames,
+            "max_events_per_frame": self.max_events_per_frame,
+            "key_changes": self.key_changes,
+            "highlight_updates": self.highlight_updates,
+        }
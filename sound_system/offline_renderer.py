@@ -0,0 +1,179 @@
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+import fluidsynth
+
+from sound_engine import SoundEngine
+from chord_composer import ChordComposer
+from sound_system.event_scheduler import NOTE_ON, NOTE_OFF, PROGRAM, CONTROL
+from sound_system.audio_backends import SYNTH_GAIN
+
+DEFAULT_SOUNDFONT = "Sounds/FluidR3_GM.sf2"
+
+
+class OfflineRenderer:
+    # Headless renderer: drives FluidSynth with get_samples() instead of an
+    # audio driver, so chords and progressions can be rendered to PCM buffers
+    # and WAV files faster than real time (CI, build boxes, batch exports)
+
+    BLOCK_FRAMES = 4096  # Frames pulled from the synth per get_samples() call
+
+    def __init__(self, soundfont=DEFAULT_SOUNDFONT, samplerate=44100, gain=SYNTH_GAIN):
+        if not os.path.exists(soundfont):
+            raise FileNotFoundError(f"SoundFont not found: {soundfont}")
+
+        self.soundfont = soundfont
+        self.samplerate = samplerate
+        self.fs = fluidsynth.Synth(gain=gain, samplerate=samplerate)
+        self.sfid = self.fs.sfload(soundfont)
+        self.fs.program_select(0, self.sfid, 0, 0)  # Piano
+
+        # Statistics of the most recent render
+        self.last_render_stats = None
+
+    # Event construction
+
+    @staticmethod
+    def _to_midi(note):
+        # Accept MIDI numbers or note names like "C#4"
+        if isinstance(note, str):
+            return SoundEngine.note_to_midi(note)
+        return int(note)
+
+    def chord_events(self, notes, velocity=100, duration_ms=1500, strum_ms=0, start_ms=0):
+        # Build noteon/noteoff events for one chord
+        events = []
+        for i, note in enumerate(notes):
+            midi_note = self._to_midi(note)
+            if midi_note is None:
+                continue
+            onset = start_ms + i * strum_ms
+            events.append((onset, NOTE_ON, 0, midi_note, velocity))
+            events.append((start_ms + duration_ms, NOTE_OFF, 0, midi_note, 0))
+        return events
+
+    def progression_events(self, progression, seconds_per_chord=1.5, velocity=100):
+        # Build events for a calculate_progression_chords() result
+        composer = ChordComposer()
+        chord_ms = int(seconds_per_chord * 1000)
+        events = []
+        for index, (root, chord_type, inversion) in enumerate(progression):
+            _, chord_notes = composer.composeChord(root, chord_type, inversion)
+            events.extend(self.chord_events(chord_notes, velocity, chord_ms, start_ms=index * chord_ms))
+        return events
+
+    # Rendering
+
+    def iter_blocks(self, events, tail_ms=1000):
+        # Yield (frames, 2) int16 blocks while applying events at their
+        # sample positions; the tail lets releases ring out
+        events = sorted(events, key=lambda event: event[0])
+        end_ms = (events[-1][0] if events else 0) + tail_ms
+        total_frames = int(end_ms * self.samplerate / 1000)
+
+        started = time.perf_counter()
+        cursor = 0
+        for time_ms, kind, channel, key, value in events:
+            target = int(time_ms * self.samplerate / 1000)
+            yield from self._pull(cursor, target)
+            cursor = max(cursor, target)
+            self._apply(kind, channel, key, value)
+        yield from self._pull(cursor, total_frames)
+
+        # Silence anything still sounding so the next render starts clean
+        self.fs.all_sounds_off(0)
+
+        wall_seconds = time.perf_counter() - started
+        audio_seconds = total_frames / self.samplerate
+        self.last_render_stats = {
+            "audio_seconds": audio_seconds,
+            "wall_seconds": wall_seconds,
+            "speed_multiple": audio_seconds / wall_seconds if wall_seconds > 0 else float("inf"),
+        }
+
+    def _pull(self, start_frame, end_frame):
+        # Pull samples from the synth in fixed-size blocks
+        remaining = end_frame - start_frame
+        while remaining > 0:
+            frames = min(self.BLOCK_FRAMES, remaining)
+            yield self.fs.get_samples(frames).reshape(-1, 2)
+            remaining -= frames
+
+    def _apply(self, kind, channel, key, value):
+        # Apply one event to the synth
+        if kind == NOTE_ON:
+            self.fs.noteon(channel, key, value)
+        elif kind == NOTE_OFF:
+            self.fs.noteoff(channel, key)
+        elif kind == PROGRAM:
+            self.fs.program_change(channel, key)
+        elif kind == CONTROL:
+            self.fs.cc(channel, key, value)
+
+    def render_events(self, events, tail_ms=1000):
+        # Render events into a single (frames, 2) int16 array
+        blocks = list(self.iter_blocks(events, tail_ms))
+        if not blocks:
+            return np.zeros((0, 2), dtype=np.int16)
+        return np.concatenate(blocks)
+
+    def render_chord(self, chord, velocity=100, duration_ms=1500, strum_ms=0, tail_ms=1000):
+        # Render a chord; accepts a composeChord() result or a list of notes
+        if isinstance(chord, tuple) and len(chord) == 2 and isinstance(chord[0], str):
+            chord = chord[1]
+        return self.render_events(self.chord_events(chord, velocity, duration_ms, strum_ms), tail_ms)
+
+    def render_progression(self, progression, seconds_per_chord=1.5, velocity=100, tail_ms=1000):
+        # Render a calculate_progression_chords() result
+        return self.render_events(self.progression_events(progression, seconds_per_chord, velocity), tail_ms)
+
+    def write_wav(self, path, events, tail_ms=1000):
+        # Stream rendered blocks straight into a 16-bit stereo WAV file
+        with wave.open(path, "wb") as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(self.samplerate)
+            for block in self.iter_blocks(events, tail_ms):
+                wav_file.writeframes(block.tobytes())
+        return self.last_render_stats
+
+    def cleanup(self):
+        # Release FluidSynth resources
+        self.fs.delete()
+
+
+def main(argv):
+    # Batch export from the command line:
+    #   python -m sound_system.offline_renderer chord C4 major out.wav
+    #   python -m sound_system.offline_renderer progression C4 I-V-vi-IV out.wav
+    if len(argv) != 4 or argv[0] not in ("chord", "progression"):
+        print("Usage: offline_renderer (chord ROOT TYPE | progression ROOT PATTERN) OUTPUT.wav")
+        return 2
+
+    mode, root, spec, output = argv
+    renderer = OfflineRenderer()
+    try:
+        if mode == "chord":
+            _, chord_notes = ChordComposer().composeChord(root, spec)
+            events = renderer.chord_events(chord_notes)
+        else:
+            # "I-V-vi-IV" -> ["I", "V", "vi", "IV"]
+            numerals = [numeral for numeral in spec.split("-") if numeral]
+            progression = ChordComposer().calculate_progression_chords(root, numerals)
+            events = renderer.progression_events(progression)
+
+        stats = renderer.write_wav(output, events)
+        print(
+            f"Rendered {stats['audio_seconds']:.2f}s of audio in {stats['wall_seconds']:.3f}s "
+            f"({stats['speed_multiple']:.1f}x real time) -> {output}"
+        )
+    finally:
+        renderer.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,66 @@
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+
+try:
+    from PyQt5.QtMultimedia import QAudio, QAudioFormat, QAudioOutput
+except ImportError:  # QtMultimedia is optional (missing system audio libraries)
+    QAudioOutput = None
+
+
+class PcmPlayer:
+    # Plays pre-rendered 16-bit stereo PCM buffers through QtMultimedia
+
+    MAX_STREAMS = 4  # Overlapping replays allowed at once
+
+    def __init__(self, samplerate=44100):
+        self.samplerate = samplerate
+        self.available = QAudioOutput is not None
+        self._streams = []
+
+        if self.available:
+            self.format = QAudioFormat()
+            self.format.setSampleRate(samplerate)
+            self.format.setChannelCount(2)
+            self.format.setSampleSize(16)
+            self.format.setCodec("audio/pcm")
+            self.format.setByteOrder(QAudioFormat.LittleEndian)
+            self.format.setSampleType(QAudioFormat.SignedInt)
+
+    def play(self, pcm, volume=1.0):
+        # Start playback of a (frames, 2) int16 buffer; returns False when
+        # no audio output is available
+        if not self.available:
+            return False
+
+        # Retire the oldest stream if too many are still playing
+        while len(self._streams) >= self.MAX_STREAMS:
+            self._stop_stream(self._streams[0])
+
+        buffer = QBuffer()
+        buffer.setData(QByteArray(pcm.tobytes()))
+        buffer.open(QIODevice.ReadOnly)
+
+        output = QAudioOutput(self.format)
+        output.setVolume(volume)
+        stream = (output, buffer)
+        output.stateChanged.connect(lambda state, s=stream: self._on_state_changed(s, state))
+        self._streams.append(stream)
+        output.start(buffer)
+        return True
+
+    def _on_state_changed(self, stream, state):
+        # Release a stream once it has drained
+        if state == QAudio.IdleState:
+            self._stop_stream(stream)
+
+    def _stop_stream(self, stream):
+        # Stop one stream and drop our references to it
+        if stream in self._streams:
+            self._streams.remove(stream)
+            output, buffer = stream
+            output.stop()
+            buffer.close()
+
+    def stop_all(self):
+        # Stop every playing stream
+        for stream in list(self._streams):
+            self._stop_stream(stream)
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+VELOCITY_BUCKET_SIZE = 8  # Velocities 0-127 collapse into 16 cache buckets
+
+# Part of every file name; bump it when rendering changes so files written
+# by an older version are never served
+RENDER_VERSION = 2
+
+
+def velocity_bucket(velocity):
+    # Bucket index for a MIDI velocity
+    return max(0, min(127, int(velocity))) // VELOCITY_BUCKET_SIZE
+
+
+def bucket_velocity(bucket):
+    # Velocity rendered for a bucket: its loudest, so every velocity in the
+    # bucket is reached by turning the playback volume down
+    return min(127, bucket * VELOCITY_BUCKET_SIZE + VELOCITY_BUCKET_SIZE - 1)
+
+
+def soundfont_id(path):
+    # Identify a SoundFont by name, size and modification time so a replaced
+    # file never serves stale audio
+    try:
+        stat = os.stat(path)
+        return f"{os.path.basename(path)}:{stat.st_size}:{int(stat.st_mtime)}"
+    except OSError:
+        return os.path.basename(path)
+
+
+def make_key(midi_notes, velocity, duration_ms, soundfont):
+    # Cache key: (midi notes, velocity bucket, duration, soundfont)
+    return (tuple(int(note) for note in midi_notes), velocity_bucket(velocity), int(duration_ms), soundfont)
+
+
+class RenderCache:
+    # Two-tier cache of rendered PCM: a bounded in-memory LRU in front of a
+    # directory of memory-mapped .npy files that survives restarts
+
+    def __init__(self, cache_dir=".render_cache", max_memory_entries=64):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stores = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path_for(self, key):
+        # Stable file name for a key
+        digest = hashlib.sha1(repr((RENDER_VERSION, key)).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".npy")
+
+    def get(self, key):
+        # Return the cached (frames, 2) int16 buffer or None
+        with self._lock:
+            pcm = self._memory.get(key)
+            if pcm is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return pcm
+
+        if self.cache_dir:
+            path = self._path_for(key)
+            if os.path.exists(path):
+                try:
+                    pcm = np.load(path, mmap_mode="r")
+                except (OSError, ValueError):
+                    pcm = None
+                if pcm is not None:
+                    with self._lock:
+                        self.disk_hits += 1
+                        self._remember(key, pcm)
+                    return pcm
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def contains(self, key):
+        # Check either tier without touching the counters
+        with self._lock:
+            if key in self._memory:
+                return True
+        return bool(self.cache_dir) and os.path.exists(self._path_for(key))
+
+    def put(self, key, pcm):
+        # Store a rendered buffer in memory and on disk
+        pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+        if self.cache_dir:
+            path = self._path_for(key)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as handle:
+                np.save(handle, pcm)
+            os.replace(temp_path, path)
+
+        with self._lock:
+            self.stores += 1
+            self._remember(key, pcm)
+
+    def _remember(self, key, pcm):
+        # Insert into the LRU, evicting the least recently used entries
+        self._memory[key] = pcm
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def clear_memory(self):
+        # Drop the in-memory tier (the disk tier is kept)
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self):
+        # Hit/miss/eviction counters
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stores": self.stores,
+            }
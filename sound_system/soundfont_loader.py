@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal, pyqtSlot
+
+
+class SoundFontLoader(QObject):
+    # Loads a SoundFont into a synth on a worker thread and reports back on
+    # the thread that created the loader (the GUI thread)
+
+    # Emitted with the SoundFont id once loading succeeded
+    loaded = pyqtSignal(int)
+    # Emitted with an error message if loading failed
+    failed = pyqtSignal(str)
+
+    # Internal hand-off from the worker thread
+    _finished = pyqtSignal(int, str)
+
+    def __init__(self, synth, path):
+        super().__init__()
+        self.synth = synth
+        self.path = path
+        self.sfid = None
+        self.load_seconds = None
+        self._thread = None
+        self._finished.connect(self._on_finished, Qt.QueuedConnection)
+
+    def start(self):
+        # Begin loading in the background
+        self._thread = threading.Thread(target=self._load, name="SoundFontLoader", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        # Worker thread body
+        started = time.perf_counter()
+        if not os.path.exists(self.path):
+            self._finished.emit(-1, f"SoundFont not found: {self.path}")
+            return
+        sfid = self.synth.sfload(self.path)
+        self.load_seconds = time.perf_counter() - started
+        if sfid < 0:
+            self._finished.emit(-1, f"Could not load SoundFont: {self.path}")
+        else:
+            self._finished.emit(sfid, "")
+
+    @pyqtSlot(int, str)
+    def _on_finished(self, sfid, error):
+        # Runs on the GUI thread
+        if error:
+            self.failed.emit(error)
+        else:
+            self.sfid = sfid
+            self.loaded.emit(sfid)
+
+    def wait(self, timeout=None):
+        # Block until the worker is done (used on shutdown)
+        if self._thread is not None:
+            self._thread.join(timeout)
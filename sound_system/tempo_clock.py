@@ -0,0 +1,198 @@
+import time
+
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
+
+DEFAULT_BPM = 160
+DEFAULT_BEATS_PER_BAR = 4
+MIN_BPM = 30
+MAX_BPM = 300
+
+# Time signatures offered in the UI: label -> (beats per bar, beat unit)
+TIME_SIGNATURES = {
+    "4/4": (4, 4),
+    "3/4": (3, 4),
+    "2/4": (2, 4),
+    "6/8": (6, 8),
+}
+
+
+class TempoClock(QObject):
+    # Drift-free beat clock for timeline playback
+    #
+    # Beat and step times are absolute beat positions converted to
+    # perf_counter() deadlines from a fixed anchor, and every wake-up
+    # re-arms a single-shot timer for the time remaining until the next
+    # beat or step. Late wake-ups therefore show up as jitter (measured on
+    # every beat) but never accumulate into drift. Tempo changes re-anchor
+    # the clock at the last beat; a time signature change while running
+    # waits for the next bar line and then respaces the remaining steps.
+
+    # Emitted with the step index when a step is due
+    tick = pyqtSignal(int)
+    # Emitted when a non-looping timeline has played its last step
+    finished = pyqtSignal()
+
+    def __init__(self, bpm=DEFAULT_BPM, beats_per_bar=DEFAULT_BEATS_PER_BAR, parent=None):
+        super().__init__(parent)
+        self.bpm = bpm
+        self.beats_per_bar = beats_per_bar
+
+        self.step_beats = ()     # Beat offset of each step within one pass
+        self.length_beats = 0    # Length of one pass in beats
+        self.loop = False
+        self._step = 0           # Index of the next step, counting loops
+        self._beat = 0           # Next whole beat, counting from the start
+        self._anchor_time = 0.0
+        self._anchor_beat = 0.0
+        self._origin_beat = 0    # Beat of the last meter change (a bar line)
+        self._origin_offset = 0.0  # Timeline position (in step beats) at that beat
+        self._pending_beats_per_bar = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.ticks = 0
+        self.beats = 0
+        self.total_jitter = 0.0
+        self.max_jitter = 0.0
+        self.last_jitter = 0.0
+
+    # Tempo
+
+    @property
+    def seconds_per_beat(self):
+        return 60.0 / self.bpm
+
+    def bar_seconds(self):
+        # Length of one bar at the current tempo and time signature
+        return self.beats_per_bar * self.seconds_per_beat
+
+    def set_tempo(self, bpm):
+        # Change the tempo; a running clock keeps its place
+        bpm = min(max(bpm, MIN_BPM), MAX_BPM)
+        if self.is_running():
+            self._reanchor()
+        self.bpm = bpm
+        if self.is_running():
+            self._arm()
+
+    def set_time_signature(self, beats_per_bar):
+        # Beats per bar; a running clock switches at the next bar line
+        if self.is_running():
+            self._pending_beats_per_bar = beats_per_bar
+        else:
+            self.beats_per_bar = beats_per_bar
+
+    def _apply_time_signature(self):
+        # At a bar line: steps are bars of the old meter, so every step still
+        # to come is moved to the same bar of the new one
+        old, new = self.beats_per_bar, self._pending_beats_per_bar
+        self._origin_offset = (self._origin_offset + self._beat - self._origin_beat) * new / old
+        self._origin_beat = self._beat
+        self.step_beats = tuple(beat * new / old for beat in self.step_beats)
+        self.length_beats = self.length_beats * new / old
+        self.beats_per_bar = new
+        self._pending_beats_per_bar = None
+
+    # Playback
+
+    def start(self, step_beats, length_beats, loop=False):
+        # Play a timeline: step_beats are increasing beat offsets of each step
+        # within one pass of length_beats beats
+        self.stop()
+        if not step_beats:
+            return
+        self.step_beats = tuple(step_beats)
+        self.length_beats = length_beats
+        self.loop = loop
+        self._step = 0
+        self._beat = 0
+        self._anchor_time = time.perf_counter()
+        self._anchor_beat = 0.0
+        self._origin_beat = 0
+        self._origin_offset = 0.0
+        self._reset_stats()
+        self._arm()
+
+    def stop(self):
+        self._timer.stop()
+        if self._pending_beats_per_bar is not None:
+            self.beats_per_bar = self._pending_beats_per_bar
+            self._pending_beats_per_bar = None
+
+    def set_loop(self, loop):
+        self.loop = loop
+
+    def is_running(self):
+        return self._timer.isActive()
+
+    def _beat_of(self, step):
+        # Absolute beat position of a step, counting loop passes and meter changes
+        passes, index = divmod(step, len(self.step_beats))
+        return self._origin_beat + passes * self.length_beats + self.step_beats[index] - self._origin_offset
+
+    def _time_of(self, beat):
+        return self._anchor_time + (beat - self._anchor_beat) * self.seconds_per_beat
+
+    def _reanchor(self):
+        # Pin the anchor to the last beat so a tempo change only affects the
+        # time still to come
+        beat = max(self._beat - 1, 0)
+        self._anchor_time = self._time_of(beat)
+        self._anchor_beat = beat
+
+    def _arm(self):
+        next_beat = min(self._beat, self._beat_of(self._step))
+        remaining = self._time_of(next_beat) - time.perf_counter()
+        self._timer.start(max(0, int(remaining * 1000)))
+
+    def _on_timeout(self):
+        now = time.perf_counter()
+        step_beat = self._beat_of(self._step)
+        due = min(self._beat, step_beat)
+        if now < self._time_of(due) - 0.0005:
+            self._arm()  # Woke up early (timer granularity); wait the rest
+            return
+
+        if self._beat == due:
+            # A beat: measure how late it came, switch meter on a bar line
+            jitter = (now - self._time_of(self._beat)) * 1000
+            self.beats += 1
+            self.total_jitter += jitter
+            self.max_jitter = max(self.max_jitter, jitter)
+            self.last_jitter = jitter
+            if self._pending_beats_per_bar is not None and (self._beat - self._origin_beat) % self.beats_per_bar == 0:
+                self._apply_time_signature()
+                step_beat = self._beat_of(self._step)
+            self._beat += 1
+
+        if step_beat > due:
+            self._arm()  # No step on this beat
+            return
+
+        index = self._step % len(self.step_beats)
+        self._step += 1
+        self.ticks += 1
+        if not self.loop and self._step % len(self.step_beats) == 0:
+            self.tick.emit(index)
+            self.finished.emit()
+            return
+        self._arm()
+        self.tick.emit(index)
+
+    def stats(self):
+        # Per-beat timing: how late each beat fired; ticks are steps played
+        return {
+            "bpm": self.bpm,
+            "beats_per_bar": self.beats_per_bar,
+            "ticks": self.ticks,
+            "beats": self.beats,
+            "mean_jitter_ms": self.total_jitter / self.beats if self.beats else 0.0,
+            "max_jitter_ms": self.max_jitter,
+            "last_jitter_ms": self.last_jitter,
+        }
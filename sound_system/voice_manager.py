@@ -0,0 +1,164 @@
+import threading
+import time
+
+# Voice stealing policies used when the polyphony cap is reached
+STEAL_OLDEST = "oldest"
+STEAL_QUIETEST = "quietest"
+
+SUSTAIN_CC = 64  # MIDI controller number of the sustain pedal
+
+
+class Voice:
+    # One sounding (channel, note) pair
+    __slots__ = ("refcount", "velocity", "started", "sustained")
+
+    def __init__(self, velocity, started):
+        self.refcount = 1
+        self.velocity = velocity
+        self.started = started
+        self.sustained = False
+
+
+class VoiceManager:
+    # Active-voice table that sits between the scheduler and the synth
+    #
+    # It has the same noteon/noteoff/program_change/cc methods as a
+    # fluidsynth.Synth, so it can be used as the scheduler's sink. A key
+    # struck again before its note-off only bumps a reference count, so the
+    # first strike's delayed note-off no longer cuts the second one short.
+
+    def __init__(self, synth, max_polyphony=32, steal_policy=STEAL_OLDEST):
+        if steal_policy not in (STEAL_OLDEST, STEAL_QUIETEST):
+            raise ValueError(f"Unknown voice stealing policy: {steal_policy}")
+
+        self.synth = synth
+        self.max_polyphony = max_polyphony
+        self.steal_policy = steal_policy
+        self.voices = {}         # (channel, note) -> Voice
+        self.sustain = set()     # Channels with the pedal down
+        # (channel, note) -> note-offs still to come for strikes whose voice
+        # was already taken away (stolen or all-notes-off); they are absorbed
+        # so they cannot end a later strike of the same key
+        self._orphan_offs = {}
+        self._lock = threading.RLock()
+
+        # Counters
+        self.steals = 0
+        self.retriggers = 0
+        self.peak_voices = 0
+
+    def noteon(self, channel, key, velocity):
+        # Start (or retrigger) a voice
+        if velocity <= 0:
+            return self.noteoff(channel, key)
+
+        with self._lock:
+            voice = self.voices.get((channel, key))
+            if voice is not None:
+                voice.refcount += 1
+                voice.velocity = velocity
+                voice.started = time.perf_counter()
+                voice.sustained = False
+                self.retriggers += 1
+            else:
+                if len(self.voices) >= self.max_polyphony:
+                    self._steal()
+                self.voices[(channel, key)] = Voice(velocity, time.perf_counter())
+                self.peak_voices = max(self.peak_voices, len(self.voices))
+            return self.synth.noteon(channel, key, velocity)
+
+    def noteoff(self, channel, key):
+        # Release one reference to a voice; the synth only hears the note-off
+        # when the last strike is released and the pedal is up
+        with self._lock:
+            orphans = self._orphan_offs.get((channel, key))
+            if orphans:
+                if orphans > 1:
+                    self._orphan_offs[(channel, key)] = orphans - 1
+                else:
+                    del self._orphan_offs[(channel, key)]
+                return None  # Belongs to a strike whose voice is gone
+
+            voice = self.voices.get((channel, key))
+            if voice is None:
+                return None  # Already released
+
+            voice.refcount = max(0, voice.refcount - 1)
+            if voice.refcount > 0:
+                return None
+            if channel in self.sustain:
+                voice.sustained = True
+                return None
+
+            del self.voices[(channel, key)]
+            return self.synth.noteoff(channel, key)
+
+    def program_change(self, channel, program):
+        # Pass-through so the manager can stand in for the synth
+        return self.synth.program_change(channel, program)
+
+    def cc(self, channel, controller, value):
+        # Handle the sustain pedal locally, forward everything else
+        if controller == SUSTAIN_CC:
+            self.set_sustain(channel, value >= 64)
+            return None
+        return self.synth.cc(channel, controller, value)
+
+    def set_sustain(self, channel, pressed):
+        # Sustain pedal: while down, released keys keep sounding
+        with self._lock:
+            if pressed:
+                self.sustain.add(channel)
+                return
+            self.sustain.discard(channel)
+            held = [
+                key for (voice_channel, key), voice in self.voices.items()
+                if voice_channel == channel and voice.sustained
+            ]
+            for key in held:
+                del self.voices[(channel, key)]
+                self.synth.noteoff(channel, key)
+
+    def _steal(self):
+        # Free one voice according to the stealing policy; voices that only
+        # ring because of the pedal are taken first
+        candidates = [item for item in self.voices.items() if item[1].sustained] or list(self.voices.items())
+        if self.steal_policy == STEAL_QUIETEST:
+            (channel, key), _ = min(candidates, key=lambda item: (item[1].velocity, item[1].started))
+        else:
+            (channel, key), _ = min(candidates, key=lambda item: item[1].started)
+        self._drop_voice(channel, key)
+        self.steals += 1
+
+    def _drop_voice(self, channel, key):
+        # Silence a voice before its strikes were released; their note-offs
+        # are still on the way and must not reach a later strike
+        voice = self.voices.pop((channel, key))
+        if voice.refcount > 0:
+            self._orphan_offs[(channel, key)] = self._orphan_offs.get((channel, key), 0) + voice.refcount
+        self.synth.noteoff(channel, key)
+
+    def all_notes_off(self, channel=None):
+        # Release every voice (on one channel or all channels)
+        with self._lock:
+            for voice_channel, key in list(self.voices):
+                if channel is None or voice_channel == channel:
+                    self._drop_voice(voice_channel, key)
+
+    def active_voices(self):
+        # Number of voices currently sounding
+        with self._lock:
+            return len(self.voices)
+
+    def stats(self):
+        # Live voice counters
+        with self._lock:
+            return {
+                "active_voices": len(self.voices),
+                "sustained_voices": sum(1 for voice in self.voices.values() if voice.sustained),
+                "peak_voices": self.peak_voices,
+                "steals": self.steals,
+                "retriggers": self.retriggers,
+                "max_polyphony": self.max_polyphony,
+                "steal_policy": self.steal_policy,
+            }
@@ -0,0 +1,126 @@
+import builtins
+import os
+import sys
+import time
+
+
+def _process_age():
+    # Seconds since the OS created this process (0.0 if it cannot be told)
+    try:
+        with open("/proc/self/stat") as stat_file:
+            # Fields after the parenthesised command name start at field 3;
+            # field 22 is the start time in clock ticks after boot
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return 0.0
+    return max(0.0, time.time() - psutil.Process().create_time())
+
+
+# Process creation on the perf_counter clock, so the interpreter's own
+# startup is counted too (not just the time since this module was imported)
+PROCESS_START = time.perf_counter() - _process_age()
+
+# Set to 1 to time every module imported during startup
+IMPORT_PROFILE_ENV = "PIANOCHORD_IMPORT_PROFILE"
+
+# Startup phases in the order they are reached
+PHASES = ("imports", "qapplication", "window_shown", "synth_ready", "first_sound")
+
+# Phase name -> seconds since process start (first occurrence wins)
+marks = {}
+
+# Module name -> (seconds including its own imports, seconds in the module itself)
+import_times = {}
+
+_original_import = None
+_import_stack = []       # Time spent in child imports, one entry per import in progress
+
+
+def mark(name):
+    # Record the first time a startup phase is reached
+    if name not in marks:
+        marks[name] = time.perf_counter() - PROCESS_START
+    return marks[name]
+
+
+def elapsed(name):
+    # Seconds from process start to a phase, or None if not reached yet
+    return marks.get(name)
+
+
+def report():
+    # One-line summary of the phases reached so far
+    parts = [f"{name} {seconds:.3f}s" for name, seconds in sorted(marks.items(), key=lambda item: item[1])]
+    return "Startup: " + ", ".join(parts)
+
+
+def phase_durations():
+    # Time spent in each phase reached, from the previous one (seconds)
+    durations = {}
+    previous = 0.0
+    for name, seconds in sorted(marks.items(), key=lambda item: item[1]):
+        durations[name] = seconds - previous
+        previous = seconds
+    return durations
+
+
+# Import profiling
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # builtins.__import__ replacement timing first imports of absolute names
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = time.perf_counter()
+    _import_stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        total = time.perf_counter() - start
+        children = _import_stack.pop()
+        if _import_stack:
+            _import_stack[-1] += total
+        import_times[name] = (total, total - children)
+
+
+def enable_import_profile():
+    # Start timing imports (only those made after this call are seen)
+    global _original_import
+    if _original_import is None:
+        _original_import = builtins.__import__
+        builtins.__import__ = _timed_import
+
+
+def disable_import_profile():
+    # Stop timing imports; the times collected so far are kept
+    global _original_import
+    if _original_import is not None:
+        builtins.__import__ = _original_import
+        _original_import = None
+
+
+def import_report(top=10):
+    # The modules that cost the most to import themselves, slowest first
+    slowest = sorted(import_times.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    lines = [f"Imports: {len(import_times)} modules, {sum(own for _, own in import_times.values()):.3f}s"]
+    lines += [f"  {name:<40} {own * 1000:8.1f} ms  ({total * 1000:.1f} ms with imports)"
+              for name, (total, own) in slowest]
+    return "\n".join(lines)
+
+
+def as_dict():
+    # Phases and import times in milliseconds (for benchmarks/cold_start_benchmark.py)
+    return {
+        "phases_ms": {name: seconds * 1000 for name, seconds in marks.items()},
+        "imports_ms": {name: [total * 1000, own * 1000] for name, (total, own) in import_times.items()},
+    }
+
+
+if os.environ.get(IMPORT_PROFILE_ENV) == "1":
+    enable_import_profile()
@@ -0,0 +1,58 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Tests import the app's modules the way main.py does, from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeSynth:
+    # Records the calls a fluidsynth.Synth would receive, in order
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call)
+
+    def noteon(self, channel, key, velocity):
+        self._record("noteon", channel, key, velocity)
+
+    def noteoff(self, channel, key):
+        self._record("noteoff", channel, key)
+
+    def program_change(self, channel, program):
+        self._record("program", channel, program)
+
+    def cc(self, channel, controller, value):
+        self._record("cc", channel, controller, value)
+
+    def of_kind(self, kind):
+        # Calls of one kind, without the kind
+        with self._lock:
+            return [call[1:] for call in self.calls if call[0] == kind]
+
+
+def _wait_until(predicate, timeout=2.0):
+    # Poll until predicate() is true (the scheduler dispatches on its own thread)
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.002)
+    return True
+
+
+@pytest.fixture
+def synth():
+    return FakeSynth()
+
+
+@pytest.fixture
+def wait_until():
+    return _wait_until
@@ -0,0 +1,26 @@
+import pytest
+
+from learning_system.modes.chord_construction import ChordConstructionMode
+
+
+@pytest.fixture
+def mode():
+    mode = ChordConstructionMode(None, None)
+    mode.current_question = {"root_note": "D", "chord_type": "major"}
+    mode.target_chord_notes = {"D4", "F#4", "A4"}
+    return mode
+
+
+@pytest.mark.parametrize("selection, correct", [
+    (["D4", "F#4", "A4"], True),
+    (["A4", "D4", "F#4"], True),          # Order of clicks does not matter
+    (["D4", "Gb4", "A4"], True),         # Enharmonic spelling of the same key
+    (["F#4", "A4", "D5"], False),         # Inversion: other keys
+    (["D5", "F#5", "A5"], False),         # Other octave
+    (["D4", "F#4", "A4", "D5"], False),   # Doubled note
+    (["D4", "F#4"], False),               # Missing note
+    (["D4", "F4", "A4"], False),        # Other chord
+])
+def test_selection_must_be_the_target_keys(mode, selection, correct):
+    mode.user_selected_notes = selection
+    assert mode._is_target_chord() is correct
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from sound_system.event_scheduler import EventScheduler, NOTE_ON, NOTE_OFF, PROGRAM, CONTROL
+
+
+@pytest.fixture
+def scheduler(synth):
+    scheduler = EventScheduler(synth)
+    yield scheduler
+    scheduler.shutdown(flush_note_offs=False)
+
+
+def test_batch_is_dispatched_in_time_order(scheduler, synth, wait_until):
+    scheduler.schedule([
+        (40, NOTE_OFF, 0, 60, 0),
+        (0, NOTE_ON, 0, 60, 100),
+        (20, CONTROL, 0, 64, 127),
+        (10, PROGRAM, 0, 5, 0),
+    ])
+    assert wait_until(lambda: len(synth.calls) == 4)
+    assert [call[0] for call in synth.calls] == ["noteon", "program", "cc", "noteoff"]
+
+
+def test_cancel_owner_drops_only_that_owner(scheduler, synth, wait_until):
+    scheduler.schedule([(100, NOTE_ON, 0, 60, 100)], owner="a")
+    scheduler.schedule([(100, NOTE_ON, 0, 64, 100)], owner="b")
+    assert scheduler.cancel_owner("a") == 1
+    assert wait_until(lambda: synth.of_kind("noteon"))
+    time.sleep(0.05)
+    assert synth.of_kind("noteon") == [(0, 64, 100)]
+
+
+def test_cancel_flushes_note_off_of_started_note(scheduler, synth, wait_until):
+    scheduler.schedule([(0, NOTE_ON, 0, 60, 100), (5000, NOTE_OFF, 0, 60, 0)], owner="song")
+    assert wait_until(lambda: synth.of_kind("noteon"))
+    scheduler.cancel_owner("song")
+    assert synth.of_kind("noteoff") == [(0, 60)]
+
+
+def test_cancel_before_note_on_sends_no_note_off(scheduler, synth):
+    # Regression: the noteoff of a note that never started used to be
+    # flushed, releasing whatever else was holding the key
+    scheduler.schedule([(200, NOTE_ON, 0, 60, 100), (400, NOTE_OFF, 0, 60, 0)], owner="song")
+    assert scheduler.cancel_owner("song") == 2
+    time.sleep(0.05)
+    assert synth.calls == []
+
+
+def test_cancel_does_not_release_another_owners_note(scheduler, synth, wait_until):
+    scheduler.schedule([(0, NOTE_ON, 0, 60, 100)], owner="keys")
+    assert wait_until(lambda: synth.of_kind("noteon"))
+    scheduler.schedule([(300, NOTE_ON, 0, 60, 90), (600, NOTE_OFF, 0, 60, 0)], owner="chords")
+    scheduler.cancel_owner("chords")
+    time.sleep(0.05)
+    assert synth.of_kind("noteoff") == []
+
+
+def test_cancel_channel(scheduler, synth, wait_until):
+    scheduler.schedule([(100, NOTE_ON, 1, 60, 100), (100, NOTE_ON, 0, 62, 100)])
+    assert scheduler.cancel_channel(1) == 1
+    assert wait_until(lambda: synth.of_kind("noteon"))
+    assert synth.of_kind("noteon") == [(0, 62, 100)]
+
+
+def test_release_owner_ends_notes_without_note_off(scheduler, synth, wait_until):
+    scheduler.schedule([(0, NOTE_ON, 0, 60, 100), (0, NOTE_ON, 2, 67, 100)], owner="song")
+    assert wait_until(lambda: len(synth.of_kind("noteon")) == 2)
+    assert scheduler.release_owner("song") == 2
+    assert wait_until(lambda: len(synth.of_kind("noteoff")) == 2)
+    assert sorted(synth.of_kind("noteoff")) == [(0, 60), (2, 67)]
+    assert scheduler.release_owner("song") == 0
+
+
+def test_release_owner_skips_released_notes(scheduler, synth, wait_until):
+    scheduler.schedule([(0, NOTE_ON, 0, 60, 100), (10, NOTE_OFF, 0, 60, 0)], owner="song")
+    assert wait_until(lambda: synth.of_kind("noteoff"))
+    assert scheduler.release_owner("song") == 0
+
+
+def test_shutdown_flushes_started_note_offs(synth, wait_until):
+    scheduler = EventScheduler(synth)
+    scheduler.schedule([(0, NOTE_ON, 0, 60, 100), (5000, NOTE_OFF, 0, 60, 0)])
+    scheduler.schedule([(5000, NOTE_ON, 0, 64, 100), (6000, NOTE_OFF, 0, 64, 0)])
+    assert wait_until(lambda: synth.of_kind("noteon"))
+    scheduler.shutdown()
+    assert synth.of_kind("noteoff") == [(0, 60)]
+
+
+def test_batch_spread_is_measured(scheduler, synth, wait_until):
+    batch_id = scheduler.schedule([(0, NOTE_ON, 0, 60, 100), (0, NOTE_ON, 0, 64, 100)])
+    assert wait_until(lambda: scheduler.batch_spread_ms(batch_id) is not None)
+    assert scheduler.batch_spread_ms(batch_id) >= 0.0
+    assert scheduler.batch_noteon_time(batch_id) is not None
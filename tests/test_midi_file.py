@@ -0,0 +1,70 @@
+import pytest
+
+from sound_system.event_scheduler import NOTE_ON, NOTE_OFF, PROGRAM, CONTROL
+from sound_system.midi_file import MidiFileReader, MidiRecorder, encode_track, write_midi, _read_varlen, _varlen
+
+
+def _approx_events(events):
+    return [(pytest.approx(time_ms, abs=1.0), kind, channel, key, value)
+            for time_ms, kind, channel, key, value in events]
+
+
+@pytest.mark.parametrize("value", [0, 1, 0x7F, 0x80, 0x3FFF, 0x4000, 0x0FFFFFFF])
+def test_varlen_round_trip(value):
+    encoded = _varlen(value)
+    assert _read_varlen(encoded, 0) == (value, len(encoded))
+
+
+def test_write_read_round_trip(tmp_path):
+    events = [
+        (0, PROGRAM, 0, 0, 0),
+        (0, CONTROL, 0, 64, 127),
+        (0, NOTE_ON, 0, 60, 100),
+        (250, NOTE_ON, 1, 64, 90),
+        (500, NOTE_OFF, 0, 60, 0),
+        (750, CONTROL, 0, 64, 0),
+        (1000, NOTE_OFF, 1, 64, 0),
+    ]
+    path = tmp_path / "round_trip.mid"
+    write_midi(str(path), events)
+    assert list(MidiFileReader(str(path)).events()) == _approx_events(events)
+
+
+def test_round_trip_keeps_tempo(tmp_path):
+    events = [(0, NOTE_ON, 0, 60, 100), (1000, NOTE_OFF, 0, 60, 0), (1500, NOTE_ON, 0, 62, 100)]
+    path = tmp_path / "tempo.mid"
+    write_midi(str(path), events, bpm=90, beats_per_bar=3)
+    assert list(MidiFileReader(str(path)).events()) == _approx_events(events)
+
+
+def test_note_off_is_written_before_note_on_at_same_time(tmp_path):
+    # A repeated note must not be cut short by the previous one's note-off
+    events = [(500, NOTE_ON, 0, 60, 100), (0, NOTE_ON, 0, 60, 100), (500, NOTE_OFF, 0, 60, 0)]
+    path = tmp_path / "repeat.mid"
+    write_midi(str(path), events)
+    kinds = [kind for _, kind, _, _, _ in MidiFileReader(str(path)).events()]
+    assert kinds == [NOTE_ON, NOTE_OFF, NOTE_ON]
+
+
+def test_encode_track_ends_with_end_of_track():
+    track = encode_track([(0, NOTE_ON, 0, 60, 100)])
+    assert track.endswith(b"\x00\xff\x2f\x00")
+
+
+def test_recorder_save_round_trip(tmp_path):
+    recorder = MidiRecorder()
+    recorder.start()
+    recorder.note_on(60, 100)
+    recorder.note_off(60)
+    recorder.stop()
+    path = tmp_path / "recording.mid"
+    recorder.save(str(path))
+    events = list(MidiFileReader(str(path)).events())
+    assert [(kind, channel, key) for _, kind, channel, key, _ in events] == [(NOTE_ON, 0, 60), (NOTE_OFF, 0, 60)]
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "not_midi.mid"
+    path.write_bytes(b"RIFF\x00\x00\x00\x00")
+    with pytest.raises(ValueError):
+        MidiFileReader(str(path))
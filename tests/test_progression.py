@@ -0,0 +1,32 @@
+import pytest
+
+from music_theory.progression import MAJOR, MINOR, compile_progression, resolve_progression
+
+
+def _roots(pattern, tonic, mode=MAJOR):
+    return [chord.root for chord in resolve_progression(pattern, tonic, mode)]
+
+
+def test_compile_reads_secondary_chords_in_their_key():
+    steps = compile_progression("I-vii°/V-V")
+    assert [(step.semitones, step.chord_type) for step in steps] == [(0, "major"), (6, "diminished"), (7, "major")]
+
+
+@pytest.mark.parametrize("pattern, tonic, mode, roots", [
+    ("vii°/V", "C4", MAJOR, ["F#4"]),                  # Leading tone of G major
+    ("vii°/ii", "F4", MAJOR, ["F#4"]),                 # Leading tone of G minor, in a flat key
+    ("vii°", "A4", MINOR, ["G#5"]),                    # Raised seventh of harmonic minor
+    ("vii°", "D4", MAJOR, ["C#5"]),
+    ("bVII-bVI-bIII", "C4", MAJOR, ["Bb4", "Ab4", "Eb4"]),
+    ("#iv°", "C4", MAJOR, ["F#4"]),
+    ("IV-V/V", "F4", MAJOR, ["Bb4", "G4"]),            # Diatonic degrees follow the key signature
+    ("I-IV", "E4", MAJOR, ["E4", "A4"]),
+    ("ii°-V/iv", "D4", MINOR, ["E4", "D4"]),
+])
+def test_roots_are_spelled_from_numeral_and_key(pattern, tonic, mode, roots):
+    assert _roots(pattern, tonic, mode) == roots
+
+
+def test_resolve_rejects_bad_numeral():
+    with pytest.raises(ValueError):
+        resolve_progression("I-X", "C4")
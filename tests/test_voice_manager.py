@@ -0,0 +1,122 @@
+import pytest
+
+from sound_system.voice_manager import VoiceManager, STEAL_OLDEST, STEAL_QUIETEST, SUSTAIN_CC
+
+
+def test_retrigger_keeps_note_until_last_release(synth):
+    voices = VoiceManager(synth)
+    voices.noteon(0, 60, 100)
+    voices.noteon(0, 60, 80)
+    voices.noteoff(0, 60)
+    assert synth.of_kind("noteoff") == []
+    assert voices.active_voices() == 1
+    voices.noteoff(0, 60)
+    assert synth.of_kind("noteoff") == [(0, 60)]
+    assert voices.active_voices() == 0
+    assert voices.stats()["retriggers"] == 1
+
+
+def test_extra_note_off_is_ignored(synth):
+    voices = VoiceManager(synth)
+    voices.noteon(0, 60, 100)
+    voices.noteoff(0, 60)
+    voices.noteoff(0, 60)
+    assert synth.of_kind("noteoff") == [(0, 60)]
+
+
+def test_zero_velocity_note_on_is_a_note_off(synth):
+    voices = VoiceManager(synth)
+    voices.noteon(0, 60, 100)
+    voices.noteon(0, 60, 0)
+    assert synth.of_kind("noteoff") == [(0, 60)]
+
+
+def test_sustain_holds_released_notes(synth):
+    voices = VoiceManager(synth)
+    voices.set_sustain(0, True)
+    voices.noteon(0, 60, 100)
+    voices.noteon(0, 64, 100)
+    voices.noteoff(0, 60)
+    assert synth.of_kind("noteoff") == []
+    assert voices.stats()["sustained_voices"] == 1
+
+    voices.set_sustain(0, False)
+    assert synth.of_kind("noteoff") == [(0, 60)]
+    assert voices.active_voices() == 1
+
+
+def test_sustain_pedal_controller_is_handled_locally(synth):
+    voices = VoiceManager(synth)
+    voices.cc(0, SUSTAIN_CC, 127)
+    voices.noteon(0, 60, 100)
+    voices.noteoff(0, 60)
+    voices.cc(0, SUSTAIN_CC, 0)
+    voices.cc(0, 7, 90)
+    assert synth.of_kind("cc") == [(0, 7, 90)]
+    assert synth.of_kind("noteoff") == [(0, 60)]
+
+
+def test_restruck_sustained_note_is_not_sustained(synth):
+    voices = VoiceManager(synth)
+    voices.set_sustain(0, True)
+    voices.noteon(0, 60, 100)
+    voices.noteoff(0, 60)
+    voices.noteon(0, 60, 100)
+    voices.set_sustain(0, False)
+    assert synth.of_kind("noteoff") == []
+    voices.noteoff(0, 60)
+    assert synth.of_kind("noteoff") == [(0, 60)]
+
+
+def test_steal_oldest(synth):
+    voices = VoiceManager(synth, max_polyphony=2, steal_policy=STEAL_OLDEST)
+    for key in (60, 64, 67):
+        voices.noteon(0, key, 100)
+    assert synth.of_kind("noteoff") == [(0, 60)]
+    assert sorted(key for _, key in voices.voices) == [64, 67]
+    assert voices.stats()["steals"] == 1
+
+
+def test_steal_quietest(synth):
+    voices = VoiceManager(synth, max_polyphony=2, steal_policy=STEAL_QUIETEST)
+    voices.noteon(0, 60, 100)
+    voices.noteon(0, 64, 30)
+    voices.noteon(0, 67, 100)
+    assert synth.of_kind("noteoff") == [(0, 64)]
+
+
+def test_steal_takes_sustained_voices_first(synth):
+    voices = VoiceManager(synth, max_polyphony=2)
+    voices.set_sustain(0, True)
+    voices.noteon(0, 60, 100)
+    voices.noteon(0, 64, 100)
+    voices.noteoff(0, 64)
+    voices.noteon(0, 67, 100)
+    assert synth.of_kind("noteoff") == [(0, 64)]
+
+
+def test_stolen_voice_note_off_does_not_end_later_strike(synth):
+    voices = VoiceManager(synth, max_polyphony=1)
+    voices.noteon(0, 60, 100)
+    voices.noteon(0, 64, 100)      # Steals 60
+    voices.noteon(0, 60, 100)      # Strikes 60 again, stealing 64
+    voices.noteoff(0, 60)          # Late note-off of the first strike
+    assert (0, 60) in voices.voices
+    voices.noteoff(0, 60)
+    assert (0, 60) not in voices.voices
+
+
+def test_all_notes_off_on_one_channel(synth):
+    voices = VoiceManager(synth)
+    voices.noteon(0, 60, 100)
+    voices.noteon(1, 60, 100)
+    voices.all_notes_off(1)
+    assert synth.of_kind("noteoff") == [(1, 60)]
+    voices.noteon(1, 60, 100)
+    voices.noteoff(1, 60)          # Belongs to the strike that was silenced
+    assert voices.active_voices() == 2
+
+
+def test_unknown_steal_policy():
+    with pytest.raises(ValueError):
+        VoiceManager(None, steal_policy="loudest")
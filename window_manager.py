@@ -0,0 +1,93 @@
+import time
+
+# Tool window names
+CHORD_FINDER = "chord_finder"
+CHORD_PROGRESSION = "chord_progression"
+
+
+class WindowManager(object):
+    # Creates each tool window once and re-shows it on later opens
+    #
+    # A window is built by its factory the first time it is opened; after
+    # that open() only shows and raises the same instance. Signal
+    # connections are made through wire(), which connects a named link
+    # once and records it, so opening windows again and again never adds
+    # connections and the wiring can be listed at any time.
+
+    def __init__(self):
+        self._factories = {}     # Name -> factory()
+        self.windows = {}        # Name -> window, once created
+        self._links = {}         # Link name -> description
+
+        # Counters
+        self.opens = 0
+        self.creations = 0
+        self.create_ms_total = 0.0
+        self.create_ms_max = 0.0
+        self.reopen_ms_total = 0.0
+        self.reopen_ms_max = 0.0
+
+    def register(self, name, factory):
+        # Tell the manager how to build a window (nothing is built yet)
+        self._factories[name] = factory
+
+    def get(self, name):
+        # The window if it has been created, else None
+        return self.windows.get(name)
+
+    def open(self, name):
+        # Show a window, creating it on first use; returns the window
+        start = time.perf_counter()
+        window = self.windows.get(name)
+        created = window is None
+        if created:
+            window = self._factories[name]()
+            self.windows[name] = window
+            self.creations += 1
+
+        if window.isMinimized():
+            window.showNormal()
+        window.show()
+        window.raise_()
+        window.activateWindow()
+
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self.opens += 1
+        if created:
+            self.create_ms_total += elapsed
+            self.create_ms_max = max(self.create_ms_max, elapsed)
+        else:
+            self.reopen_ms_total += elapsed
+            self.reopen_ms_max = max(self.reopen_ms_max, elapsed)
+        return window
+
+    def wire(self, link, signal, slot):
+        # Connect signal to slot once per link name; returns True if connected now
+        if link in self._links:
+            return False
+        signal.connect(slot)
+        self._links[link] = f"{signal.signal.lstrip('0123456789')} -> {getattr(slot, '__qualname__', repr(slot))}"
+        return True
+
+    def connections(self):
+        # Link name -> "signal -> slot" for every connection made
+        return dict(self._links)
+
+    def close_all(self):
+        # Close every created window
+        for window in self.windows.values():
+            window.close()
+
+    def stats(self):
+        # Open counts and latency (first open builds the window, later
+        # opens only show it) and the number of connections made
+        reopens = self.opens - self.creations
+        return {
+            "opens": self.opens,
+            "windows_created": self.creations,
+            "mean_create_ms": self.create_ms_total / self.creations if self.creations else 0.0,
+            "max_create_ms": self.create_ms_max,
+            "mean_reopen_ms": self.reopen_ms_total / reopens if reopens else 0.0,
+            "max_reopen_ms": self.reopen_ms_max,
+            "connections": len(self._links),
+        }